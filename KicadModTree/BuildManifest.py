@@ -0,0 +1,237 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import contextlib
+import errno
+import io
+import json
+import os
+import sys
+import time
+
+from KicadModTree.FileHandler import FileHandler
+
+
+MANIFEST_FILENAME = '.kicad_build_manifest.json'
+MANIFEST_VERSION = 1
+
+# saving a manifest takes milliseconds, a lock file which is older was left behind by a process which was killed
+LOCK_TIMEOUT = 30
+
+# all modules inside of this directory are considered to be part of the generator source
+_REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def _canonical(value):
+    '''
+    convert a value into a structure which is serialized to the same json string for equal inputs
+    '''
+    if isinstance(value, dict):
+        return [[repr(k), _canonical(v)] for k, v in sorted(value.items(), key=lambda item: repr(item[0]))]
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+def _hashFile(hasher, path):
+    with io.open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            hasher.update(block)
+
+
+class BuildManifest(object):
+    r"""Persistent record of the inputs every footprint was generated from, to only rebuild changed footprints
+
+    Every build step (usually one entry of a definition file) is stored under a key together with a hash of all of
+    its inputs and the files it has written. A step is up to date when the hash of its inputs did not change and all
+    of its output files still exist.
+
+    The hash of the inputs always includes the source code of the generator: the script itself and every loaded
+    module which is part of this repository (KicadModTree, scripts/tools, ...).
+
+    :param directory:
+        directory the manifest is stored in, usually the one containing the generated ``.pretty`` folders
+        (default: current working directory)
+    :type directory: ``str``
+
+    :Example:
+
+    >>> from KicadModTree import *
+    >>> manifest = BuildManifest()
+    >>> input_hash = manifest.inputHash(device_params, configuration, files=['../ipc_definitions.yaml'])
+    >>> if not manifest.isUpToDate('soic.yaml/SOIC-8', input_hash):
+    ...     manifest.build('soic.yaml/SOIC-8', input_hash, generate_footprint, device_params)
+    >>> manifest.save()
+    """
+
+    def __init__(self, directory=None):
+        self.directory = os.path.abspath(directory or os.getcwd())
+        self.path = os.path.join(self.directory, MANIFEST_FILENAME)
+
+        self.entries = self._load()
+        self._changed_entries = {}
+        self._source_hash = None
+
+        self.skipped = 0
+        self.built = 0
+
+    def _load(self):
+        try:
+            with io.open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+        if manifest.get('version') != MANIFEST_VERSION:
+            return {}
+        return manifest.get('entries', {})
+
+    def sourceHash(self):
+        r"""Hash of the generator source: the main script and all loaded modules inside of this repository"""
+        if self._source_hash is None:
+            import hashlib  # imported here to keep the import of KicadModTree fast
+            hasher = hashlib.sha1()
+
+            sources = set()
+            main_module = sys.modules.get('__main__')
+            if getattr(main_module, '__file__', None):
+                sources.add(os.path.realpath(main_module.__file__))
+            for module in list(sys.modules.values()):
+                source = getattr(module, '__file__', None)
+                if not source:
+                    continue
+                source = os.path.realpath(source)
+                if source.endswith('.pyc'):
+                    source = source[:-1]
+                if source.startswith(_REPOSITORY_ROOT + os.sep) and os.path.isfile(source):
+                    sources.add(source)
+
+            for source in sorted(sources):
+                hasher.update(os.path.relpath(source, _REPOSITORY_ROOT).encode('utf-8'))
+                _hashFile(hasher, source)
+
+            self._source_hash = hasher.hexdigest()
+
+        return self._source_hash
+
+    def inputHash(self, *inputs, **kwargs):
+        r"""Calculate the hash of all inputs of a build step
+
+        :param \*inputs:
+            data the build step depends on (definition file entries, configuration, ...). dicts, lists and scalar
+            values are hashed by value.
+
+        :Keyword Arguments:
+            * *files* (``list(str)``) --
+              additional files the build step depends on (like the IPC definition file)
+        """
+        import hashlib
+        hasher = hashlib.sha1()
+        hasher.update(self.sourceHash().encode('utf-8'))
+        hasher.update(json.dumps(_canonical(inputs)).encode('utf-8'))
+
+        for path in kwargs.get('files') or []:
+            hasher.update(b'\0')
+            _hashFile(hasher, path)
+
+        return hasher.hexdigest()
+
+    def isUpToDate(self, key, input_hash):
+        r"""Check if the outputs of a build step were generated from the given inputs and still exist"""
+        entry = self.entries.get(key)
+        if entry is None or entry.get('hash') != input_hash or not entry.get('outputs'):
+            return False
+
+        return all(os.path.isfile(os.path.join(self.directory, output)) for output in entry['outputs'])
+
+    def record(self, key, input_hash, outputs):
+        r"""Store the inputs and written output files of a build step"""
+        entry = {'hash': input_hash,
+                 'outputs': sorted(set(os.path.relpath(os.path.abspath(output), self.directory)
+                                       for output in outputs))}
+        self.entries[key] = entry
+        self._changed_entries[key] = entry
+        self.built += 1
+
+    def build(self, key, input_hash, function, *args, **kwargs):
+        r"""Run a build step if it is not up to date and record the files it writes
+
+        All files written with a ``FileHandler`` while the function is running are recorded as outputs of the step.
+
+        :return: ``True`` if the step was executed, ``False`` if it was up to date
+        """
+        if self.isUpToDate(key, input_hash):
+            self.skipped += 1
+            return False
+
+        outputs = []
+        listener = outputs.append
+        FileHandler._write_listeners.append(listener)
+        try:
+            function(*args, **kwargs)
+        finally:
+            FileHandler._write_listeners.remove(listener)
+
+        self.record(key, input_hash, outputs)
+        return True
+
+    @contextlib.contextmanager
+    def _locked(self):
+        '''
+        hold the lock file of the manifest, which is created exclusively (O_EXCL) by one process at a time
+        '''
+        lock_path = self.path + '.lock'
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue  # the lock was released in the meantime
+            time.sleep(0.01)
+
+        try:
+            yield
+        finally:
+            os.remove(lock_path)
+
+    def save(self):
+        r"""Write the manifest to disk
+
+        Entries changed by other processes in the meantime are kept, so multiple generators can share a manifest.
+        Reading, merging and replacing the manifest is done while holding the lock file ``<manifest>.lock``.
+        """
+        if not self._changed_entries:
+            return
+
+        with self._locked():
+            entries = self._load()
+            entries.update(self._changed_entries)
+
+            temporary_path = '{}.{}.tmp'.format(self.path, os.getpid())
+            with io.open(temporary_path, 'wb') as f:
+                f.write(json.dumps({'version': MANIFEST_VERSION, 'entries': entries}, indent=1, sort_keys=True)
+                        .encode('utf-8'))
+            # os.replace is not available in python 2
+            getattr(os, 'replace', os.rename)(temporary_path, self.path)
+
+        self.entries = entries
+        self._changed_entries = {}
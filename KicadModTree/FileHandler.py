@@ -13,9 +13,19 @@
 #
 # (C) 2016-2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import functools
+import os
 import sys
 import io
 
+from KicadModTree.Profiler import Profiler
+
+
+def _appendOutput(path, filename):
+    # one write per line, so processes can append to the same file
+    with io.open(path, 'ab') as f:
+        f.write((os.path.abspath(filename) + '\n').encode('utf-8'))
+
 
 class FileHandler(object):
     r"""some basic methods to write footprints, and which is the base class of footprint writer implementations
@@ -32,9 +42,36 @@ class FileHandler(object):
     >>> file_handler.writeFile('example_footprint.kicad_mod')
     """
 
+    # functions called with the filename of every written file (used by BuildManifest)
+    _write_listeners = []
+
+    # path of a file the name of every written file is appended to, one per line (used by build_library.py)
+    OUTPUT_LIST_ENVIRONMENT_VARIABLE = 'KICADMODTREE_OUTPUT_LIST'
+
+    # default for the only_changed option of writeFile
+    only_write_changed = False
+
+    # number of files not written by writeFile because their content did not change
+    skipped_writes = 0
+
     def __init__(self, kicad_mod):
         self.kicad_mod = kicad_mod
 
+    @classmethod
+    def recordOutputsFromEnvironment(cls, environ=None):
+        r"""Append the name of every written file to the file given by ``KICADMODTREE_OUTPUT_LIST``, if it is set
+
+        :return: the registered write listener, or ``None``
+        """
+        environ = os.environ if environ is None else environ
+        path = environ.get(cls.OUTPUT_LIST_ENVIRONMENT_VARIABLE)
+        if not path:
+            return None
+
+        listener = functools.partial(_appendOutput, os.path.abspath(path))
+        FileHandler._write_listeners.append(listener)
+        return listener
+
     def writeFile(self, filename, **kwargs):
         r"""Write the output of FileHandler.serialize to a file
 
@@ -42,6 +79,12 @@ class FileHandler(object):
             path of the output file
         :type filename: ``str``
 
+        :Keyword Arguments:
+            * *only_changed* (``bool``) --
+              only write the file if the content differs from the existing file. Differences which do not
+              represent a change of the footprint (like the edit timestamp) are ignored. Skipped writes are counted
+              in ``FileHandler.skipped_writes``. (default: ``FileHandler.only_write_changed``)
+
         :Example:
 
         >>> from KicadModTree import *
@@ -50,16 +93,88 @@ class FileHandler(object):
         >>> file_handler.writeFile('example_footprint.kicad_mod')
         """
 
-        with io.open(filename, "w", newline='\n') as f:
-            output = self.serialize(**kwargs)
+        only_changed = kwargs.pop('only_changed', self.only_write_changed)
+
+        with Profiler.phase('write'):
+            if only_changed:
+                output = self._serializeText(**kwargs)
+                if self._isUnchanged(filename, output):
+                    FileHandler.skipped_writes += 1
+                else:
+                    self._replaceFile(filename, lambda f: f.write(output))
+            elif sys.version_info[0] == 2:
+                output = self._serializeText(**kwargs)
+                self._replaceFile(filename, lambda f: f.write(output))
+            else:
+                self._replaceFile(filename, lambda f: self.writeStream(f, **kwargs))
+
+        if Profiler.active is not None:
+            Profiler.active.footprintWritten(self.kicad_mod, filename)
+
+        for listener in FileHandler._write_listeners:
+            listener(filename)
+
+    def _replaceFile(self, filename, write):
+        r"""Write a file through a temporary file in the same directory, which replaces the file when it is complete
+
+        If ``write`` raises an exception, an existing file is left unchanged instead of being truncated.
 
+        :param write: function called with the text stream of the temporary file
+        """
+        temporary_filename = '{}.{}.tmp'.format(filename, os.getpid())
+        try:
+            with io.open(temporary_filename, "w", newline='\n') as f:
+                write(f)
+            # os.replace is not available in python 2
+            getattr(os, 'replace', os.rename)(temporary_filename, filename)
+        except BaseException:
+            if os.path.exists(temporary_filename):
+                os.remove(temporary_filename)
+            raise
+
+    def _serializeText(self, **kwargs):
+        output = self.serialize(**kwargs)
+        if sys.version_info[0] == 2 and type(output) != unicode:
             # convert to unicode if running python2
-            if sys.version_info[0] == 2 and type(output) != unicode:
-                output = unicode(output, "utf-8")
+            output = unicode(output, "utf-8")
+        return output
+
+    def _isUnchanged(self, filename, output):
+        try:
+            with io.open(filename, "r", newline='') as f:
+                existing = f.read()
+        except (IOError, OSError, UnicodeDecodeError):
+            return False
+
+        return self._isEquivalentOutput(existing, output)
 
-            f.write(output)
+    def _isEquivalentOutput(self, existing, output):
+        r"""Check if an existing file has the same content as the new output
+
+        Implementations can override this method to ignore parts of the output which change on every run.
+        """
+        return existing == output
 
-            f.close()
+    def writeStream(self, stream, **kwargs):
+        r"""Write the output of FileHandler.serialize into a text stream
+
+        Implementations can override this method to write their output incrementally instead of building the whole
+        file content in memory first.
+
+        :param stream:
+            text stream the footprint is written into (file, ``io.StringIO``,...)
+
+        :Example:
+
+        >>> import io
+        >>> from KicadModTree import *
+        >>> kicad_mod = Footprint("example_footprint")
+        >>> file_handler = KicadFileHandler(kicad_mod)  # KicadFileHandler is a implementation of FileHandler
+        >>> with io.open('example_footprint.kicad_mod', 'w', newline='\n') as f:
+        ...     file_handler.writeStream(f)
+        """
+
+        stream.write(self.serialize(**kwargs))
 
     def serialize(self, **kwargs):
         r"""Get a valid string representation of the footprint in the specified format
@@ -73,3 +188,6 @@ class FileHandler(object):
         """
 
         raise NotImplementedError("serialize has to be implemented by child class")
+
+
+FileHandler.recordOutputsFromEnvironment()
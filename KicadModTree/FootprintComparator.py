@@ -0,0 +1,279 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import bisect
+import io
+import math
+import os
+import re
+
+from KicadModTree.KicadFileHandler import KicadFileHandler
+from KicadModTree.KicadFileReader import KicadFileReader
+from KicadModTree.util.kicad_util import SexprSerializer
+
+
+# edit timestamp of the footprint, files which only differ in it are not parsed at all
+_TEDIT_REGEX = re.compile(br'\(tedit [0-9A-Fa-f]+\)')
+
+# placeholder for numbers in the key of an element
+_NUMBER = None
+
+STATUS_UNCHANGED = 'unchanged'
+STATUS_CHANGED = 'changed'
+STATUS_ADDED = 'added'
+STATUS_REMOVED = 'removed'
+STATUS_ERROR = 'error'
+
+
+def _flatten(sexpr, key, numbers):
+    '''
+    split a sexpr into its structure (names and strings) and its numeric values
+    '''
+    key.append('(')
+    for item in sexpr:
+        item_type = type(item)
+        if item_type is list:
+            _flatten(item, key, numbers)
+        elif item_type is float or item_type is int:
+            key.append(_NUMBER)
+            numbers.append(float(item))
+        elif item is not SexprSerializer.NEW_LINE:
+            key.append(item)
+    key.append(')')
+
+
+def _normalizeLine(sexpr):
+    # a line from a to b is the same as a line from b to a
+    start, end = sexpr[1], sexpr[2]
+    if end[1:] < start[1:]:
+        sexpr = [sexpr[0], ['start'] + end[1:], ['end'] + start[1:]] + sexpr[3:]
+    return sexpr
+
+
+def _normalizeArc(sexpr):
+    # an arc with a negative angle is the same as the arc with a positive angle starting at its end point
+    center, start, angle = sexpr[1], sexpr[2], sexpr[3][1]
+    if angle < 0:
+        rotation = math.radians(angle)
+        dx, dy = start[1] - center[1], start[2] - center[2]
+        end = [center[1] + dx * math.cos(rotation) - dy * math.sin(rotation),
+               center[2] + dx * math.sin(rotation) + dy * math.cos(rotation)]
+        sexpr = [sexpr[0], center, ['end'] + end, ['angle', -angle]] + sexpr[4:]
+    return sexpr
+
+
+class _Element(object):
+    __slots__ = ('key', 'numbers', 'sexpr')
+
+    def __init__(self, sexpr, normalizers):
+        normalize = normalizers.get(sexpr[0])
+        if normalize is not None:
+            sexpr = normalize(sexpr)
+
+        key = []
+        numbers = []
+        _flatten(sexpr, key, numbers)
+
+        self.key = tuple(key)
+        self.numbers = numbers
+        self.sexpr = sexpr
+
+    def __str__(self):
+        return str(SexprSerializer(self.sexpr))
+
+
+class FootprintComparator(object):
+    r"""Compare footprints element by element, ignoring differences which do not change the footprint
+
+    Both footprints are serialized with the ``KicadFileHandler`` and every top level element (pad, line, text, ...)
+    is compared with the elements of the other footprint:
+
+    * the order of the elements does not matter
+    * numbers are compared with a tolerance, so differences in float formatting or rounding are ignored
+    * lines are compared independent of their direction and arcs independent of their orientation
+    * the edit timestamp is ignored
+
+    Files are read with the ``KicadFileReader``, which means only the properties represented by KicadModTree nodes
+    are compared.
+
+    :param tolerance:
+        maximum difference between two numbers which are considered equal (default: 1e-6)
+    :type tolerance: ``float``
+
+    :Example:
+
+    >>> from KicadModTree import *
+    >>> comparator = FootprintComparator(tolerance=1e-4)
+    >>> result = comparator.compareFiles('old.pretty/SOIC-8.kicad_mod', 'new.pretty/SOIC-8.kicad_mod')
+    >>> print(result['status'], result['removed'], result['added'])
+    """
+
+    # normalization of elements which can be written in different ways, by element name
+    NORMALIZERS = {'fp_line': _normalizeLine,
+                   'fp_arc': _normalizeArc}
+
+    # header elements which do not describe the footprint
+    IGNORED_ELEMENTS = ('tedit',)
+
+    def __init__(self, tolerance=1e-6):
+        self.tolerance = tolerance
+        self.reader = KicadFileReader()
+
+    def getElements(self, kicad_mod):
+        r"""Serialize a footprint into a list of elements which can be compared"""
+        sexpr = KicadFileHandler(kicad_mod)._serializeFootprint(timestamp=0)
+
+        elements = [_Element(['module', kicad_mod.name], self.NORMALIZERS)]
+        for item in sexpr:
+            if type(item) is list and item[0] not in self.IGNORED_ELEMENTS:
+                elements.append(_Element(item, self.NORMALIZERS))
+        return elements
+
+    def compare(self, kicad_mod_a, kicad_mod_b):
+        r"""Compare two footprints
+
+        :return: ``(removed, added)``: lists of the elements (as sexpr string) which are only in the first or only in
+                 the second footprint
+        """
+        elements_a = self._groupByKey(self.getElements(kicad_mod_a))
+        elements_b = self._groupByKey(self.getElements(kicad_mod_b))
+
+        removed = []
+        added = []
+        for key in set(elements_a) | set(elements_b):
+            unmatched_a, unmatched_b = self._match(elements_a.get(key, []), elements_b.get(key, []))
+            removed.extend(unmatched_a)
+            added.extend(unmatched_b)
+
+        return sorted(str(element) for element in removed), sorted(str(element) for element in added)
+
+    def compareFiles(self, filename_a, filename_b):
+        r"""Compare two .kicad_mod files
+
+        :return: ``dict`` with the ``status`` (unchanged, changed, added, removed or error) and the ``removed`` and
+                 ``added`` elements. If one of the files does not exist, the footprint counts as added or removed.
+        """
+        result = {'status': STATUS_UNCHANGED, 'removed': [], 'added': []}
+        try:
+            content_a = self._readContent(filename_a)
+            content_b = self._readContent(filename_b)
+            if content_a is None and content_b is None:
+                raise IOError("neither {} nor {} exist".format(filename_a, filename_b))
+
+            if content_a is None:
+                result['status'] = STATUS_ADDED
+            elif content_b is None:
+                result['status'] = STATUS_REMOVED
+            elif _TEDIT_REGEX.sub(b'', content_a, count=1) != _TEDIT_REGEX.sub(b'', content_b, count=1):
+                removed, added = self.compare(self.reader.parse(content_a), self.reader.parse(content_b))
+                if removed or added:
+                    result.update(status=STATUS_CHANGED, removed=removed, added=added)
+        except Exception as e:
+            result.update(status=STATUS_ERROR, error="{}: {}".format(e.__class__.__name__, e))
+
+        return result
+
+    def _readContent(self, filename):
+        if not os.path.isfile(filename):
+            return None
+        with io.open(filename, 'rb') as f:
+            return f.read()
+
+    def _groupByKey(self, elements):
+        groups = {}
+        for element in elements:
+            groups.setdefault(element.key, []).append(element)
+        return groups
+
+    def _match(self, elements_a, elements_b):
+        '''
+        pair elements with the same key whose numbers are all within the tolerance
+
+        :return: the elements of both lists without a partner
+        '''
+        if not elements_a or not elements_b:
+            return elements_a, elements_b
+
+        tolerance = self.tolerance
+        elements_b = sorted(elements_b, key=lambda element: element.numbers)
+        first_numbers = [element.numbers[0] if element.numbers else 0. for element in elements_b]
+        matched = bytearray(len(elements_b))
+
+        unmatched_a = []
+        for element in elements_a:
+            numbers = element.numbers
+            first = numbers[0] if numbers else 0.
+
+            # only elements whose first number is within the tolerance can match
+            index = bisect.bisect_left(first_numbers, first - tolerance)
+            while index < len(elements_b) and first_numbers[index] <= first + tolerance:
+                if not matched[index] and all(abs(a - b) <= tolerance
+                                              for a, b in zip(numbers, elements_b[index].numbers)):
+                    matched[index] = 1
+                    break
+                index += 1
+            else:
+                unmatched_a.append(element)
+
+        return unmatched_a, [element for index, element in enumerate(elements_b) if not matched[index]]
+
+
+def _findFootprints(directory):
+    footprints = set()
+    for path, directories, files in os.walk(directory):
+        for filename in files:
+            if filename.endswith('.kicad_mod'):
+                footprints.add(os.path.relpath(os.path.join(path, filename), directory).replace(os.sep, '/'))
+    return footprints
+
+
+def _compareInWorker(args):
+    directory_a, directory_b, footprint, tolerance = args
+    result = FootprintComparator(tolerance).compareFiles(os.path.join(directory_a, footprint),
+                                                         os.path.join(directory_b, footprint))
+    result['footprint'] = footprint
+    return result
+
+
+def compareLibraries(directory_a, directory_b, tolerance=1e-6, processes=None):
+    r"""Compare all footprints of two directories (like two .pretty folders or two library roots)
+
+    Footprints are matched by their path relative to the directory and compared with a ``FootprintComparator`` on a
+    pool of worker processes.
+
+    :param processes: number of worker processes (default: number of cpus, 1 compares in the current process)
+    :return: ``dict`` with the number of footprints per status (``summary``) and the result of every footprint which
+             is not unchanged (``footprints``), sorted by path
+    """
+    footprints = sorted(_findFootprints(directory_a) | _findFootprints(directory_b))
+    tasks = [(directory_a, directory_b, footprint, tolerance) for footprint in footprints]
+
+    import multiprocessing  # imported here to keep the import of KicadModTree fast
+    processes = processes or multiprocessing.cpu_count()
+    if processes > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(min(processes, len(tasks)))
+        try:
+            results = pool.map(_compareInWorker, tasks, chunksize=max(1, len(tasks) // (processes * 8)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_compareInWorker(task) for task in tasks]
+
+    summary = dict.fromkeys([STATUS_UNCHANGED, STATUS_CHANGED, STATUS_ADDED, STATUS_REMOVED, STATUS_ERROR], 0)
+    for result in results:
+        summary[result['status']] += 1
+
+    return {'tolerance': tolerance,
+            'summary': summary,
+            'footprints': [result for result in results if result['status'] != STATUS_UNCHANGED]}
@@ -0,0 +1,247 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+from __future__ import division
+
+import math
+
+from KicadModTree.util.kicad_util import SexprSerializer, formatFloat
+
+
+# graphic elements which are checked for duplicates
+GRAPHIC_ELEMENTS = ('fp_arc', 'fp_circle', 'fp_line', 'fp_poly')
+
+
+def _elementKey(sexpr):
+    '''
+    hashable representation of a sexpr, numbers are compared the way they are written into the file
+    '''
+    key = []
+    for item in sexpr:
+        item_type = type(item)
+        if item_type is list:
+            key.append(_elementKey(item))
+        elif item_type is float or item_type is int:
+            key.append(formatFloat(item))
+        elif item is not SexprSerializer.NEW_LINE:
+            key.append(item)
+    return tuple(key)
+
+
+def _isDegenerate(key):
+    # the key contains the formatted numbers, so only elements which are degenerated in the file are found
+    element_type = key[0]
+    if element_type == 'fp_line':
+        # (start x y) and (end x y)
+        return key[1][1:] == key[2][1:]
+    if element_type == 'fp_circle':
+        # (center x y) and (end x y)
+        return key[1][1:] == key[2][1:]
+    if element_type == 'fp_arc':
+        # (start cx cy), (end x y) and (angle a), the start contains the center of the arc
+        return key[1][1:] == key[2][1:] or key[3][1] == '0'
+    if element_type == 'fp_poly':
+        return len(key[1]) <= 1
+    return False
+
+
+class _Segment(object):
+    __slots__ = ('index', 'sexpr', 'start', 'end', 'low', 'high')
+
+    def __init__(self, index, sexpr):
+        self.index = index
+        self.sexpr = sexpr
+        self.start = (sexpr[1][1], sexpr[1][2])
+        self.end = (sexpr[2][1], sexpr[2][2])
+
+
+def _segmentGroupKey(segment, angle_precision, offset_precision):
+    '''
+    direction and distance to the origin of the infinite line through the segment, rounded to find candidates
+    '''
+    (x1, y1), (x2, y2) = segment.start, segment.end
+    angle = math.atan2(y2 - y1, x2 - x1)
+    if angle < 0:
+        angle += math.pi
+    if angle >= math.pi - angle_precision / 2:
+        # lines with nearly 180 degree have the same direction as lines with nearly 0 degree
+        angle = 0.
+
+    offset = x1 * math.sin(angle) - y1 * math.cos(angle)
+    return (int(round(angle / angle_precision)), int(round(offset / offset_precision)))
+
+
+def _lineDistance(point, start, end):
+    # distance between a point and the infinite line through start and end
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    length = math.hypot(dx, dy)
+    return abs((point[0] - start[0]) * dy - (point[1] - start[1]) * dx) / length
+
+
+class GeometryOptimizer(object):
+    r"""Remove redundant graphic elements from a serialized footprint
+
+    The optimizer works on the elements generated by the ``KicadFileHandler``, which means all transformations are
+    already applied. It
+
+    * merges collinear lines on the same layer and with the same width, which overlap or touch each other
+    * removes degenerated elements: lines without length, circles and arcs without radius or angle and empty polygons
+    * removes elements which are written exactly like another element on the same layer
+
+    Pads, texts and models are never changed. Merged lines are written at the position of the first line of the
+    merge, all other elements keep their order.
+
+    The ``KicadFileHandler`` runs the optimizer when it is called with ``optimize=True``, or for all files when
+    ``KicadFileHandler.optimize_geometry`` is set.
+
+    :param tolerance:
+        maximum distance between a line and the line it is merged into (default: 1e-6)
+    :type tolerance: ``float``
+
+    :Example:
+
+    >>> from KicadModTree import *
+    >>> optimizer = GeometryOptimizer()
+    >>> elements = optimizer.optimize([['fp_line', ['start', 0, 0], ['end', 1, 0], ['layer', 'F.SilkS']],
+    ...                                ['fp_line', ['start', 1, 0], ['end', 2, 0], ['layer', 'F.SilkS']]])
+    >>> print(optimizer.removed_elements)
+    1
+    """
+
+    def __init__(self, tolerance=1e-6):
+        self.tolerance = tolerance
+
+        self.merged_lines = 0
+        self.removed_degenerated = 0
+        self.removed_duplicates = 0
+
+    @property
+    def removed_elements(self):
+        r"""number of elements removed by all optimizations so far"""
+        return self.merged_lines + self.removed_degenerated + self.removed_duplicates
+
+    def optimize(self, elements):
+        r"""Optimize a list of serialized elements
+
+        :param elements: list of sexpr lists, like the top level elements of a .kicad_mod file
+        :return: the list of optimized elements
+        """
+        elements, keys = self._removeRedundantElements(elements)
+        return self._mergeLines(elements, keys)
+
+    def _removeRedundantElements(self, elements):
+        seen_keys = set()
+        result = []
+        result_keys = []
+        for sexpr in elements:
+            if sexpr[0] not in GRAPHIC_ELEMENTS:
+                result.append(sexpr)
+                result_keys.append(None)
+                continue
+
+            key = _elementKey(sexpr)
+            if _isDegenerate(key):
+                self.removed_degenerated += 1
+            elif key in seen_keys:
+                self.removed_duplicates += 1
+            else:
+                seen_keys.add(key)
+                result.append(sexpr)
+                result_keys.append(key)
+        return result, result_keys
+
+    def _mergeLines(self, elements, keys):
+        # candidates for a merge have the same layer, width, direction and offset
+        groups = {}
+        offset_precision = max(self.tolerance, 1e-9) * 10
+        for index, sexpr in enumerate(elements):
+            if sexpr[0] != 'fp_line':
+                continue
+            segment = _Segment(index, sexpr)
+            key = (keys[index][3:], _segmentGroupKey(segment, angle_precision=1e-4, offset_precision=offset_precision))
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [segment]
+            else:
+                group.append(segment)
+
+        replacements = {}
+        for segments in groups.values():
+            if len(segments) > 1:
+                self._mergeSegments(segments, replacements)
+
+        if not replacements:
+            return elements
+
+        result = []
+        for index, sexpr in enumerate(elements):
+            replacement = replacements.get(index, sexpr)
+            if replacement is not None:
+                result.append(replacement)
+        return result
+
+    def _mergeSegments(self, segments, replacements):
+        # project all segments onto the direction of the longest one and merge overlapping runs
+        longest = max(segments, key=lambda s: math.hypot(s.end[0] - s.start[0], s.end[1] - s.start[1]))
+        (x1, y1), (x2, y2) = longest.start, longest.end
+        length = math.hypot(x2 - x1, y2 - y1)
+        if length == 0:
+            return
+        dx = (x2 - x1) / length
+        dy = (y2 - y1) / length
+
+        def project(point):
+            return (point[0] - x1) * dx + (point[1] - y1) * dy
+
+        for segment in segments:
+            start_t, end_t = project(segment.start), project(segment.end)
+            if start_t <= end_t:
+                segment.low, segment.high = (start_t, segment.start), (end_t, segment.end)
+            else:
+                segment.low, segment.high = (end_t, segment.end), (start_t, segment.start)
+        segments.sort(key=lambda s: (s.low[0], s.index))
+
+        run = [segments[0]]
+        low, high = segments[0].low, segments[0].high
+        for segment in segments[1:]:
+            if (segment.low[0] <= high[0] + self.tolerance and
+                    high[0] - low[0] > 0 and
+                    _lineDistance(segment.start, low[1], high[1]) <= self.tolerance and
+                    _lineDistance(segment.end, low[1], high[1]) <= self.tolerance):
+                run.append(segment)
+                if segment.high[0] > high[0]:
+                    high = segment.high
+            else:
+                self._finishRun(run, low, high, replacements)
+                run = [segment]
+                low, high = segment.low, segment.high
+        self._finishRun(run, low, high, replacements)
+
+    def _finishRun(self, run, low, high, replacements):
+        if len(run) == 1:
+            return
+
+        # the merged line replaces the first line of the run and keeps its direction
+        first = min(run, key=lambda s: s.index)
+        if first.low[1] is first.start:
+            start, end = low[1], high[1]
+        else:
+            start, end = high[1], low[1]
+        replacements[first.index] = ['fp_line', ['start', start[0], start[1]], ['end', end[0], end[1]]] + \
+            first.sexpr[3:]
+
+        for segment in run:
+            if segment is not first:
+                replacements[segment.index] = None
+        self.merged_lines += len(run) - 1
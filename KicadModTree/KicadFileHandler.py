@@ -13,13 +13,19 @@
 #
 # (C) 2016-2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import re
+from itertools import chain
+
 from KicadModTree.FileHandler import FileHandler
+from KicadModTree.GeometryOptimizer import GeometryOptimizer
+from KicadModTree.Profiler import Profiler
 from KicadModTree.util.kicad_util import *
 from KicadModTree.nodes.base.Pad import Pad  # TODO: why .KicadModTree is not enough?
 from KicadModTree.nodes.base.Arc import Arc
 from KicadModTree.nodes.base.Circle import Circle
 from KicadModTree.nodes.base.Line import Line
 from KicadModTree.nodes.base.Polygon import Polygon
+from KicadModTree.nodes.specialized.PadGrid import PadGrid
 
 
 DEFAULT_LAYER_WIDTH = {'F.SilkS': 0.12,
@@ -34,6 +40,16 @@ DEFAULT_WIDTH_POLYGON_PAD = 0
 DEFAULT_WIDTH = 0.15
 
 
+# base nodes which are serialized, in the order they are written into the file
+BASE_NODE_TYPES = ('Arc', 'Circle', 'Line', 'Pad', 'Polygon', 'Text')
+
+# nodes which are serialized together with the group of another node type
+GROUPED_NODE_TYPES = {'PadGrid': 'Pad'}
+
+# edit timestamp of the footprint, ignored when comparing the output with an existing file
+_TEDIT_REGEX = re.compile(r'\(tedit [0-9A-Fa-f]+\)')
+
+
 def _get_layer_width(layer, width=None):
     if width is not None:
         return width
@@ -41,6 +57,43 @@ def _get_layer_width(layer, width=None):
         return DEFAULT_LAYER_WIDTH.get(layer, DEFAULT_WIDTH)
 
 
+def _order_nodes(nodes, initial_texts=True, models=True):
+    '''
+    group nodes by their class name in a single pass and return them in serialization order
+
+    The order is: reference texts, value texts (both only if initial_texts is set), base nodes sorted by their
+    class name and finally 3D models (if models is set). Inside each group the original order is kept.
+    '''
+    grouped_nodes = {}
+    reference_nodes = []
+    value_nodes = []
+
+    for node in nodes:
+        node_type = node.__class__.__name__
+        node_type = GROUPED_NODE_TYPES.get(node_type, node_type)
+
+        if initial_texts and node_type == 'Text':
+            if node.type == 'reference':
+                reference_nodes.append(node)
+                continue
+            if node.type == 'value':
+                value_nodes.append(node)
+                continue
+
+        current_nodes = grouped_nodes.get(node_type)
+        if current_nodes is None:
+            grouped_nodes[node_type] = [node]
+        else:
+            current_nodes.append(node)
+
+    ordered_groups = [reference_nodes, value_nodes]
+    ordered_groups.extend(grouped_nodes.get(node_type, ()) for node_type in BASE_NODE_TYPES)
+    if models:
+        ordered_groups.append(grouped_nodes.get('Model', ()))
+
+    return chain.from_iterable(ordered_groups)
+
+
 class KicadFileHandler(FileHandler):
     r"""Implementation of the FileHandler for .kicad_mod files
 
@@ -56,12 +109,27 @@ class KicadFileHandler(FileHandler):
     >>> file_handler.writeFile('example_footprint.kicad_mod')
     """
 
+    # default for the optimize option of serialize, writeStream and writeFile
+    optimize_geometry = False
+
+    # number of elements removed by the geometry optimization of all files
+    removed_elements = 0
+
     def __init__(self, kicad_mod):
         FileHandler.__init__(self, kicad_mod)
 
+    @Profiler.profiled('serialize')
     def serialize(self, **kwargs):
         r"""Get a valid string representation of the footprint in the .kicad_mod format
 
+        :Keyword Arguments:
+            * *timestamp* (``int``) --
+              edit timestamp written into the file (default: current time)
+            * *optimize* (``bool``) --
+              merge collinear lines and remove degenerated and duplicated graphic elements before the output is
+              written, see ``GeometryOptimizer``. The number of removed elements is added to
+              ``KicadFileHandler.removed_elements``. (default: ``KicadFileHandler.optimize_geometry``)
+
         :Example:
 
         >>> from KicadModTree import *
@@ -70,6 +138,30 @@ class KicadFileHandler(FileHandler):
         >>> print(file_handler.serialize())
         """
 
+        return str(SexprSerializer(self._serializeFootprint(**kwargs)))
+
+    @Profiler.profiled('serialize')
+    def writeStream(self, stream, **kwargs):
+        r"""Write the footprint in the .kicad_mod format into a text stream
+
+        The output is generated and written node by node, without building the whole file in memory.
+
+        :Example:
+
+        >>> import sys
+        >>> from KicadModTree import *
+        >>> kicad_mod = Footprint("example_footprint")
+        >>> file_handler = KicadFileHandler(kicad_mod)
+        >>> file_handler.writeStream(sys.stdout)
+        """
+
+        SexprSerializer(self._serializeFootprint(**kwargs)).write(stream)
+
+    def _isEquivalentOutput(self, existing, output):
+        # the edit timestamp is set to the current time on every run, it does not represent a change of the footprint
+        return _TEDIT_REGEX.sub('', existing, count=1) == _TEDIT_REGEX.sub('', output, count=1)
+
+    def _serializeFootprint(self, **kwargs):
         sexpr = ['module', self.kicad_mod.name,
                  ['layer', 'F.Cu'],
                  ['tedit', formatTimestamp(kwargs.get('timestamp'))],
@@ -100,68 +192,57 @@ class KicadFileHandler(FileHandler):
             sexpr.append(['solder_paste_ratio', self.kicad_mod.pasteMarginRatio])
             sexpr.append(SexprSerializer.NEW_LINE)
 
-        sexpr.extend(self._serializeTree())
-
-        return str(SexprSerializer(sexpr))
-
-    def _serializeTree(self):
-        nodes = self.kicad_mod.serialize()
-
-        grouped_nodes = {}
-
-        for single_node in nodes:
-            node_type = single_node.__class__.__name__
-
-            current_nodes = grouped_nodes.get(node_type, [])
-            current_nodes.append(single_node)
-
-            grouped_nodes[node_type] = current_nodes
-
-        sexpr = []
-
-        # serialize initial text nodes
-        if 'Text' in grouped_nodes:
-            reference_nodes = list(filter(lambda node: node.type == 'reference', grouped_nodes['Text']))
-            for node in reference_nodes:
-                sexpr.append(self._serialize_Text(node))
-                sexpr.append(SexprSerializer.NEW_LINE)
-                grouped_nodes['Text'].remove(node)
-
-            value_nodes = list(filter(lambda node: node.type == 'value', grouped_nodes['Text']))
-            for node in value_nodes:
-                sexpr.append(self._serialize_Text(node))
-                sexpr.append(SexprSerializer.NEW_LINE)
-                grouped_nodes['Text'].remove(node)
-
-        for key, value in sorted(grouped_nodes.items()):
-            # check if key is a base node, except Model
-            if key not in {'Arc', 'Circle', 'Line', 'Pad', 'Polygon', 'Text'}:
+        elements = self._serializeElements()
+        if kwargs.get('optimize', self.optimize_geometry):
+            # the optimization needs all elements at once
+            optimizer = GeometryOptimizer()
+            elements = optimizer.optimize(list(elements))
+            KicadFileHandler.removed_elements += optimizer.removed_elements
+
+        # without optimization, the tree is serialized lazily while the output is written
+        return chain(sexpr, self._serializeTree(elements))
+
+    def _serializeTree(self, elements):
+        for sexpr in elements:
+            yield sexpr
+            yield SexprSerializer.NEW_LINE
+
+    def _serializeElements(self):
+        call_serialize = self._callSerialize
+
+        for node in _order_nodes(self.kicad_mod.walk()):
+            if isinstance(node, PadGrid):
+                # a pad grid is serialized into one entry per pad
+                for sexpr in self._serialize_PadGrid(node):
+                    yield sexpr
                 continue
 
-            # render base nodes
-            for node in value:
-                sexpr.append(self._callSerialize(node))
-                sexpr.append(SexprSerializer.NEW_LINE)
+            yield call_serialize(node)
 
-        # serialize 3D Models at the end
-        if grouped_nodes.get('Model'):
-            for node in grouped_nodes.get('Model'):
-                sexpr.append(self._serialize_Model(node))
-                sexpr.append(SexprSerializer.NEW_LINE)
+    # serialize methods resolved per (file handler class, node class)
+    _serialize_methods = {}
 
-        return sexpr
+    def _getSerializeMethod(self, node_class):
+        '''
+        get the (cached) method to serialize nodes of the given class
+        '''
+        key = (self.__class__, node_class)
+        method = KicadFileHandler._serialize_methods.get(key)
+        if method is None:
+            method_type = node_class.__name__
+            method_name = "_serialize_{0}".format(method_type)
+            method = getattr(self.__class__, method_name, None)
+            if method is None:
+                exception_string = "{name} (node) not found, cannot serialized the node of type {type}"
+                raise NotImplementedError(exception_string.format(name=method_name, type=method_type))
+            KicadFileHandler._serialize_methods[key] = method
+        return method
 
     def _callSerialize(self, node):
         '''
         call the corresponding method to serialize the node
         '''
-        method_type = node.__class__.__name__
-        method_name = "_serialize_{0}".format(method_type)
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(node)
-        else:
-            exception_string = "{name} (node) not found, cannot serialized the node of type {type}"
-            raise NotImplementedError(exception_string.format(name=method_name, type=method_type))
+        return self._getSerializeMethod(node.__class__)(self, node)
 
     def _serialize_ArcPoints(self, node):
         # in KiCAD, some file attributes of Arc are named not in the way of their real meaning
@@ -212,9 +293,6 @@ class KicadFileHandler(FileHandler):
                ]
 
     def _serialize_Line(self, node):
-        start_pos = node.getRealPosition(node.start_pos)
-        end_pos = node.getRealPosition(node.end_pos)
-
         sexpr = ['fp_line']
         sexpr += self._serialize_LinePoints(node)
         sexpr += [
@@ -263,55 +341,56 @@ class KicadFileHandler(FileHandler):
         return sexpr
 
     def _serialize_CustomPadPrimitives(self, pad):
-        all_primitives = []
-        for p in pad.primitives:
-            all_primitives.extend(p.serialize())
-
-        grouped_nodes = {}
-
-        for single_node in all_primitives:
-            node_type = single_node.__class__.__name__
-
-            current_nodes = grouped_nodes.get(node_type, [])
-            current_nodes.append(single_node)
-
-            grouped_nodes[node_type] = current_nodes
-
         sexpr_primitives = []
 
-        for key, value in sorted(grouped_nodes.items()):
-            # check if key is a base node, except Model
-            if key not in {'Arc', 'Circle', 'Line', 'Pad', 'Polygon', 'Text'}:
-                continue
-
-            # render base nodes
-            for p in value:
-                if isinstance(p, Polygon):
-                    sp = ['gr_poly',
-                          self._serialize_PolygonPoints(p, newline_after_pts=True)
-                         ]  # NOQA
-                elif isinstance(p, Line):
-                    sp = ['gr_line'] + self._serialize_LinePoints(p)
-                elif isinstance(p, Circle):
-                    sp = ['gr_circle'] + self._serialize_CirclePoints(p)
-                elif isinstance(p, Arc):
-                    sp = ['gr_arc'] + self._serialize_ArcPoints(p)
-                else:
-                    raise TypeError('Unsuported type of primitive for custom pad.')
-                sp.append(['width', DEFAULT_WIDTH_POLYGON_PAD if p.width is None else p.width])
-                sexpr_primitives.append(sp)
-                sexpr_primitives.append(SexprSerializer.NEW_LINE)
+        primitives = chain.from_iterable(p.walk() for p in pad.primitives)
+        for p in _order_nodes(primitives, initial_texts=False, models=False):
+            if isinstance(p, Polygon):
+                sp = ['gr_poly',
+                      self._serialize_PolygonPoints(p, newline_after_pts=True)
+                     ]  # NOQA
+            elif isinstance(p, Line):
+                sp = ['gr_line'] + self._serialize_LinePoints(p)
+            elif isinstance(p, Circle):
+                sp = ['gr_circle'] + self._serialize_CirclePoints(p)
+            elif isinstance(p, Arc):
+                sp = ['gr_arc'] + self._serialize_ArcPoints(p)
+            else:
+                raise TypeError('Unsuported type of primitive for custom pad.')
+            sp.append(['width', DEFAULT_WIDTH_POLYGON_PAD if p.width is None else p.width])
+            sexpr_primitives.append(sp)
+            sexpr_primitives.append(SexprSerializer.NEW_LINE)
 
         return sexpr_primitives
 
     def _serialize_Pad(self, node):
-        sexpr = ['pad', node.number, node.type, node.shape]
-
         position, rotation = node.getRealPosition(node.at, node.rotation)
+        return self._serializePad(node, node.number, position.x, position.y, rotation)
+
+    def _serialize_PadGrid(self, node):
+        '''
+        serialize all pads of the grid, without creating a Pad object for every one of them
+        '''
+        pad = node.pad
+        matrix, rotation = node.getTransformation()
+        rotation += pad.rotation
+
+        for number, x, y in node.iterPads():
+            if matrix is not None:
+                a, b, c, d, e, f = matrix
+                x, y = a*x + b*y + c, d*x + e*y + f
+            yield self._serializePad(pad, number, x, y, rotation)
+
+    def _serializePad(self, node, number, x, y, rotation):
+        '''
+        serialize a pad with the properties of node at the given (already transformed) position
+        '''
+        sexpr = ['pad', number, node.type, node.shape]
+
         if not rotation % 360 == 0:
-            sexpr.append(['at', position.x, position.y, rotation])
+            sexpr.append(['at', x, y, rotation])
         else:
-            sexpr.append(['at', position.x, position.y])
+            sexpr.append(['at', x, y])
 
         sexpr.append(['size', node.size.x, node.size.y])
 
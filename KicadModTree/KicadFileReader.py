@@ -0,0 +1,284 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import io
+import math
+import mmap
+
+from KicadModTree.util.kicad_util import parseSexpr
+from KicadModTree.nodes.Footprint import Footprint
+from KicadModTree.nodes.base.Arc import Arc
+from KicadModTree.nodes.base.Circle import Circle
+from KicadModTree.nodes.base.Line import Line
+from KicadModTree.nodes.base.Model import Model
+from KicadModTree.nodes.base.Pad import Pad
+from KicadModTree.nodes.base.Polygon import Polygon
+from KicadModTree.nodes.base.Text import Text
+
+
+def readSexprFile(filename):
+    r"""Parse a file containing a sexpr (like a .kicad_mod file) into nested lists of strings
+
+    The file is memory mapped and tokenized in place.
+
+    :return: list of all top level expressions
+    """
+    with io.open(filename, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return []  # empty file, which cannot be mapped
+        try:
+            return parseSexpr(data)
+        finally:
+            data.close()
+
+
+def _attributes(sexpr):
+    '''
+    get all sub expressions of a sexpr by their name. If a name occurs multiple times, the first one is used.
+    '''
+    attributes = {}
+    for item in sexpr:
+        if type(item) is list and item and item[0] not in attributes:
+            attributes[item[0]] = item
+    return attributes
+
+
+def _xy(item):
+    return [float(item[1]), float(item[2])]
+
+
+def _xyz(item):
+    if item is None:
+        return None
+    xyz = _attributes(item).get('xyz')
+    return [float(xyz[1]), float(xyz[2]), float(xyz[3])]
+
+
+def _width(attributes):
+    width = attributes.get('width')
+    return float(width[1]) if width else None
+
+
+class KicadFileReader(object):
+    r"""Read footprints in the .kicad_mod format into a tree of KicadModTree nodes
+
+    All elements are created as direct children of the footprint, using their absolute position. Elements and
+    attributes which are not represented by KicadModTree nodes are skipped.
+
+    For an analysis which does not need node objects, ``readSexprFile`` is faster as it only returns nested lists.
+
+    :Example:
+
+    >>> from KicadModTree import *
+    >>> kicad_mod = KicadFileReader().readFile('example_footprint.kicad_mod')
+    >>> print(kicad_mod.name)
+    """
+
+    # parse methods resolved per (file reader class, element name)
+    _parse_methods = {}
+
+    def readFile(self, filename):
+        r"""Read a footprint from a .kicad_mod file
+
+        :param filename:
+            path of the input file
+        :type filename: ``str``
+
+        :return: ``Footprint``
+        """
+        sexpr = readSexprFile(filename)
+        if not sexpr:
+            raise ValueError("{} does not contain a footprint".format(filename))
+        return self.parseSexpr(sexpr[0])
+
+    def parse(self, data):
+        r"""Read a footprint from a string or bytes in the .kicad_mod format
+
+        :return: ``Footprint``
+        """
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+
+        sexpr = parseSexpr(data)
+        if not sexpr:
+            raise ValueError("input does not contain a footprint")
+        return self.parseSexpr(sexpr[0])
+
+    def parseSexpr(self, sexpr):
+        r"""Create a footprint from an already parsed sexpr (as returned by ``readSexprFile``)
+
+        :return: ``Footprint``
+        """
+        if not sexpr or sexpr[0] != 'module':
+            raise ValueError("expected a module, got {}".format(sexpr[0] if sexpr else 'nothing'))
+
+        kicad_mod = Footprint(sexpr[1])
+
+        for item in sexpr[2:]:
+            if type(item) is not list or not item:
+                continue
+
+            method = self._getParseMethod(item[0])
+            if method is not None:
+                method(self, kicad_mod, item)
+
+        return kicad_mod
+
+    def _getParseMethod(self, name):
+        '''
+        get the (cached) method to parse elements with the given name, None for unsupported elements
+        '''
+        key = (self.__class__, name)
+        try:
+            return KicadFileReader._parse_methods[key]
+        except KeyError:
+            method = getattr(self.__class__, "_parse_{0}".format(name.replace('.', '_')), None)
+            KicadFileReader._parse_methods[key] = method
+            return method
+
+    def _parse_descr(self, kicad_mod, sexpr):
+        kicad_mod.setDescription(sexpr[1])
+
+    def _parse_tags(self, kicad_mod, sexpr):
+        kicad_mod.setTags(sexpr[1])
+
+    def _parse_attr(self, kicad_mod, sexpr):
+        kicad_mod.setAttribute(sexpr[1])
+
+    def _parse_solder_mask_margin(self, kicad_mod, sexpr):
+        kicad_mod.setMaskMargin(float(sexpr[1]))
+
+    def _parse_solder_paste_margin(self, kicad_mod, sexpr):
+        kicad_mod.setPasteMargin(float(sexpr[1]))
+
+    def _parse_solder_paste_ratio(self, kicad_mod, sexpr):
+        kicad_mod.setPasteMarginRatio(float(sexpr[1]))
+
+    def _parse_fp_text(self, kicad_mod, sexpr):
+        attributes = _attributes(sexpr)
+
+        at = attributes['at']
+        font = _attributes(_attributes(attributes.get('effects', [])).get('font', []))
+        size = font.get('size')
+        thickness = font.get('thickness')
+
+        kicad_mod.append(Text(type=sexpr[1], text=sexpr[2],
+                              at=_xy(at), rotation=float(at[3]) if len(at) > 3 else 0,
+                              layer=attributes['layer'][1],
+                              size=_xy(size) if size else [1, 1],
+                              thickness=float(thickness[1]) if thickness else 0.15,
+                              hide='hide' in sexpr[3:]))
+
+    def _parse_fp_line(self, kicad_mod, sexpr):
+        kicad_mod.append(self._createLine(_attributes(sexpr), layer=True))
+
+    def _parse_fp_circle(self, kicad_mod, sexpr):
+        kicad_mod.append(self._createCircle(_attributes(sexpr), layer=True))
+
+    def _parse_fp_arc(self, kicad_mod, sexpr):
+        kicad_mod.append(self._createArc(_attributes(sexpr), layer=True))
+
+    def _parse_fp_poly(self, kicad_mod, sexpr):
+        kicad_mod.append(self._createPolygon(_attributes(sexpr), layer=True))
+
+    def _parse_model(self, kicad_mod, sexpr):
+        attributes = _attributes(sexpr)
+        # KiCad 5 uses offset instead of at
+        at = _xyz(attributes.get('at') or attributes.get('offset')) or [0, 0, 0]
+
+        kicad_mod.append(Model(filename=sexpr[1], at=at,
+                               scale=_xyz(attributes.get('scale')) or [1, 1, 1],
+                               rotate=_xyz(attributes.get('rotate')) or [0, 0, 0]))
+
+    def _parse_pad(self, kicad_mod, sexpr):
+        attributes = _attributes(sexpr)
+
+        at = attributes['at']
+        pad_params = {'number': sexpr[1],
+                      'type': sexpr[2],
+                      'shape': sexpr[3],
+                      'at': _xy(at),
+                      'rotation': float(at[3]) if len(at) > 3 else 0,
+                      'size': _xy(attributes['size']),
+                      'layers': attributes['layers'][1:]}
+
+        drill = attributes.get('drill')
+        if drill:
+            values = [v for v in drill[1:] if type(v) is not list]
+            if values[0] == 'oval':
+                pad_params['drill'] = [float(values[1]), float(values[2] if len(values) > 2 else values[1])]
+            else:
+                pad_params['drill'] = float(values[0])
+            offset = _attributes(drill).get('offset')
+            if offset:
+                pad_params['offset'] = _xy(offset)
+
+        for name in ('roundrect_rratio', 'solder_mask_margin', 'solder_paste_margin', 'solder_paste_margin_ratio'):
+            if name in attributes:
+                pad_params[name] = float(attributes[name][1])
+        if 'roundrect_rratio' in pad_params:
+            pad_params['radius_ratio'] = pad_params.pop('roundrect_rratio')
+
+        if pad_params['shape'] == Pad.SHAPE_CUSTOM:
+            options = _attributes(attributes.get('options', []))
+            if 'clearance' in options:
+                pad_params['shape_in_zone'] = options['clearance'][1]
+            if 'anchor' in options:
+                pad_params['anchor_shape'] = options['anchor'][1]
+            pad_params['primitives'] = self._createPrimitives(attributes.get('primitives', []))
+
+        kicad_mod.append(Pad(**pad_params))
+
+    def _createPrimitives(self, sexpr):
+        primitives = []
+        for item in sexpr[1:]:
+            if type(item) is not list or not item:
+                continue
+
+            attributes = _attributes(item)
+            if item[0] == 'gr_poly':
+                primitives.append(self._createPolygon(attributes))
+            elif item[0] == 'gr_line':
+                primitives.append(self._createLine(attributes))
+            elif item[0] == 'gr_circle':
+                primitives.append(self._createCircle(attributes))
+            elif item[0] == 'gr_arc':
+                primitives.append(self._createArc(attributes))
+
+        return primitives
+
+    def _layer(self, attributes, layer):
+        return {'layer': attributes['layer'][1]} if layer else {}
+
+    def _createLine(self, attributes, layer=False):
+        return Line(start=_xy(attributes['start']), end=_xy(attributes['end']),
+                    width=_width(attributes), **self._layer(attributes, layer))
+
+    def _createCircle(self, attributes, layer=False):
+        center = _xy(attributes['center'])
+        end = _xy(attributes['end'])
+        radius = math.hypot(end[0] - center[0], end[1] - center[1])
+
+        return Circle(center=center, radius=radius, width=_width(attributes), **self._layer(attributes, layer))
+
+    def _createArc(self, attributes, layer=False):
+        # in KiCAD, some file attributes of Arc are named not in the way of their real meaning
+        return Arc(center=_xy(attributes['start']), start=_xy(attributes['end']),
+                   angle=float(attributes['angle'][1]), width=_width(attributes), **self._layer(attributes, layer))
+
+    def _createPolygon(self, attributes, layer=False):
+        points = [_xy(item) for item in attributes['pts'][1:] if type(item) is list and item[0] == 'xy']
+
+        return Polygon(nodes=points, width=_width(attributes), **self._layer(attributes, layer))
@@ -16,12 +16,35 @@
 import sys
 import argparse
 import csv
+import itertools
+import traceback
 
 try:
-    import yaml
-    YAML_AVAILABLE = True
+    from StringIO import StringIO
 except ImportError:
-    YAML_AVAILABLE = False
+    from io import StringIO
+
+from KicadModTree.BuildManifest import BuildManifest
+from KicadModTree.FileHandler import FileHandler
+from KicadModTree.KicadFileHandler import KicadFileHandler
+from KicadModTree.Profiler import Profiler
+
+# pyyaml is imported when it is used for the first time, see _import_yaml
+yaml = None
+
+
+def _import_yaml():
+    r"""Import pyyaml, which takes a noticeable part of the startup time of scripts not parsing definition files
+
+    :return: the yaml module, or ``None`` if pyyaml is not installed
+    """
+    global yaml
+    if yaml is None:
+        try:
+            import yaml
+        except ImportError:
+            pass
+    return yaml
 
 
 class ParserException(Exception):
@@ -29,6 +52,101 @@ class ParserException(Exception):
         Exception.__init__(self, *args, **kwargs)
 
 
+def _iter_yaml_mapping(stream):
+    r"""Iterate over the entries of a yaml document with a mapping at its root, without loading the whole document
+
+    Only the nodes of the current entry are kept in memory. Anchors defined in previous entries stay available.
+
+    The entries are returned while the document is parsed. When the document is invalid, the entries before the error
+    were already returned (and their footprints generated) when ``yaml.YAMLError`` is raised.
+
+    Keys which are defined more than once are returned every time, ``yaml.safe_load`` would only keep the last one.
+    The entries of a merge key at the root (``<<: *defaults``) are returned after all other entries, for the keys
+    which are not defined in the root mapping itself (like ``yaml.safe_load`` does).
+
+    :return: ``(key, value)`` for every entry of the root mapping
+    """
+    _import_yaml()
+    loader = yaml.SafeLoader(stream)
+    try:
+        loader.get_event()  # stream start
+        if loader.check_event(yaml.StreamEndEvent):
+            return  # empty file
+        loader.get_event()  # document start
+
+        if not loader.check_event(yaml.MappingStartEvent):
+            if not loader.check_event(yaml.ScalarEvent) or loader.peek_event().value not in ('', '~', 'null'):
+                raise yaml.YAMLError("root of the document is not a mapping")
+            return  # empty document
+        start_mark = loader.get_event().start_mark
+
+        keys = set()
+        merged = []
+        while not loader.check_event(yaml.MappingEndEvent):
+            key_node = loader.compose_node(None, None)
+            value_node = loader.compose_node(None, None)
+            if key_node.tag == 'tag:yaml.org,2002:merge':
+                merged.extend(_merged_entries(loader, start_mark, value_node))
+                continue
+
+            key = loader.construct_document(key_node)
+            try:
+                keys.add(key)
+            except TypeError:
+                raise yaml.constructor.ConstructorError("while constructing a mapping", start_mark,
+                                                        "found unhashable key", key_node.start_mark)
+            yield key, loader.construct_document(value_node)
+
+        for key, value in merged:
+            if key not in keys:
+                keys.add(key)
+                yield key, value
+    finally:
+        loader.dispose()
+
+
+def _merged_entries(loader, start_mark, node):
+    r"""Entries of the value of a merge key, a mapping or a list of mappings (the first definition of a key wins)"""
+    nodes = node.value if isinstance(node, yaml.SequenceNode) else [node]
+    entries = []
+    for mapping_node in nodes:
+        if not isinstance(mapping_node, yaml.MappingNode):
+            raise yaml.constructor.ConstructorError("while constructing a mapping", start_mark,
+                                                    "expected a mapping or list of mappings for merging",
+                                                    mapping_node.start_mark)
+        entries.extend(loader.construct_document(mapping_node).items())
+    return entries
+
+
+# ModArgparser executing the footprint definitions inside of a worker process (used by --jobs)
+_worker_parser = None
+
+
+def _iter_phase(iterable, phase):
+    r"""Iterate while measuring the time of every step as phase of the ``Profiler``"""
+    iterator = iter(iterable)
+    while True:
+        with Profiler.phase(phase):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def _init_worker(parser, profile=None):
+    global _worker_parser
+    _worker_parser = parser
+
+    # workers which are not forked from the main process do not inherit the enabled profiler
+    if profile is not None and Profiler.active is None:
+        Profiler.enable(*profile)
+
+
+def _execute_task_in_worker(task):
+    return _worker_parser._execute_task(task, in_worker=True)
+
+
 class ModArgparser(object):
     r"""A general data loading class, which allows us to specify parts using .yml or .csv files.
 
@@ -59,6 +177,8 @@ class ModArgparser(object):
     def __init__(self, footprint_function):
         self._footprint_function = footprint_function
         self._params = {}
+        self._manifest = None
+        self._errors = []
 
     def add_parameter(self, name, **kwargs):
         r"""Add a parameter to the ModArgparser
@@ -111,6 +231,22 @@ class ModArgparser(object):
         parser.add_argument('-v', '--verbose', help='show some additional information', action='store_true')  # TODO
         parser.add_argument('--print_yml', help='print example .yml file', action='store_true')
         parser.add_argument('--print_csv', help='print example .csv file', action='store_true')
+        parser.add_argument('--incremental', action='store_true',
+                            help='only create footprints whose definition or generator changed since the last run')
+        parser.add_argument('--only_changed', action='store_true',
+                            help='do not rewrite footprint files whose content did not change (ignoring the timestamp)')
+        parser.add_argument('--optimize', action='store_true',
+                            help='merge collinear lines and remove degenerated and duplicated graphic elements')
+        parser.add_argument('--profile', type=str, metavar='FILE',
+                            help='append the time, node count and size of every footprint to this JSON lines file')
+        parser.add_argument('--profile_capture', choices=Profiler._CAPTURE_TYPES, action='append',
+                            help='additionally capture the slowest functions or the allocated memory per footprint')
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='number of footprints generated in parallel (default: 1)')
+        parser.add_argument('--offset', type=int, default=0,
+                            help='skip the first footprint definitions of every file (to split files across machines)')
+        parser.add_argument('--limit', type=int,
+                            help='maximum number of footprint definitions generated from every file')
 
         # TODO: allow writing into sub dir
 
@@ -128,41 +264,109 @@ class ModArgparser(object):
             parser.print_help()
             return
 
-        for filepath in args.files:
-            print("use file: {0}".format(filepath))
-            if filepath.endswith('.yml') or filepath.endswith('.yaml'):
-                self._parse_and_execute_yml(filepath)
-            elif filepath.endswith('.csv'):
-                self._parse_and_execute_csv(filepath)
-            else:
-                print("unexpected filetype: {0}".format(filepath))
+        if args.incremental:
+            self._manifest = BuildManifest()
+
+        if args.only_changed:
+            FileHandler.only_write_changed = True
 
-    def _parse_and_execute_yml(self, filepath):
-        if not YAML_AVAILABLE:
+        if args.optimize:
+            KicadFileHandler.optimize_geometry = True
+
+        profile = None
+        if args.profile:
+            profile = (args.profile, args.profile_capture)
+            Profiler.enable(*profile)
+
+        pool = None
+        if args.jobs > 1:
+            import multiprocessing  # imported here to keep the import of KicadModTree fast
+            pool = multiprocessing.Pool(args.jobs, initializer=_init_worker, initargs=(self, profile))
+
+        try:
+            for filepath in args.files:
+                print("use file: {0}".format(filepath))
+                if filepath.endswith('.yml') or filepath.endswith('.yaml'):
+                    rows = self._parse_yml(filepath)
+                elif filepath.endswith('.csv'):
+                    rows = self._parse_csv(filepath)
+                else:
+                    print("unexpected filetype: {0}".format(filepath))
+                    continue
+
+                if args.offset or args.limit is not None:
+                    stop = None if args.limit is None else args.offset + args.limit
+                    rows = itertools.islice(rows, args.offset, stop)
+
+                if Profiler.active is not None and pool is None:
+                    # definitions are parsed while the footprints are created, every entry is added to its footprint
+                    rows = _iter_phase(rows, 'config')
+
+                tasks = (self._create_task(filepath, name, kwargs, error) for name, kwargs, error in rows)
+                if pool is None:
+                    results = (self._execute_task(task) for task in tasks)
+                else:
+                    # results are returned in the order of the definitions, so the output stays the same
+                    results = pool.imap(_execute_task_in_worker, tasks)
+
+                for task, result in results:
+                    self._finish_task(task, result)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            if self._manifest is not None:
+                self._manifest.save()
+                print("{built} footprint definitions built, {skipped} up to date".format(
+                    built=self._manifest.built, skipped=self._manifest.skipped))
+            if args.only_changed:
+                print("{skipped} unchanged footprint files not written".format(skipped=FileHandler.skipped_writes))
+            if args.optimize:
+                print("{removed} graphic elements removed by the optimization".format(
+                    removed=KicadFileHandler.removed_elements))
+            if args.profile:
+                Profiler.disable()
+                print("profile written to {path}".format(path=args.profile))
+
+        if self._errors:
+            print("{count} footprint definitions failed:".format(count=len(self._errors)))
+            for key, error in self._errors:
+                print("  - {key}: {error}".format(key=key, error=error))
+            sys.exit(1)
+
+    def _parse_yml(self, filepath):
+        if _import_yaml() is None:
             print("pyyaml not available!")
             sys.exit(1)
 
+        # the file is parsed entry by entry, so footprints are created while the rest of the file is still parsed
         with open(filepath, 'r') as stream:
+            empty = True
+            footprints = set()
             try:
-                parsed = yaml.safe_load(stream)  # parse file
-
-                if parsed is None:
-                    print("empty file!")
-                    return
+                for footprint, kwargs in _iter_yaml_mapping(stream):
+                    empty = False
 
-                for footprint in parsed:
-                    kwargs = parsed.get(footprint)
+                    # the first definition was already generated, the file has to be fixed
+                    if footprint in footprints:
+                        yield footprint, kwargs, "footprint is defined more than once in this file!"
+                        continue
+                    footprints.add(footprint)
 
                     # name is a reserved key
                     if 'name' in kwargs:
-                        print("ERROR: name is already used for root name!")
+                        yield footprint, kwargs, "name is already used for root name!"
                         continue
                     kwargs['name'] = footprint
 
-                    self._execute_script(**kwargs)  # now we can execute the script
-
+                    yield footprint, kwargs, None
             except yaml.YAMLError as exc:
                 print(exc)
+                self._errors.append((filepath, "invalid yaml file"))
+                return
+
+        if empty:
+            print("empty file!")
 
     def _create_example_data_required(self, **kwargs):
         params = {}
@@ -199,7 +403,7 @@ class ModArgparser(object):
             return "??"
 
     def _print_example_yml(self):
-        if not YAML_AVAILABLE:
+        if _import_yaml() is None:
             print("pyyaml not available!")
             sys.exit(1)
 
@@ -207,20 +411,24 @@ class ModArgparser(object):
                 'footprint_full': self._create_example_data_full()}
         print(yaml.dump(data, default_flow_style=False))
 
-    def _parse_and_execute_csv(self, filepath):
+    def _parse_csv(self, filepath):
         with open(filepath, 'r') as stream:
             # dialect = csv.Sniffer().sniff(stream.read(1024))  # check which type of formating the csv file likel has
             # stream.seek(0)
 
-            reader = csv.DictReader(stream, dialect=csv.excel)  # parse file
+            reader = csv.reader(stream, dialect=csv.excel)  # parse file
+
+            # we wan't to remove spaces before and after the fields
+            fieldnames = [k.strip() for k in next(reader, [])]
 
+            index = 0
             for row in reader:
-                # we wan't to remove spaces before and after the fields
-                kwargs = {}
-                for k, v in row.items():
-                    kwargs[k.strip()] = v.strip()
+                if not row:
+                    continue  # empty line
 
-                self._execute_script(**kwargs)  # now we can execute the script
+                kwargs = dict(zip(fieldnames, [v.strip() for v in row]))
+                yield kwargs.get('name') or index, kwargs, None
+                index += 1
 
     def _print_example_csv(self):
         writer = csv.DictWriter(sys.stdout, fieldnames=self._params.keys())
@@ -229,9 +437,74 @@ class ModArgparser(object):
         writer.writerow(self._create_example_data_required(include_name=True))
         writer.writerow(self._create_example_data_full(include_name=True))
 
+    def _create_task(self, filepath, name, kwargs, error):
+        task = {'key': "{filepath}/{name}".format(filepath=filepath, name=name),
+                'kwargs': kwargs,
+                'error': error,
+                'input_hash': None,
+                'up_to_date': False}
+
+        if self._manifest is not None and error is None:
+            task['input_hash'] = self._manifest.inputHash(kwargs)
+            task['up_to_date'] = self._manifest.isUpToDate(task['key'], task['input_hash'])
+
+        return task
+
+    def _execute_task(self, task, in_worker=False):
+        r"""Execute a single footprint definition
+
+        Inside of a worker process, the output is captured to be printed by the main process in the right order.
+
+        :return: the task and a dict with the error (``None`` on success), the printed output, the written files,
+            the number of skipped writes and the number of elements removed by the optimization
+        """
+        result = {'error': None, 'output': '', 'outputs': [], 'skipped_writes': 0, 'removed_elements': 0}
+        if task['up_to_date']:
+            return task, result
+
+        if in_worker:
+            stdout = sys.stdout
+            sys.stdout = StringIO()
+
+        listener = result['outputs'].append
+        FileHandler._write_listeners.append(listener)
+        skipped_writes = FileHandler.skipped_writes
+        removed_elements = KicadFileHandler.removed_elements
+        try:
+            if task['error'] is not None:
+                print("ERROR: {}".format(task['error']))
+                result['error'] = task['error']
+            else:
+                result['error'] = self._execute_script(**task['kwargs'])
+        except Exception as e:
+            traceback.print_exc(file=sys.stdout)
+            result['error'] = "{type}: {error}".format(type=type(e).__name__, error=e)
+        finally:
+            FileHandler._write_listeners.remove(listener)
+            if in_worker:
+                result['output'] = sys.stdout.getvalue()
+                result['skipped_writes'] = FileHandler.skipped_writes - skipped_writes
+                result['removed_elements'] = KicadFileHandler.removed_elements - removed_elements
+                sys.stdout = stdout
+
+        return task, result
+
+    def _finish_task(self, task, result):
+        sys.stdout.write(result['output'])
+        FileHandler.skipped_writes += result['skipped_writes']
+        KicadFileHandler.removed_elements += result['removed_elements']
+
+        if task['up_to_date']:
+            print("  - {name}.kicad_mod is up to date".format(name=task['kwargs'].get('name', '<anon>')))
+            self._manifest.skipped += 1
+        elif result['error'] is not None:
+            self._errors.append((task['key'], result['error']))
+        elif self._manifest is not None:
+            self._manifest.record(task['key'], task['input_hash'], result['outputs'])
+
     def _execute_script(self, **kwargs):
         parsed_args = {}
-        error = False
+        errors = []
 
         for k, v in self._params.items():
             try:
@@ -252,12 +525,12 @@ class ModArgparser(object):
                     else:
                         parsed_args[k] = type(v.get('default'))
             except (ValueError, ParserException) as e:
-                error = True
+                errors.append(str(e))
                 print("ERROR: {}".format(e))
 
         print("  - generate {name}.kicad_mod".format(name=kwargs.get('name', '<anon>')))
 
-        if error:
-            return
+        if errors:
+            return ', '.join(errors)
 
         self._footprint_function(parsed_args)
@@ -21,6 +21,8 @@ from math import sqrt
 
 
 class Point2D(Vector2D):
+    __slots__ = ()
+
     def __init__(self, coordinates=None, y=None):
         Vector2D.__init__(self, coordinates, y)
         warnings.warn(
@@ -30,6 +32,8 @@ class Point2D(Vector2D):
 
 
 class Point3D(Vector3D):
+    __slots__ = ()
+
     def __init__(self, coordinates=None, y=None, z=None):
         Vector3D.__init__(self, coordinates, y, z)
         warnings.warn(
@@ -39,6 +43,8 @@ class Point3D(Vector3D):
 
 
 class Point(Vector3D):
+    __slots__ = ()
+
     def __init__(self, coordinates=None, y=None, z=None):
         Vector3D.__init__(self, coordinates, y, z)
         warnings.warn(
@@ -14,10 +14,11 @@
 # (C) 2016-2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 # (C) 2018 by Rene Poeschl, github @poeschlr
 
+import bisect
 import warnings
 
 from KicadModTree.Vector import Vector2D
-from KicadModTree.nodes.Node import Node
+from KicadModTree.util.geometric_util import pointsBoundingBox
 
 
 class PolygonPoints(object):
@@ -74,15 +75,12 @@ class PolygonPoints(object):
             self.mirror[1] = kwargs['y_mirror']
 
     def calculateBoundingBox(self):
-        min = max = self.getRealPosition(self.nodes[0])
+        r"""Bounding box of the points
 
-        for n in self.nodes:
-            min.x = min([min.x, n.x])
-            min.y = min([min.y, n.y])
-            max.x = max([max.x, n.x])
-            max.y = max([max.y, n.y])
-
-        return Node.calculateBoundingBox({'min': min, 'max': max})
+        :return: ``{'min': Vector2D, 'max': Vector2D}``
+        """
+        min_x, min_y, max_x, max_y = pointsBoundingBox(self.nodes)
+        return {'min': Vector2D(min_x, min_y), 'max': Vector2D(max_x, max_y)}
 
     def findNearestPoints(self, other):
         r""" Find the nearest points for two polygons
@@ -95,16 +93,29 @@ class PolygonPoints(object):
                  (pint in self, point in other)
         """
 
+        # the points of the other polygon are sorted by x, so only points whose x distance is smaller than the
+        # best distance found so far have to be checked
+        other_order = sorted(range(len(other)), key=lambda j: other[j].x)
+        other_xs = [other[j].x for j in other_order]
+
         min_distance = self[0].distance_to(other[0])
         pi = 0
         pj = 0
         for i in range(len(self)):
-            for j in range(len(other)):
-                d = self[i].distance_to(other[j])
-                if d < min_distance:
-                    pi = i
-                    pj = j
-                    min_distance = d
+            point = self[i]
+            start = bisect.bisect_left(other_xs, point.x)
+            for direction, indexes in ((1, range(start, len(other_order))), (-1, range(start - 1, -1, -1))):
+                for k in indexes:
+                    # the margin makes sure rounding never skips a point with the same distance
+                    if direction * (other_xs[k] - point.x) > min_distance * (1 + 1e-12) + 1e-12:
+                        break
+                    j = other_order[k]
+                    d = point.distance_to(other[j])
+                    # keep the first pair (by index) in case of equal distances
+                    if d < min_distance or (d == min_distance and (i, j) < (pi, pj)):
+                        pi = i
+                        pj = j
+                        min_distance = d
 
         return (pi, pj)
 
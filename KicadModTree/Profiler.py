@@ -0,0 +1,308 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import atexit
+import contextlib
+import functools
+import io
+import json
+import os
+import sys
+import timeit
+import weakref
+
+_clock = timeit.default_timer
+
+
+class _FootprintRecord(object):
+    __slots__ = ('name', 'start', 'phases', 'before', 'profile', 'memory_start')
+
+    def __init__(self, name, start, phases=None):
+        self.name = name
+        self.start = start
+        self.phases = dict(phases or {})
+        self.before = sum(self.phases.values())  # time of the phases measured before the footprint was created
+        self.profile = None
+        self.memory_start = None
+
+
+class Profiler(object):
+    r"""Opt-in instrumentation of the footprint generation, which writes one JSON line per written footprint
+
+    A footprint is measured from the creation of its ``Footprint`` until it was written by ``FileHandler.writeFile``.
+    The time is split into phases: ``serialize`` (``KicadFileHandler.serialize`` and ``writeStream``), ``write``
+    (the rest of ``writeFile``), phases measured by the generator itself using ``Profiler.phase`` or
+    ``Profiler.profiled``, and ``build`` for the remaining time. Phases measured outside of a footprint (like loading
+    the configuration before the first footprint is created) are added to the next footprint. When a footprint is
+    written using ``writeStream``, serializing and writing can not be separated and both are counted as serialize.
+
+    Every line contains the name of the footprint, the written file, the generator script, the time of all phases,
+    the number of nodes of the footprint and the size of the written file. Optionally, the functions with the
+    highest cumulative time (``cprofile``) and the memory allocated while the footprint was generated
+    (``tracemalloc``) are captured as well.
+
+    Profiling is enabled by ``Profiler.enable``, the ``--profile`` option of ``ModArgparser`` or by setting the
+    environment variable ``KICADMODTREE_PROFILE`` to the path of the output file. Additional captures are selected by a
+    comma separated list in ``KICADMODTREE_PROFILE_CAPTURE``. The output file is appended to, so the footprints of a
+    whole library build can be collected into one file.
+
+    :param path:
+        path of the JSON lines file the records are appended to
+    :type path: ``str``
+    :param capture:
+        additional data captured per footprint: ``Profiler.CAPTURE_CPROFILE``, ``Profiler.CAPTURE_TRACEMALLOC``
+    :type capture: ``list(str)``
+    :param top_functions:
+        number of functions stored per footprint when cProfile is captured (default: 20)
+    :type top_functions: ``int``
+
+    :Example:
+
+    >>> from KicadModTree import *
+    >>> Profiler.enable('profile.jsonl', capture=[Profiler.CAPTURE_TRACEMALLOC])
+    >>> with Profiler.phase('config'):
+    ...     configuration = load_configuration()
+    >>> kicad_mod = Footprint("example_footprint")
+    >>> KicadFileHandler(kicad_mod).writeFile('example_footprint.kicad_mod')
+    >>> Profiler.disable()
+    """
+
+    ENVIRONMENT_VARIABLE = 'KICADMODTREE_PROFILE'
+    CAPTURE_ENVIRONMENT_VARIABLE = 'KICADMODTREE_PROFILE_CAPTURE'
+
+    CAPTURE_CPROFILE = 'cprofile'
+    CAPTURE_TRACEMALLOC = 'tracemalloc'
+    _CAPTURE_TYPES = [CAPTURE_CPROFILE, CAPTURE_TRACEMALLOC]
+
+    # the enabled profiler, None if profiling is disabled
+    active = None
+
+    def __init__(self, path, capture=None, top_functions=20):
+        self.path = os.path.abspath(path)
+        self.capture = set(capture or [])
+        self.top_functions = top_functions
+
+        for capture_type in self.capture:
+            if capture_type not in Profiler._CAPTURE_TYPES:
+                raise ValueError('{capture} is an invalid capture type'.format(capture=capture_type))
+        if Profiler.CAPTURE_TRACEMALLOC in self.capture:
+            try:
+                import tracemalloc  # NOQA, not available in python 2
+            except ImportError:
+                raise ValueError('tracemalloc is not available')
+
+        self.records_written = 0
+
+        self._stream = None
+        # id(footprint) -> (weak reference to the footprint, record) of created footprints which are not written yet,
+        # footprints which are never written (like the ones parsed by KicadFileReader) are dropped when they are freed
+        self._records = {}
+        self._current = None  # the record phases are added to
+        self._pending = {}  # phases measured outside of a footprint
+        self._nested = []  # time of nested phases, for every running phase
+        self._boundary = _clock()  # end of the last written footprint
+        self._profiling = False
+
+    @classmethod
+    def enable(cls, path, capture=None, **kwargs):
+        r"""Enable profiling of all footprints into the given file
+
+        :return: the enabled ``Profiler``
+        """
+        cls.disable()
+        profiler = cls(path, capture, **kwargs)
+        Profiler.active = profiler
+        return profiler
+
+    @classmethod
+    def enableFromEnvironment(cls, environ=None):
+        r"""Enable profiling if the environment variable ``KICADMODTREE_PROFILE`` is set
+
+        :return: the enabled ``Profiler``, or ``None``
+        """
+        environ = os.environ if environ is None else environ
+        path = environ.get(cls.ENVIRONMENT_VARIABLE)
+        if not path:
+            return None
+
+        capture = [c.strip() for c in environ.get(cls.CAPTURE_ENVIRONMENT_VARIABLE, '').split(',') if c.strip()]
+        return cls.enable(path, capture)
+
+    @classmethod
+    def disable(cls):
+        r"""Disable profiling and close the output file"""
+        profiler = Profiler.active
+        Profiler.active = None
+        if profiler is not None:
+            profiler.close()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def phase(name):
+        r"""Context manager measuring a phase of the current footprint, does nothing if profiling is disabled
+
+        :Example:
+
+        >>> from KicadModTree import *
+        >>> with Profiler.phase('keepout'):
+        ...     keepouts = createKeepouts()
+        """
+        profiler = Profiler.active
+        if profiler is None:
+            yield
+            return
+
+        start = _clock()
+        profiler._nested.append(0.)
+        try:
+            yield
+        finally:
+            duration = _clock() - start
+            # nested phases are only counted once, in the innermost phase
+            exclusive = duration - profiler._nested.pop()
+            if profiler._nested:
+                profiler._nested[-1] += duration
+
+            phases = profiler._pending if profiler._current is None else profiler._current.phases
+            phases[name] = phases.get(name, 0.) + exclusive
+
+    @staticmethod
+    def profiled(name):
+        r"""Decorator measuring every call of a function as phase of the current footprint
+
+        :Example:
+
+        >>> from KicadModTree import *
+        >>> @Profiler.profiled('courtyard')
+        ... def createCourtyard(kicad_mod, body):
+        ...     pass
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if Profiler.active is None:
+                    return function(*args, **kwargs)
+                with Profiler.phase(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def footprintCreated(self, footprint):
+        r"""Start measuring a footprint, called by ``Footprint``"""
+        record = _FootprintRecord(footprint.name, _clock(), self._pending)
+        self._pending = {}
+
+        if Profiler.CAPTURE_TRACEMALLOC in self.capture:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            record.memory_start = tracemalloc.get_traced_memory()[0]
+
+        if Profiler.CAPTURE_CPROFILE in self.capture and not self._profiling:
+            import cProfile
+            record.profile = cProfile.Profile()
+            record.profile.enable()
+            self._profiling = True
+
+        key = id(footprint)
+        self._records[key] = (weakref.ref(footprint, lambda _: self._dropRecord(key)), record)
+        self._current = record
+
+    def _dropRecord(self, key):
+        r"""Stop measuring a footprint which was freed without being written"""
+        _, record = self._records.pop(key, (None, None))
+        if record is None:
+            return
+        if record.profile is not None:
+            record.profile.disable()
+            self._profiling = False
+        if record is self._current:
+            self._current = None
+
+    def footprintWritten(self, footprint, filename):
+        r"""Finish measuring a footprint and write its record, called by ``FileHandler.writeFile``"""
+        end = _clock()
+        _, record = self._records.pop(id(footprint), (None, None))
+        if record is None:
+            # created before profiling was enabled or written again, measured since the last written footprint
+            record = _FootprintRecord(footprint.name, self._boundary, self._pending)
+            self._pending = {}
+        if record is self._current:
+            self._current = None
+
+        phases = record.phases
+        total = end - record.start + record.before
+        phases['build'] = max(0., total - sum(phases.values()))
+
+        output = {'footprint': record.name,
+                  'file': os.path.abspath(filename),
+                  'script': os.path.abspath(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+                  'pid': os.getpid(),
+                  'total': total,
+                  'phases': phases}
+
+        if record.profile is not None:
+            record.profile.disable()
+            self._profiling = False
+            output['profile'] = self._topFunctions(record.profile)
+
+        if record.memory_start is not None:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            output['memory_peak'] = peak - record.memory_start
+            output['memory_retained'] = current - record.memory_start
+
+        output['nodes'] = sum(1 for _ in footprint.walk())
+        try:
+            output['bytes'] = os.path.getsize(filename)
+        except OSError:
+            output['bytes'] = None
+
+        self._writeRecord(output)
+        self._boundary = _clock()
+
+    def _topFunctions(self, profile):
+        import pstats
+
+        stats = pstats.Stats(profile).stats
+        functions = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_functions]
+        return [{'function': '{0}:{1}({2})'.format(*function), 'calls': calls, 'tottime': tottime, 'cumtime': cumtime}
+                for function, (_, calls, tottime, cumtime, _) in functions]
+
+    def _writeRecord(self, output):
+        if self._stream is None:
+            self._stream = io.open(self.path, 'ab')
+            atexit.register(self.close)
+
+        # one write per line, so processes can append to the same file
+        self._stream.write((json.dumps(output, sort_keys=True) + '\n').encode('utf-8'))
+        self._stream.flush()
+        self.records_written += 1
+
+    def close(self):
+        r"""Close the output file, footprints which were not written yet are not recorded"""
+        for _, record in list(self._records.values()):
+            if record.profile is not None:
+                record.profile.disable()
+        self._records = {}
+        self._current = None
+        self._profiling = False
+
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+Profiler.enableFromEnvironment()
@@ -0,0 +1,485 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+from __future__ import division
+
+import heapq
+import itertools
+import math
+
+from KicadModTree.KicadFileHandler import _get_layer_width, DEFAULT_WIDTH_POLYGON_PAD
+from KicadModTree.Vector import Vector2D
+from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.base.Arc import Arc
+from KicadModTree.nodes.base.Circle import Circle
+from KicadModTree.nodes.base.Line import Line
+from KicadModTree.nodes.base.Pad import Pad
+from KicadModTree.nodes.base.Polygon import Polygon
+from KicadModTree.nodes.specialized.PadGrid import PadGrid
+from KicadModTree.util.geometric_util import *
+
+# Parts are the primitive shapes an element is made of, all in the coordinate system of the root node:
+#   capsule: (x1, y1, x2, y2, radius), every point within radius of the line segment (a pad circle has length zero)
+#   polygon: (points, radius), the filled polygon given as list of (x, y) tuples, grown by radius
+
+
+def _transformPoint(matrix, x, y):
+    if matrix is None:
+        return x, y
+    a, b, c, d, e, f = matrix
+    return a*x + b*y + c, d*x + e*y + f
+
+
+def _polylineParts(points, radius):
+    return [(x1, y1, x2, y2, radius) for (x1, y1), (x2, y2) in zip(points, points[1:])]
+
+
+def _arcPoints(center, start, angle, matrix):
+    center_x, center_y = _transformPoint(matrix, center.x, center.y)
+    start_x, start_y = _transformPoint(matrix, start.x, start.y)
+    if matrix is not None and matrix[0]*matrix[4] - matrix[1]*matrix[3] < 0:
+        # mirroring changes the direction of the arc
+        angle = -angle
+
+    radius = math.hypot(start_x - center_x, start_y - center_y)
+    start_angle = math.degrees(math.atan2(start_y - center_y, start_x - center_x))
+    return arcPolyline(center_x, center_y, radius, start_angle, angle)
+
+
+def _graphicParts(node, matrix, width):
+    '''
+    parts of a line, circle, arc or polygon (also used for the primitives of custom pads)
+    '''
+    if isinstance(node, Line):
+        x1, y1 = _transformPoint(matrix, node.start_pos.x, node.start_pos.y)
+        x2, y2 = _transformPoint(matrix, node.end_pos.x, node.end_pos.y)
+        return [(x1, y1, x2, y2, width / 2.)]
+    elif isinstance(node, Circle):
+        start = Vector2D(node.center_pos.x + node.radius, node.center_pos.y)
+        return _polylineParts(_arcPoints(node.center_pos, start, 360, matrix), width / 2.)
+    elif isinstance(node, Arc):
+        return _polylineParts(_arcPoints(node.center_pos, node.start_pos, node.angle, matrix), width / 2.)
+    elif isinstance(node, Polygon) and node.nodes.nodes:
+        return [([_transformPoint(matrix, point.x, point.y) for point in node.nodes.nodes], width / 2.)]
+    return []
+
+
+def _rectanglePart(width, height, matrix, radius=0):
+    half_width = width / 2.
+    half_height = height / 2.
+    corners = [(-half_width, -half_height), (half_width, -half_height),
+               (half_width, half_height), (-half_width, half_height)]
+    return ([_transformPoint(matrix, x, y) for x, y in corners], radius)
+
+
+def _padParts(pad, matrix, x, y):
+    '''
+    parts of the copper of a pad placed at (x, y)
+    '''
+    placement = composeTransformation(matrix, placementMatrix(x, y, pad.rotation))
+    size_x, size_y = pad.size.x, pad.size.y
+
+    if pad.shape == Pad.SHAPE_CIRCLE or (pad.shape == Pad.SHAPE_CUSTOM and pad.anchor_shape == Pad.ANCHOR_CIRCLE):
+        center_x, center_y = _transformPoint(placement, 0, 0)
+        parts = [(center_x, center_y, center_x, center_y, size_x / 2.)]
+    elif pad.shape == Pad.SHAPE_OVAL:
+        # a capsule along the longer side
+        if size_x >= size_y:
+            x1, y1 = _transformPoint(placement, -(size_x - size_y) / 2., 0)
+            x2, y2 = _transformPoint(placement, (size_x - size_y) / 2., 0)
+            parts = [(x1, y1, x2, y2, size_y / 2.)]
+        else:
+            x1, y1 = _transformPoint(placement, 0, -(size_y - size_x) / 2.)
+            x2, y2 = _transformPoint(placement, 0, (size_y - size_x) / 2.)
+            parts = [(x1, y1, x2, y2, size_x / 2.)]
+    elif pad.shape == Pad.SHAPE_ROUNDRECT:
+        radius = min(pad.getRoundRadius(), size_x / 2., size_y / 2.)
+        parts = [_rectanglePart(size_x - 2*radius, size_y - 2*radius, placement, radius)]
+    else:
+        parts = [_rectanglePart(size_x, size_y, placement)]
+
+    if pad.shape == Pad.SHAPE_CUSTOM:
+        for primitive in pad.primitives:
+            width = DEFAULT_WIDTH_POLYGON_PAD if primitive.width is None else primitive.width
+            parts.extend(_graphicParts(primitive, placement, width))
+
+    return parts
+
+
+def _partBoundingBox(part):
+    if len(part) == 5:
+        x1, y1, x2, y2, radius = part
+        return (min(x1, x2) - radius, min(y1, y2) - radius, max(x1, x2) + radius, max(y1, y2) + radius)
+
+    points, radius = part
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return (min(xs) - radius, min(ys) - radius, max(xs) + radius, max(ys) + radius)
+
+
+def _polygonEdges(points):
+    return [(x1, y1, x2, y2) for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1])]
+
+
+def _segmentPolygonDistance(capsule, polygon):
+    points, radius = polygon
+    if pointInPolygon(capsule[0], capsule[1], points):
+        return -capsule[4] - radius
+    return min(segmentDistance(capsule, edge) for edge in _polygonEdges(points)) - capsule[4] - radius
+
+
+def _partDistance(part, other):
+    '''
+    distance between the outlines of two parts, zero or negative if they overlap
+    '''
+    if len(part) == 5:
+        if len(other) == 5:
+            return segmentDistance(part, other) - part[4] - other[4]
+        return _segmentPolygonDistance(part, other)
+    elif len(other) == 5:
+        return _segmentPolygonDistance(other, part)
+
+    points, radius = part
+    other_points, other_radius = other
+    if pointInPolygon(points[0][0], points[0][1], other_points) or \
+            pointInPolygon(other_points[0][0], other_points[0][1], points):
+        return -radius - other_radius
+    edges = _polygonEdges(other_points)
+    return min(segmentDistance(edge, other_edge) for edge in _polygonEdges(points)
+               for other_edge in edges) - radius - other_radius
+
+
+class SpatialElement(object):
+    r"""Geometry of a single pad, line, circle, arc or polygon in a ``SpatialIndex``
+
+    The geometry is given in the coordinate system of the root node and consists of parts, which are line segments
+    with a radius (lines, arcs, round pads) or filled polygons (rectangular pads, polygons). Arcs and circles are
+    approximated by line segments with a maximum error of 0.001.
+
+    :Attributes:
+        * **node** (``Node``) -- node the element was created from
+        * **layers** (``tuple(str)``) -- layers of the element
+        * **number** -- pad number or ``None`` if the element is not a pad
+        * **bounding_box** (``tuple``) -- ``(min_x, min_y, max_x, max_y)``
+        * **parts** (``list``) -- the shapes the element is made of
+    """
+
+    __slots__ = ('node', 'layers', 'number', 'bounding_box', 'parts', '_part_boxes')
+
+    def __init__(self, node, layers, parts, number=None):
+        self.node = node
+        self.layers = tuple(layers)
+        self.number = number
+        self.parts = parts
+
+        self._part_boxes = [_partBoundingBox(part) for part in parts]
+        bounding_box = EMPTY_BOUNDING_BOX
+        for part_box in self._part_boxes:
+            bounding_box = mergeBoundingBoxes(bounding_box, part_box)
+        self.bounding_box = bounding_box
+
+    @staticmethod
+    def fromNode(node):
+        r"""Create the elements of a single node (without its childs)
+
+        :return: ``list(SpatialElement)``, empty for nodes without pad or graphic geometry (like texts or models)
+        """
+        matrix = node.getTransformation()[0]
+
+        if isinstance(node, PadGrid):
+            return [SpatialElement(node, node.layers, _padParts(node.pad, matrix, x, y), number=number)
+                    for number, x, y in node.iterPads()]
+        elif isinstance(node, Pad):
+            return [SpatialElement(node, node.layers, _padParts(node, matrix, node.at.x, node.at.y),
+                                   number=node.number)]
+        elif isinstance(node, (Line, Circle, Arc, Polygon)):
+            parts = _graphicParts(node, matrix, _get_layer_width(node.layer, node.width))
+            return [SpatialElement(node, [node.layer], parts)] if parts else []
+        return []
+
+    @staticmethod
+    def fromPoint(x, y):
+        r"""Create an element which is a single point, to be used as target of a query"""
+        return SpatialElement(None, [], [(x, y, x, y, 0.)])
+
+    def distance(self, other):
+        r"""Distance between the outlines of two elements, 0 if they touch or overlap"""
+        best = float('inf')
+        for part, part_box in zip(self.parts, self._part_boxes):
+            for other_part, other_box in zip(other.parts, other._part_boxes):
+                # the distance of the bounding boxes is a lower bound of the distance of the parts
+                if boundingBoxDistance(part_box, other_box) >= best:
+                    continue
+                distance = _partDistance(part, other_part)
+                if distance < best:
+                    best = distance
+                    if best <= 0:
+                        return 0.
+        return best
+
+    def __repr__(self):
+        return "SpatialElement({}, layers={}, number={})".format(
+            self.node.__class__.__name__, list(self.layers), self.number)
+
+
+# maximum number of entries of a node of the R-tree
+_NODE_CAPACITY = 16
+
+
+def _boxesIntersect(box, other):
+    return box[0] <= other[2] and other[0] <= box[2] and box[1] <= other[3] and other[1] <= box[3]
+
+
+def _packLevel(entries, is_leaf):
+    '''
+    group the (bounding_box, item) entries of one level into nodes with the sort-tile-recursive algorithm
+
+    :return: nodes as ``(bounding_box, (is_leaf, entries))`` entries of the next level
+    '''
+    node_count = int(math.ceil(len(entries) / _NODE_CAPACITY))
+    slice_size = int(math.ceil(math.sqrt(node_count))) * _NODE_CAPACITY
+
+    entries = sorted(entries, key=lambda entry: entry[0][0] + entry[0][2])
+    nodes = []
+    for slice_start in range(0, len(entries), slice_size):
+        tile = sorted(entries[slice_start:slice_start + slice_size], key=lambda entry: entry[0][1] + entry[0][3])
+        for start in range(0, len(tile), _NODE_CAPACITY):
+            group = tile[start:start + _NODE_CAPACITY]
+            bounding_box = EMPTY_BOUNDING_BOX
+            for entry_box, _ in group:
+                bounding_box = mergeBoundingBoxes(bounding_box, entry_box)
+            nodes.append((bounding_box, (is_leaf, group)))
+    return nodes
+
+
+def _buildTree(elements):
+    '''
+    bulk load a R-tree from a list of elements
+
+    :return: root node as ``(bounding_box, (is_leaf, entries))``
+    '''
+    level = _packLevel([(element.bounding_box, element) for element in elements], True)
+    while len(level) > 1:
+        level = _packLevel(level, False)
+    return level[0]
+
+
+class SpatialIndex(object):
+    r"""Index of the pads and graphic elements of a footprint to answer clearance queries fast
+
+    Every pad, line, circle, arc and polygon is converted into a ``SpatialElement`` in the coordinate system of the
+    root node. The elements are stored in one R-tree per layer, so queries only have to check the elements near the
+    searched area instead of all elements of the footprint. A query for a single layer also includes the elements on
+    the matching wildcard layer (like pads on ``*.Cu`` for ``F.Cu``) and the other way round.
+
+    The trees are built on the first query after elements were added. Changes made to the nodes afterwards are not
+    detected, a new index has to be created instead.
+
+    Targets of queries can be a point (``[x, y]`` or ``Vector2D``), a ``SpatialElement`` or a ``Node``. The elements
+    of a node target (and all of its childs) are never part of the result.
+
+    :param kicad_mod:
+        node (like a ``Footprint``) whose elements are added to the index
+    :type kicad_mod: ``Node``
+
+    :Example:
+
+    >>> from KicadModTree import *
+    >>> index = SpatialIndex(kicad_mod)
+    >>> index.nearest([0, 0], layer='F.Cu')  # [(pad, distance)]
+    >>> for line in kicad_mod.walk(Line, layer='F.SilkS'):
+    ...     if index.withinDistance(line, 0.2, layer='F.Cu'):
+    ...         print("silk too close to a pad", line)
+    """
+
+    def __init__(self, kicad_mod=None):
+        self._elements = {}
+        self._trees = {}
+        self._order = {}
+        self._node_elements = {}  # id(node) -> elements created from the node, to exclude the elements of a target
+
+        if kicad_mod is not None:
+            self.add(kicad_mod)
+
+    def __len__(self):
+        return len(self._order)
+
+    def add(self, node):
+        r"""Add a node and all of its childs to the index
+
+        :return: ``list(SpatialElement)`` -- the added elements
+        """
+        added = []
+        for child in node.walk():
+            elements = SpatialElement.fromNode(child)
+            for element in elements:
+                self._order[id(element)] = len(self._order)
+                for layer in element.layers:
+                    self._elements.setdefault(layer, []).append(element)
+                    self._trees.pop(layer, None)
+                added.append(element)
+            if elements:
+                self._node_elements.setdefault(id(child), []).extend(elements)
+        return added
+
+    def getElements(self, layer=None):
+        r"""Get all elements on the given layer(s) (all elements if no layer is given), in the order they were added"""
+        elements = {}
+        for layer_name in self._matchingLayers(layer):
+            for element in self._elements[layer_name]:
+                elements[id(element)] = element
+        return self._sorted(elements.values())
+
+    def query(self, bounding_box, layer=None):
+        r"""Get all elements whose bounding box intersects the given bounding box
+
+        :param bounding_box: ``(min_x, min_y, max_x, max_y)`` or ``{'min': Vector2D, 'max': Vector2D}`` like returned
+                             by ``Node.calculateBoundingBox``
+        :param layer: (``str``, ``list(str)``) -- only search on the given layer(s)
+        """
+        if isinstance(bounding_box, dict):
+            bounding_box = (bounding_box['min'].x, bounding_box['min'].y,
+                            bounding_box['max'].x, bounding_box['max'].y)
+        return self._sorted(self._query(bounding_box, self._matchingLayers(layer)))
+
+    def overlapping(self, target, layer=None):
+        r"""Get all elements which touch or overlap the target"""
+        return [element for element, _ in self.withinDistance(target, 0, layer)]
+
+    def withinDistance(self, target, distance, layer=None):
+        r"""Get all elements whose distance to the target is not larger than the given distance
+
+        :return: ``list((SpatialElement, distance))``, sorted by distance
+        """
+        targets, excluded = self._getTargets(target)
+        layers = self._matchingLayers(layer)
+
+        candidates = {}
+        for target_element in targets:
+            for element in self._query(growBoundingBox(target_element.bounding_box, distance), layers):
+                if id(element) not in excluded:
+                    candidates[id(element)] = element
+
+        result = []
+        for element in candidates.values():
+            element_distance = min(element.distance(target_element) for target_element in targets)
+            if element_distance <= distance:
+                result.append((element, element_distance))
+
+        return sorted(result, key=lambda item: (item[1], self._order[id(item[0])]))
+
+    def nearest(self, target, layer=None, count=1):
+        r"""Get the elements closest to the target
+
+        The search starts at the root of the trees and always continues with the closest node or element, so only a
+        small part of the elements has to be compared exactly.
+
+        :param count: maximum number of elements which are returned
+        :return: ``list((SpatialElement, distance))``, sorted by distance
+        """
+        targets, excluded = self._getTargets(target)
+        target_box = EMPTY_BOUNDING_BOX
+        for target_element in targets:
+            target_box = mergeBoundingBoxes(target_box, target_element.bounding_box)
+
+        # entries are (lower bound of the distance, order, kind, item), kind 0 is a tree node, 1 an element whose
+        # distance is not calculated yet and 2 an element with its exact distance. Tree nodes have a negative order,
+        # so they are expanded before elements with the same distance are returned.
+        node_order = itertools.count(-1, -1)
+        heap = []
+        for tree in self._treesFor(self._matchingLayers(layer)):
+            heapq.heappush(heap, (boundingBoxDistance(target_box, tree[0]), next(node_order), 0, tree[1]))
+
+        result = []
+        seen = set()
+        while heap and len(result) < count:
+            distance, order, kind, item = heapq.heappop(heap)
+            if kind == 2:
+                result.append((item, distance))
+            elif kind == 1:
+                exact = min(item.distance(target_element) for target_element in targets)
+                heapq.heappush(heap, (exact, order, 2, item))
+            else:
+                is_leaf, entries = item
+                for entry_box, entry in entries:
+                    lower_bound = boundingBoxDistance(target_box, entry_box)
+                    if not is_leaf:
+                        heapq.heappush(heap, (lower_bound, next(node_order), 0, entry))
+                    elif id(entry) not in excluded and id(entry) not in seen:
+                        # elements on several layers are found in several trees
+                        seen.add(id(entry))
+                        heapq.heappush(heap, (lower_bound, self._order[id(entry)], 1, entry))
+
+        return result
+
+    def _getTargets(self, target):
+        '''
+        :return: ``(elements, excluded)``, the elements of the target and the ids of the elements which are not
+                 returned by the query
+        '''
+        if isinstance(target, SpatialElement):
+            return [target], set([id(target)])
+        elif isinstance(target, Node):
+            targets = []
+            excluded = set()
+            for node in target.walk():
+                targets.extend(SpatialElement.fromNode(node))
+                excluded.update(id(element) for element in self._node_elements.get(id(node), ()))
+            if not targets:
+                raise ValueError("{} has no geometry which can be used as target".format(target.__class__.__name__))
+            return targets, excluded
+
+        point = Vector2D(target)
+        return [SpatialElement.fromPoint(point.x, point.y)], set()
+
+    def _matchingLayers(self, layer):
+        if layer is None:
+            return list(self._elements)
+
+        requested = layer if isinstance(layer, (list, tuple, set, frozenset)) else (layer, )
+        matching = []
+        for name in self._elements:
+            for requested_layer in requested:
+                if name == requested_layer or \
+                        (name.startswith('*.') and requested_layer.endswith(name[1:])) or \
+                        (requested_layer.startswith('*.') and name.endswith(requested_layer[1:])):
+                    matching.append(name)
+                    break
+        return matching
+
+    def _treesFor(self, layers):
+        trees = []
+        for layer in layers:
+            if layer not in self._trees:
+                self._trees[layer] = _buildTree(self._elements[layer])
+            trees.append(self._trees[layer])
+        return trees
+
+    def _query(self, bounding_box, layers):
+        elements = {}
+        for tree in self._treesFor(layers):
+            if not _boxesIntersect(tree[0], bounding_box):
+                continue
+            stack = [tree[1]]
+            while stack:
+                is_leaf, entries = stack.pop()
+                for entry_box, entry in entries:
+                    if _boxesIntersect(entry_box, bounding_box):
+                        if is_leaf:
+                            elements[id(entry)] = entry
+                        else:
+                            stack.append(entry)
+        return elements.values()
+
+    def _sorted(self, elements):
+        return sorted(elements, key=lambda element: self._order[id(element)])
@@ -22,6 +22,9 @@ from KicadModTree.util.kicad_util import formatFloat
 from math import sqrt
 
 
+_NUMBER_TYPES = (int, float)
+
+
 class Vector2D(object):
     r"""Representation of a 2D Vector in space
 
@@ -34,27 +37,20 @@ class Vector2D(object):
     >>> Vector2D({'x': 0, 'y':0})
     >>> Vector2D(Vector2D(0, 0))
     """
+    __slots__ = ('x', 'y')
+
     def __init__(self, coordinates=None, y=None):
-        # parse constructor
-        if coordinates is None:
-            coordinates = {}
-        elif type(coordinates) in [int, float]:
-            if y is not None:
-                coordinates = [coordinates, y]
-            else:
+        # parse vectors with format: Vector2D(0, 0), this is the most common case and therefore checked first
+        coordinates_type = type(coordinates)
+        if coordinates_type in _NUMBER_TYPES:
+            if y is None:
                 raise TypeError('you have to give x and y coordinate')
-        elif isinstance(coordinates, Vector2D):
-            # convert Vector2D as well as Vector3D to dict
-            coordinates = coordinates.__dict__()
-
-        # parse vectors with format: Vector2D({'x':0, 'y':0})
-        if type(coordinates) is dict:
-            self.x = float(coordinates.get('x', 0.))
-            self.y = float(coordinates.get('y', 0.))
+            self.x = float(coordinates)
+            self.y = float(y)
             return
 
         # parse vectors with format: Vector2D([0, 0]) or Vector2D((0, 0))
-        if type(coordinates) in [list, tuple]:
+        if coordinates_type is list or coordinates_type is tuple:
             if len(coordinates) == 2:
                 self.x = float(coordinates[0])
                 self.y = float(coordinates[1])
@@ -62,8 +58,36 @@ class Vector2D(object):
             else:
                 raise TypeError('invalid list size (2 elements expected)')
 
+        # parse Vector2D as well as Vector3D
+        if isinstance(coordinates, Vector2D):
+            self.x = float(coordinates.x)
+            self.y = float(coordinates.y)
+            return
+
+        if coordinates is None:
+            self.x = 0.
+            self.y = 0.
+            return
+
+        # parse vectors with format: Vector2D({'x':0, 'y':0})
+        if coordinates_type is dict:
+            self.x = float(coordinates.get('x', 0.))
+            self.y = float(coordinates.get('y', 0.))
+            return
+
         raise TypeError('invalid parameters given')
 
+    @staticmethod
+    def _fromXY(x, y):
+        r"""Create a new vector from two numbers without parsing the arguments
+
+        This is the fastest way to create a vector and should be used in hot code paths.
+        """
+        vector = _object_new(Vector2D)
+        vector.x = float(x)
+        vector.y = float(y)
+        return vector
+
     def round_to(self, base):
         r"""Round to a specific base (like it's required for a grid)
 
@@ -76,7 +100,7 @@ class Vector2D(object):
         if base == 0 or base is None:
             return self.__copy__()
 
-        return Vector2D([round(v / base) * base for v in self])
+        return _new_vector2d(round(self.x / base) * base, round(self.y / base) * base)
 
     def distance_to(self, value):
         r"""Distance between this and another point
@@ -84,17 +108,20 @@ class Vector2D(object):
         :param value: the other point
         :return: distance between self and other point
         """
-        other = Vector2D.__arithmetic_parse(value)
-        return sqrt((other.x - self.x)**2 + (other.y - self.y)**2)
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
+        return sqrt((other_x - self.x)**2 + (other_y - self.y)**2)
 
     @staticmethod
     def __arithmetic_parse(value):
+        # returns the (x, y) values of the operand without creating a temporary vector for the common cases
         if isinstance(value, Vector2D):
-            return value
-        elif type(value) in [int, float]:
-            return Vector2D([value, value])
+            return value.x, value.y
+        elif type(value) in _NUMBER_TYPES:
+            value = float(value)
+            return value, value
         else:
-            return Vector2D(value)
+            other = Vector2D(value)
+            return other.x, other.y
 
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
@@ -105,49 +132,62 @@ class Vector2D(object):
         return not self.__eq__(other)
 
     def __add__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
 
-        return Vector2D({'x': self.x + other.x,
-                         'y': self.y + other.y})
+        return _new_vector2d(self.x + other_x, self.y + other_y)
 
     def __iadd__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
-        self.x += other.x
-        self.y += other.y
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
+        self.x += other_x
+        self.y += other_y
 
         return self
 
     def __neg__(self):
-        return Vector2D({'x': -self.x, 'y': -self.y})
+        return _new_vector2d(-self.x, -self.y)
 
     def __sub__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
 
-        return Vector2D({'x': self.x - other.x,
-                         'y': self.y - other.y})
+        return _new_vector2d(self.x - other_x, self.y - other_y)
 
     def __isub__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
-        self.x -= other.x
-        self.y -= other.y
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
+        self.x -= other_x
+        self.y -= other_y
 
         return self
 
     def __mul__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
 
-        return Vector2D({'x': self.x * other.x,
-                         'y': self.y * other.y})
+        return _new_vector2d(self.x * other_x, self.y * other_y)
+
+    def __imul__(self, value):
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
+        self.x *= other_x
+        self.y *= other_y
+
+        return self
 
     def __div__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
 
-        return Vector2D({'x': self.x / other.x,
-                         'y': self.y / other.y})
+        return _new_vector2d(self.x / other_x, self.y / other_y)
 
     def __truediv__(self, obj):
         return self.__div__(obj)
 
+    def __idiv__(self, value):
+        other_x, other_y = Vector2D.__arithmetic_parse(value)
+        self.x /= other_x
+        self.y /= other_y
+
+        return self
+
+    def __itruediv__(self, obj):
+        return self.__idiv__(obj)
+
     def __dict__(self):
         return {'x': self.x, 'y': self.y}
 
@@ -160,10 +200,10 @@ class Vector2D(object):
                                  y=formatFloat(self.y))
 
     def __repr__(self):
-        return "Vector2D (x={x}, y={y})".format(**self.__dict__())
+        return "Vector2D (x={x}, y={y})".format(x=self.x, y=self.y)
 
     def __str__(self):
-        return "(x={x}, y={y})".format(**self.__dict__())
+        return "(x={x}, y={y})".format(x=self.x, y=self.y)
 
     def __getitem__(self, key):
         if key == 0 or key == 'x':
@@ -189,7 +229,17 @@ class Vector2D(object):
         yield self.y
 
     def __copy__(self):
-        return Vector2D(self.x, self.y)
+        # subclasses (like the deprecated Point2D) keep their class
+        vector = _object_new(self.__class__)
+        vector.x = self.x
+        vector.y = self.y
+        return vector
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def __reduce__(self):
+        return (_restoreVector, (self.__class__, self.x, self.y))
 
 
 class Vector3D(Vector2D):
@@ -205,34 +255,23 @@ class Vector3D(Vector2D):
     >>> Vector3D(Vector2D(0, 0))
     >>> Vector3D(Vector3D(0, 0, 0))
     """
+    __slots__ = ('z', )
 
     def __init__(self, coordinates=None, y=None, z=None):
         # we don't need a super constructor here
 
-        # parse constructor
-        if coordinates is None:
-            coordinates = {}
-        elif type(coordinates) in [int, float]:
-            if y is not None:
-                if z is not None:
-                    coordinates = [coordinates, y, z]
-                else:
-                    coordinates = [coordinates, y]
-            else:
+        # parse vectors with format: Vector3D(0, 0, 0) or Vector3D(0, 0)
+        coordinates_type = type(coordinates)
+        if coordinates_type in _NUMBER_TYPES:
+            if y is None:
                 raise TypeError('you have to give at least x and y coordinate')
-        elif isinstance(coordinates, Vector2D):
-            # convert Vector2D as well as Vector3D to dict
-            coordinates = coordinates.__dict__()
-
-        # parse vectors with format: Vector2D({'x':0, 'y':0})
-        if type(coordinates) is dict:
-            self.x = float(coordinates.get('x', 0.))
-            self.y = float(coordinates.get('y', 0.))
-            self.z = float(coordinates.get('z', 0.))
+            self.x = float(coordinates)
+            self.y = float(y)
+            self.z = 0. if z is None else float(z)
             return
 
         # parse vectors with format: Vector3D([0, 0]), Vector3D([0, 0, 0]) or Vector3D((0, 0)), Vector3D((0, 0, 0))
-        if type(coordinates) in [list, tuple]:
+        if coordinates_type is list or coordinates_type is tuple:
             if len(coordinates) >= 2:
                 self.x = float(coordinates[0])
                 self.y = float(coordinates[1])
@@ -246,9 +285,41 @@ class Vector3D(Vector2D):
 
             if len(coordinates) > 3:
                 raise TypeError('invalid list size (to big)')
+            return
 
-        else:
-            raise TypeError('dict or list type required')
+        # parse Vector2D as well as Vector3D
+        if isinstance(coordinates, Vector2D):
+            self.x = float(coordinates.x)
+            self.y = float(coordinates.y)
+            self.z = float(getattr(coordinates, 'z', 0.))
+            return
+
+        if coordinates is None:
+            self.x = 0.
+            self.y = 0.
+            self.z = 0.
+            return
+
+        # parse vectors with format: Vector3D({'x':0, 'y':0, 'z':0})
+        if coordinates_type is dict:
+            self.x = float(coordinates.get('x', 0.))
+            self.y = float(coordinates.get('y', 0.))
+            self.z = float(coordinates.get('z', 0.))
+            return
+
+        raise TypeError('dict or list type required')
+
+    @staticmethod
+    def _fromXYZ(x, y, z):
+        r"""Create a new vector from three numbers without parsing the arguments
+
+        This is the fastest way to create a vector and should be used in hot code paths.
+        """
+        vector = _object_new(Vector3D)
+        vector.x = float(x)
+        vector.y = float(y)
+        vector.z = float(z)
+        return vector
 
     def round_to(self, base):
         r"""Round to a specific base (like it's required for a grid)
@@ -262,16 +333,19 @@ class Vector3D(Vector2D):
         if base == 0 or base is None:
             return self.__copy__()
 
-        return Vector3D([round(v / base) * base for v in self])
+        return _new_vector3d(round(self.x / base) * base, round(self.y / base) * base, round(self.z / base) * base)
 
     @staticmethod
     def __arithmetic_parse(value):
+        # returns the (x, y, z) values of the operand without creating a temporary vector for the common cases
         if isinstance(value, Vector3D):
-            return value
-        elif type(value) in [int, float]:
-            return Vector3D([value, value, value])
+            return value.x, value.y, value.z
+        elif type(value) in _NUMBER_TYPES:
+            value = float(value)
+            return value, value, value
         else:
-            return Vector3D(value)
+            other = Vector3D(value)
+            return other.x, other.y, other.z
 
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
@@ -282,57 +356,66 @@ class Vector3D(Vector2D):
         return not self.__eq__(other)
 
     def __add__(self, value):
-        other = Vector3D.__arithmetic_parse(value)
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
 
-        return Vector3D({'x': self.x + other.x,
-                         'y': self.y + other.y,
-                         'z': self.z + other.z})
+        return _new_vector3d(self.x + other_x, self.y + other_y, self.z + other_z)
 
     def __iadd__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
-        self.x += other.x
-        self.y += other.y
-        self.z += other.z
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
+        self.x += other_x
+        self.y += other_y
+        self.z += other_z
 
         return self
 
     def __neg__(self):
-        return Vector2D({'x': -self.x,
-                         'y': -self.y,
-                         'z': -self.z})
+        return _new_vector3d(-self.x, -self.y, -self.z)
 
     def __sub__(self, value):
-        other = Vector3D.__arithmetic_parse(value)
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
 
-        return Vector3D({'x': self.x - other.x,
-                         'y': self.y - other.y,
-                         'z': self.z - other.z})
+        return _new_vector3d(self.x - other_x, self.y - other_y, self.z - other_z)
 
     def __isub__(self, value):
-        other = Vector2D.__arithmetic_parse(value)
-        self.x -= other.x
-        self.y -= other.y
-        self.z -= other.z
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
+        self.x -= other_x
+        self.y -= other_y
+        self.z -= other_z
 
         return self
 
     def __mul__(self, value):
-        other = Vector3D.__arithmetic_parse(value)
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
 
-        return Vector3D({'x': self.x * other.x,
-                         'y': self.y * other.y,
-                         'z': self.z * other.z})
+        return _new_vector3d(self.x * other_x, self.y * other_y, self.z * other_z)
+
+    def __imul__(self, value):
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
+        self.x *= other_x
+        self.y *= other_y
+        self.z *= other_z
+
+        return self
 
     def __div__(self, value):
-        other = Vector3D.__arithmetic_parse(value)
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
 
-        return Vector3D({'x': self.x / other.x,
-                         'y': self.y / other.y,
-                         'z': self.z / other.z})
+        return _new_vector3d(self.x / other_x, self.y / other_y, self.z / other_z)
 
     def __truediv__(self, obj):
         return self.__div__(obj)
 
+    def __idiv__(self, value):
+        other_x, other_y, other_z = Vector3D.__arithmetic_parse(value)
+        self.x /= other_x
+        self.y /= other_y
+        self.z /= other_z
+
+        return self
+
+    def __itruediv__(self, obj):
+        return self.__idiv__(obj)
+
     def __dict__(self):
         return {'x': self.x, 'y': self.y, 'z': self.z}
 
@@ -346,10 +429,10 @@ class Vector3D(Vector2D):
                                  z=formatFloat(self.z))
 
     def __repr__(self):
-        return "Vector3D (x={x}, y={y}, z={z})".format(**self.__dict__())
+        return "Vector3D (x={x}, y={y}, z={z})".format(x=self.x, y=self.y, z=self.z)
 
     def __str__(self):
-        return "(x={x}, y={y}, z={z})".format(**self.__dict__())
+        return "(x={x}, y={y}, z={z})".format(x=self.x, y=self.y, z=self.z)
 
     def __getitem__(self, key):
         if key == 0 or key == 'x':
@@ -380,4 +463,27 @@ class Vector3D(Vector2D):
         yield self.z
 
     def __copy__(self):
-        return Vector3D(self.x, self.y, self.z)
+        vector = _object_new(self.__class__)
+        vector.x = self.x
+        vector.y = self.y
+        vector.z = self.z
+        return vector
+
+    def __reduce__(self):
+        return (_restoreVector, (self.__class__, self.x, self.y, self.z))
+
+
+def _restoreVector(vector_class, *coordinates):
+    r"""Create a vector of the given class when it is unpickled, without calling ``__init__``
+
+    The constructors of the deprecated point classes would show their deprecation warning again.
+    """
+    vector = _object_new(vector_class)
+    for name, value in zip(('x', 'y', 'z'), coordinates):
+        setattr(vector, name, value)
+    return vector
+
+
+_object_new = object.__new__
+_new_vector2d = Vector2D._fromXY
+_new_vector3d = Vector3D._fromXYZ
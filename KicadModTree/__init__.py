@@ -16,11 +16,32 @@
 from KicadModTree.Vector import *
 from KicadModTree.Point import *  # backwards compatibility
 
-# all different types of nodes
-from KicadModTree.nodes import *
+from KicadModTree.util import lazy_import as _lazy_import
 
-# File Handlers
-from KicadModTree.KicadFileHandler import KicadFileHandler
+# everything else is imported when it is used for the first time, most scripts only need a few of those modules
+_lazy_import.lazyImport(__name__, [
+    # all different types of nodes
+    ('.nodes', None),
+    ('.nodes', _lazy_import.ALL_NAMES),
 
-# Argparser
-from KicadModTree.ModArgparser import ModArgparser
+    # File Handlers
+    ('.FileHandler', None),
+    ('.KicadFileHandler', ['KicadFileHandler']),
+    ('.KicadFileReader', ['KicadFileReader']),
+    ('.GeometryOptimizer', ['GeometryOptimizer']),
+
+    # Argparser
+    ('.ModArgparser', ['ModArgparser']),
+
+    # Comparing footprints
+    ('.FootprintComparator', ['FootprintComparator']),
+
+    # Incremental builds
+    ('.BuildManifest', ['BuildManifest']),
+
+    # Profiling
+    ('.Profiler', ['Profiler']),
+
+    # Clearance queries
+    ('.SpatialIndex', ['SpatialIndex', 'SpatialElement']),
+])
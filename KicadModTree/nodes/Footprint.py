@@ -16,6 +16,7 @@
 
 from KicadModTree.Vector import *
 from KicadModTree.nodes.Node import Node
+from KicadModTree.Profiler import Profiler
 
 
 '''
@@ -51,6 +52,9 @@ class Footprint(Node):
         self.pasteMargin = None
         self.pasteMarginRatio = None
 
+        if Profiler.active is not None:
+            Profiler.active.footprintCreated(self)
+
     def setName(self, name):
         self.name = name
 
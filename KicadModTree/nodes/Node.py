@@ -14,8 +14,11 @@
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 from copy import copy, deepcopy
+from itertools import chain
+from operator import attrgetter
 
 from KicadModTree.Vector import *
+from KicadModTree.util.geometric_util import EMPTY_BOUNDING_BOX, composeTransformation, mergeBoundingBoxes
 
 
 class MultipleParentsError(RuntimeError):
@@ -32,7 +35,39 @@ class RecursionDetectedError(RuntimeError):
         super(RecursionDetectedError, self).__init__(message)
 
 
+def geometryAttribute(name):
+    r"""Attribute of a node which changes its geometry, like the position of a line
+
+    Assigning the attribute drops the cached bounding box of the node and its parents, and the virtual childs of a
+    ``LazyNode``. Changes made inside of the value (like ``node.at.x = 1``) are not detected.
+
+    :param name: name of the attribute, the value is stored in the attribute with a leading underscore
+
+    :Example:
+
+    >>> from KicadModTree.nodes.Node import Node, geometryAttribute
+    >>> class Marker(Node):
+    ...     at = geometryAttribute('at')
+    """
+    attribute = '_' + name
+
+    def setAttribute(node, value):
+        object.__setattr__(node, attribute, value)
+        node._geometryChanged()
+
+    # reading the attribute does not call python code, it is used a lot more often than assigning it
+    return property(attrgetter(attribute), setAttribute)
+
+
 class Node(object):
+    # cached result of getTransformation(), None means it has to be calculated
+    _transformation = None
+
+    # cached bounding box of this node and all of its childs, None means it has to be calculated
+    _bounding_box = None
+
+    _parent = None
+
     def __init__(self):
         self._parent = None
         self._childs = []
@@ -50,6 +85,8 @@ class Node(object):
         self._childs.append(node)
 
         node._parent = self
+        node._invalidateTransformation()
+        self._invalidateBoundingBox()
 
     def extend(self, nodes):
         '''
@@ -68,8 +105,10 @@ class Node(object):
         # when all went smooth by now, we can set the parent nodes to ourself
         for node in new_nodes:
             node._parent = self
+            node._invalidateTransformation()
 
         self._childs.extend(new_nodes)
+        self._invalidateBoundingBox()
 
     def remove(self, node):
         '''
@@ -82,6 +121,8 @@ class Node(object):
             self._childs.remove(node)
 
         node._parent = None
+        node._invalidateTransformation()
+        self._invalidateBoundingBox()
 
     def insert(self, node):
         '''
@@ -99,13 +140,88 @@ class Node(object):
     def copy(self):
         copy = deepcopy(self)
         copy._parent = None
+        copy._invalidateTransformation()
         return copy
 
     def serialize(self):
-        nodes = [self]
-        for child in self.getAllChilds():
-            nodes += child.serialize()
-        return nodes
+        return list(self.walk())
+
+    def walk(self, node_type=None, layer=None, virtual_childs=True):
+        r"""Iterate lazily over this node and all of its childs in depth-first order
+
+        :param node_type: (``type``, ``tuple(type)``) --
+            only yield nodes which are an instance of the given type(s)
+        :param layer: (``str``, ``list(str)``) --
+            only yield nodes which are placed on the given layer(s). Nodes with a ``layers`` attribute (like pads) match
+            when any of their layers is given.
+        :param virtual_childs: (``bool``) --
+            include virtual childs (default: True)
+
+        :Example:
+
+        >>> from KicadModTree import *
+        >>> kicad_mod = Footprint("example_footprint")
+        >>> kicad_mod.append(Line(start=[0, 0], end=[1, 0], layer='F.SilkS'))
+        >>> for line in kicad_mod.walk(node_type=Line, layer='F.SilkS'):
+        ...     print(line.start_pos, line.end_pos)
+        """
+        if layer is not None and not isinstance(layer, (list, tuple, set, frozenset)):
+            layer = (layer, )
+
+        for node in self._walk(virtual_childs):
+            if node_type is not None and not isinstance(node, node_type):
+                continue
+            if layer is not None and not Node._isOnLayer(node, layer):
+                continue
+            yield node
+
+    @staticmethod
+    def _isOnLayer(node, layers):
+        node_layer = getattr(node, 'layer', None)
+        if node_layer is not None and node_layer in layers:
+            return True
+
+        return any(node_layer in layers for node_layer in getattr(node, 'layers', None) or [])
+
+    def _walk(self, virtual_childs=True):
+        '''
+        iterate over this node and all of its childs in depth-first order
+        '''
+        stack = [self]
+        pop = stack.pop
+        push = stack.extend
+        while stack:
+            node = pop()
+            yield node
+
+            # childs are pushed in reverse order, so they are popped in their original order
+            if virtual_childs:
+                childs = node.getVirtualChilds()
+                if childs:
+                    push(reversed(childs))
+            childs = node.getNormalChilds()
+            if childs:
+                push(reversed(childs))
+
+    def _walkWithDepth(self, virtual_childs=True):
+        '''
+        iterate over this node and all of its childs in depth-first order, yielding (depth, node) tuples
+        '''
+        stack = [(0, self)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+
+            childs = node.getAllChilds() if virtual_childs else node.getNormalChilds()
+            stack.extend((depth + 1, child) for child in reversed(childs))
+
+    def _iterChilds(self, virtual_childs=True):
+        '''
+        iterate over the childs of this node without building a combined list
+        '''
+        if virtual_childs:
+            return chain(self.getNormalChilds(), self.getVirtualChilds())
+        return iter(self.getNormalChilds())
 
     def getNormalChilds(self):
         '''
@@ -142,36 +258,164 @@ class Node(object):
 
         return self.getParent().getRootNode()
 
+    def _getTransformationMatrix(self):
+        '''
+        affine matrix (a, b, c, d, e, f) which is applied by this node to the coordinates of its childs.
+
+        ``None`` means this node does not transform its childs.
+        '''
+        return None
+
+    def _getTransformationRotation(self):
+        '''
+        rotation in degree which is added by this node to the rotation of its childs
+        '''
+        return 0
+
+    def _invalidateTransformation(self):
+        '''
+        drop the cached transformation and bounding box of this node and all of its childs
+        '''
+        if self._transformation is None:
+            # the transformation of a child is only calculated together with the one of its parents, and a bounding
+            # box only together with the transformation of its node
+            return
+
+        self._transformation = None
+        self._bounding_box = None
+        for child in self.getAllChilds():
+            if child._parent is self:
+                child._invalidateTransformation()
+
+    def getTransformation(self):
+        '''
+        get the transformation from the coordinate system of this node into the one of the root node
+
+        The result is composed from all parent nodes and cached until the tree is changed.
+
+        :return: ``(matrix, rotation)``, where matrix is an affine matrix ``(a, b, c, d, e, f)`` which maps a point
+                 with ``x' = a*x + b*y + c`` and ``y' = d*x + e*y + f``, or ``None`` if no transformation is applied.
+                 rotation is the accumulated rotation in degree.
+        '''
+        if self._transformation is None:
+            matrix = self._getTransformationMatrix()
+            rotation = self._getTransformationRotation()
+
+            if self._parent:
+                parent_matrix, parent_rotation = self._parent.getTransformation()
+                matrix = composeTransformation(parent_matrix, matrix)
+                rotation = parent_rotation + rotation
+
+            self._transformation = (matrix, rotation)
+
+        return self._transformation
+
     def getRealPosition(self, coordinate, rotation=None):
         '''
         return position of point after applying all transformation and rotation operations
         '''
-        if not self._parent:
-            if rotation is None:
-                # TODO: most of the points are 2D Nodes
-                return Vector3D(coordinate)
+        matrix, real_rotation = self.getTransformation()
+
+        if matrix is None:
+            # TODO: most of the points are 2D Nodes
+            position = Vector3D(coordinate)
+        else:
+            if not isinstance(coordinate, Vector2D):
+                coordinate = Vector2D(coordinate)
+            a, b, c, d, e, f = matrix
+            x, y = coordinate.x, coordinate.y
+            position = Vector3D(a*x + b*y + c, d*x + e*y + f)
+
+        if rotation is None:
+            return position
+        else:
+            return position, rotation + real_rotation
+
+    def _geometryChanged(self):
+        '''
+        called when an attribute defined by ``geometryAttribute`` is assigned
+        '''
+        if self._bounding_box is not None or self._parent is not None:
+            self._invalidateBoundingBox()
+
+    def _invalidateBoundingBox(self):
+        '''
+        drop the cached bounding box of this node and all of its parents
+        '''
+        self._bounding_box = None
+
+        # a bounding box is only cached together with the ones of all childs, so all parents of a node without
+        # bounding box have none either
+        node = self._parent
+        while node is not None and node._bounding_box is not None:
+            node._bounding_box = None
+            node = node._parent
+
+    def _calculateOwnBoundingBox(self, matrix):
+        '''
+        bounding box of the geometry of this node itself (without childs) after applying the transformation matrix
+
+        :return: ``(min_x, min_y, max_x, max_y)`` or ``None`` if the node has no geometry
+        '''
+        return None
+
+    def _getBoundingBox(self):
+        '''
+        get the (cached) bounding box of this node and all of its childs in the coordinate system of the root node
+
+        :return: ``(min_x, min_y, max_x, max_y)``, which is ``EMPTY_BOUNDING_BOX`` if there is no geometry
+        '''
+        if self._bounding_box is not None:
+            return self._bounding_box
+
+        # childs are calculated before their parents, without recursion so deep trees are supported
+        stack = [(self, False)]
+        while stack:
+            node, childs_calculated = stack.pop()
+            if childs_calculated:
+                bounding_box = node._calculateOwnBoundingBox(node.getTransformation()[0]) or EMPTY_BOUNDING_BOX
+                for child in node._iterChilds():
+                    bounding_box = mergeBoundingBoxes(bounding_box, child._bounding_box)
+                node._bounding_box = bounding_box
             else:
-                return Vector3D(coordinate), rotation
+                # the transformation of the parent is already cached, so this does not recurse either
+                node.getTransformation()
+                stack.append((node, True))
+                stack.extend((child, False) for child in node._iterChilds() if child._bounding_box is None)
 
-        return self._parent.getRealPosition(coordinate, rotation)
+        return self._bounding_box
 
     def calculateBoundingBox(self, outline=None):
-        min_x, min_y = 0, 0
-        max_x, max_y = 0, 0
+        r"""Calculate the bounding box of this node and all of its childs
 
-        if outline:
-            min_x = outline['min']['x']
-            min_y = outline['min']['y']
-            max_x = outline['max']['x']
-            max_y = outline['max']['y']
+        The bounding box is given in the coordinate system of the root node, which means all transformations (like
+        ``Translation`` and ``Rotation``) are applied. It covers the center lines of graphic elements, the extents of
+        texts and the copper of pads. The result is cached until the tree, a transformation or a public attribute of
+        a node is changed. Changes made inside of an attribute (like ``line.start_pos.x = 1``) are not detected.
 
-        for child in self.getAllChilds():
-            child_outline = child.calculateBoundingBox()
+        :param outline: (``dict``) --
+            additional bounding box (``{'min': Vector2D, 'max': Vector2D}``) which is included in the result
+
+        :return: ``{'min': Vector2D, 'max': Vector2D}``. Nodes without any geometry have an empty bounding box at
+                 [0, 0].
 
-            min_x = min([min_x, child_outline['min']['x']])
-            min_y = min([min_y, child_outline['min']['y']])
-            max_x = max([max_x, child_outline['max']['x']])
-            max_y = max([max_y, child_outline['max']['y']])
+        :Example:
+
+        >>> from KicadModTree import *
+        >>> kicad_mod = Footprint("example_footprint")
+        >>> kicad_mod.append(Circle(center=[1, 1], radius=2, layer='F.Fab'))
+        >>> bounding_box = kicad_mod.calculateBoundingBox()  # min: [-1, -1], max: [3, 3]
+        """
+        min_x, min_y, max_x, max_y = self._getBoundingBox()
+
+        if outline:
+            min_x = min(min_x, outline['min']['x'])
+            min_y = min(min_y, outline['min']['y'])
+            max_x = max(max_x, outline['max']['x'])
+            max_y = max(max_y, outline['max']['y'])
+
+        if min_x > max_x:
+            return {'min': Vector2D(0, 0), 'max': Vector2D(0, 0)}
 
         return {'min': Vector2D(min_x, min_y), 'max': Vector2D(max_x, max_y)}
 
@@ -190,40 +434,61 @@ class Node(object):
 
         return "*"
 
-    def getRenderTree(self, rendered_nodes=None):
-        '''
-        print render tree
-        '''
+    def _getRenderTree(self, rendered_nodes, virtual_childs):
         if rendered_nodes is None:
             rendered_nodes = set()
 
-        if self in rendered_nodes:
-            raise RecursionDetectedError('recursive definition of render tree!')
+        node_strings = []
+        for depth, node in self._walkWithDepth(virtual_childs):
+            if node in rendered_nodes:
+                raise RecursionDetectedError('recursive definition of render tree!')
+            rendered_nodes.add(node)
 
-        rendered_nodes.add(self)
+            node_str = "{0} {1}".format(node._getRenderTreeSymbol(), node._getRenderTreeText())
+            indentation = '  ' * depth
+            node_strings.append(''.join(indentation + line for line in node_str.splitlines(True)))
 
-        tree_str = "{0} {1}".format(self._getRenderTreeSymbol(), self._getRenderTreeText())
-        for child in self.getNormalChilds():
-            tree_str += '\n  '
-            tree_str += '  '.join(child.getRenderTree(rendered_nodes).splitlines(True))
+        return '\n'.join(node_strings)
 
-        return tree_str
+    def getRenderTree(self, rendered_nodes=None):
+        '''
+        print render tree
+        '''
+        return self._getRenderTree(rendered_nodes, virtual_childs=False)
 
     def getCompleteRenderTree(self, rendered_nodes=None):
         '''
         print virtual render tree
         '''
-        if rendered_nodes is None:
-            rendered_nodes = set()
+        return self._getRenderTree(rendered_nodes, virtual_childs=True)
 
-        if self in rendered_nodes:
-            raise RecursionDetectedError('recursive definition of render tree!')
 
-        rendered_nodes.add(self)
+class LazyNode(Node):
+    r"""Base class for nodes which create their virtual childs on demand
 
-        tree_str = "{0} {1}".format(self._getRenderTreeSymbol(), self._getRenderTreeText())
-        for child in self.getAllChilds():
-            tree_str += '\n  '
-            tree_str += '  '.join(child.getCompleteRenderTree(rendered_nodes).splitlines(True))
+    The virtual childs are created by ``_createVirtualChilds`` when they are queried for the first time and cached
+    afterwards. The parameters of the node are defined by ``geometryAttribute``, assigning one of them
+    (like ``node.center = [1, 1]``) drops the cache, so the virtual childs are created again with the new parameters.
+    Changes made inside of an attribute (like ``node.center.x = 1``) are not detected.
+    """
+
+    _virtual_childs = None
+
+    def _geometryChanged(self):
+        Node._geometryChanged(self)
+        self._virtual_childs = None
 
-        return tree_str
+    def _createVirtualChilds(self):
+        '''
+        create the virtual childs of this node, can return any iterable
+        '''
+        raise NotImplementedError('_createVirtualChilds is not implemented for {}'.format(self.__class__.__name__))
+
+    def getVirtualChilds(self):
+        if self._virtual_childs is None:
+            virtual_childs = list(self._createVirtualChilds())
+            # like normal childs, the virtual childs are placed in the coordinate system of this node
+            for child in virtual_childs:
+                child._parent = self
+            self._virtual_childs = virtual_childs
+        return self._virtual_childs
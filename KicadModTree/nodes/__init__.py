@@ -13,11 +13,18 @@
 #
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
-# generic node
-from .Node import Node, MultipleParentsError, RecursionDetectedError
+from KicadModTree.util import lazy_import as _lazy_import
 
-# root node
-from .Footprint import Footprint
+# the nodes are imported when they are used for the first time
+_lazy_import.lazyImport(__name__, [
+    # generic node
+    ('.Node', ['Node', 'LazyNode', 'MultipleParentsError', 'RecursionDetectedError']),
 
-from .base import *
-from .specialized import *
+    # root node
+    ('.Footprint', ['Footprint']),
+
+    ('.base', None),
+    ('.base', _lazy_import.ALL_NAMES),
+    ('.specialized', None),
+    ('.specialized', _lazy_import.ALL_NAMES),
+])
@@ -14,7 +14,8 @@
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 from KicadModTree.Vector import *
-from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.Node import Node, geometryAttribute
+from KicadModTree.util.geometric_util import arcBoundingBox
 import math
 
 
@@ -42,6 +43,11 @@ class Arc(Node):
     >>> Arc(center=[0, 0], start=[-1, 0], angle=180, layer='F.SilkS')
     """
 
+    center_pos = geometryAttribute('center_pos')
+    start_pos = geometryAttribute('start_pos')
+    angle = geometryAttribute('angle')
+    width = geometryAttribute('width')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.center_pos = Vector2D(kwargs['center'])
@@ -51,30 +57,8 @@ class Arc(Node):
         self.layer = kwargs.get('layer', 'F.SilkS')
         self.width = kwargs.get('width')
 
-    def calculateBoundingBox(self):
-        # TODO: finish implementation
-        min_x = min(self.start_pos.x, self._calulateEndPos().x)
-        min_y = min(self.start_pos.x, self._calulateEndPos().y)
-        max_x = max(self.start_pos.x, self._calulateEndPos().x)
-        max_y = max(self.start_pos.x, self._calulateEndPos().y)
-
-        '''
-        for angle in range(4):
-            float_angle = angle * math.pi/2.
-
-            start_angle = _calculateStartAngle(self)
-            end_angle = start_angle + math.radians(self.angle)
-
-            # TODO: +- pi border
-            if float_angle < start_angle:
-                continue
-            if float_angle > end_angle:
-                continue
-
-            print("TODO: add angle side: {1}".format(float_angle))
-        '''
-
-        return Node.calculateBoundingBox({'min': Vector2D((min_x, min_y)), 'max': Vector2D((max_x, max_y))})
+    def _calculateOwnBoundingBox(self, matrix):
+        return arcBoundingBox(self.center_pos, self.start_pos, self.angle, matrix)
 
     def _calulateEndPos(self):
         radius = self._calculateRadius()
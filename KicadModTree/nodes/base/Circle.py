@@ -14,7 +14,8 @@
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 from KicadModTree.Vector import *
-from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.Node import Node, geometryAttribute
+from KicadModTree.util.geometric_util import circleBoundingBox
 
 
 class Circle(Node):
@@ -39,6 +40,11 @@ class Circle(Node):
     >>> Circle(center=[0, 0], radius=1.5, layer='F.SilkS')
     """
 
+    center_pos = geometryAttribute('center_pos')
+    radius = geometryAttribute('radius')
+    end_pos = geometryAttribute('end_pos')
+    width = geometryAttribute('width')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.center_pos = Vector2D(kwargs['center'])
@@ -49,13 +55,8 @@ class Circle(Node):
         self.layer = kwargs.get('layer', 'F.SilkS')
         self.width = kwargs.get('width')
 
-    def calculateBoundingBox(self):
-        min_x = self.center_pos.x-self.radius
-        min_y = self.center_pos.y-self.radius
-        max_x = self.center_pos.x+self.radius
-        max_y = self.center_pos.y+self.radius
-
-        return Node.calculateBoundingBox({'min': ParseXY(min_x, min_y), 'max': ParseXY(max_x, max_y)})
+    def _calculateOwnBoundingBox(self, matrix):
+        return circleBoundingBox(self.center_pos.x, self.center_pos.y, self.radius, matrix)
 
     def _getRenderTreeText(self):
         render_strings = ['fp_circle']
@@ -14,7 +14,8 @@
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 from KicadModTree.Vector import *
-from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.Node import Node, geometryAttribute
+from KicadModTree.util.geometric_util import pointsBoundingBox
 
 
 class Line(Node):
@@ -39,6 +40,10 @@ class Line(Node):
     >>> Line(start=[1, 0], end=[-1, 0], layer='F.SilkS')
     """
 
+    start_pos = geometryAttribute('start_pos')
+    end_pos = geometryAttribute('end_pos')
+    width = geometryAttribute('width')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.start_pos = Vector2D(kwargs['start'])
@@ -47,16 +52,8 @@ class Line(Node):
         self.layer = kwargs.get('layer', 'F.SilkS')
         self.width = kwargs.get('width')
 
-    def calculateBoundingBox(self):
-        render_start_pos = self.getRealPosition(self.start_pos)
-        render_end_pos = self.getRealPosition(self.end_pos)
-
-        min_x = min([render_start_pos.x, render_end_pos.x])
-        min_y = min([render_start_pos.y, render_end_pos.y])
-        max_x = max([render_start_pos.x, render_end_pos.x])
-        max_y = max([render_start_pos.y, render_end_pos.y])
-
-        return Node.calculateBoundingBox({'min': Vector2D(min_x, min_y), 'max': Vector2D(max_x, max_y)})
+    def _calculateOwnBoundingBox(self, matrix):
+        return pointsBoundingBox([self.start_pos, self.end_pos], matrix)
 
     def _getRenderTreeText(self):
         render_strings = ['fp_line']
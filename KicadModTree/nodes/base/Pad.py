@@ -16,8 +16,10 @@
 
 from KicadModTree.util.paramUtil import *
 from KicadModTree.Vector import *
-from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.Node import Node, geometryAttribute
 from KicadModTree.util.kicad_util import lispString
+from KicadModTree.util.geometric_util import circleBoundingBox, composeTransformation, growBoundingBox, \
+    mergeBoundingBoxes, placementMatrix, rectangleBoundingBox
 from KicadModTree.nodes.base.Arc import Arc
 from KicadModTree.nodes.base.Circle import Circle
 from KicadModTree.nodes.base.Line import Line
@@ -103,6 +105,13 @@ class Pad(Node):
     SHAPE_IN_ZONE_OUTLINE = 'outline'
     _SHAPE_IN_ZONE = [SHAPE_IN_ZONE_CONVEX, SHAPE_IN_ZONE_OUTLINE]
 
+    at = geometryAttribute('at')
+    size = geometryAttribute('size')
+    rotation = geometryAttribute('rotation')
+    shape = geometryAttribute('shape')
+    anchor_shape = geometryAttribute('anchor_shape')
+    primitives = geometryAttribute('primitives')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.radius_ratio = 0
@@ -241,9 +250,29 @@ class Pad(Node):
             raise ValueError('{shape} is an illegal specifier for the shape in zone option'
                              .format(shape=self.shape_in_zone))
 
-    # calculate the outline of a pad
-    def calculateBoundingBox(self):
-        return Node.calculateBoundingBox(self)
+    def _calculateOwnBoundingBox(self, matrix):
+        return self._calculatePadBoundingBox(matrix, self.at.x, self.at.y)
+
+    def _calculatePadBoundingBox(self, matrix, x, y):
+        '''
+        bounding box of the copper of this pad placed at (x, y), after applying the transformation matrix
+        '''
+        placement = composeTransformation(matrix, placementMatrix(x, y, self.rotation))
+
+        if self.shape == Pad.SHAPE_CIRCLE or (self.shape == Pad.SHAPE_CUSTOM and
+                                              self.anchor_shape == Pad.ANCHOR_CIRCLE):
+            bounding_box = circleBoundingBox(0, 0, self.size.x / 2., placement)
+        else:
+            bounding_box = rectangleBoundingBox(self.size.x, self.size.y, placement)
+
+        if self.shape == Pad.SHAPE_CUSTOM:
+            # primitives are given relative to the pad, their line width is part of the copper
+            for primitive in self.primitives:
+                primitive_box = growBoundingBox(primitive._calculateOwnBoundingBox(placement),
+                                                (primitive.width or 0) / 2.)
+                bounding_box = mergeBoundingBoxes(bounding_box, primitive_box)
+
+        return bounding_box
 
     def _getRenderTreeText(self):
         render_strings = ['pad']
@@ -266,6 +295,7 @@ class Pad(Node):
         :param p: the primitive to add
         """
         self.primitives.append(p)
+        self._invalidateBoundingBox()
 
     def getRoundRadius(self):
         if self.shape == Pad.SHAPE_CUSTOM:
@@ -16,6 +16,9 @@
 from KicadModTree.PolygonPoints import *
 from KicadModTree.Vector import *
 from KicadModTree.nodes.Node import Node
+# private name, this module is star imported by other nodes
+from KicadModTree.nodes.Node import geometryAttribute as _geometryAttribute
+from KicadModTree.util.geometric_util import pointsBoundingBox
 
 
 class Polygon(Node):
@@ -42,6 +45,9 @@ class Polygon(Node):
     >>> Polygon(nodes=[[-2, 0], [0, -2], [4, 0], [0, 2]], layer='F.SilkS')
     """
 
+    nodes = _geometryAttribute('nodes')
+    width = _geometryAttribute('width')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.nodes = PolygonPoints(**kwargs)
@@ -49,8 +55,8 @@ class Polygon(Node):
         self.layer = kwargs.get('layer', 'F.SilkS')
         self.width = kwargs.get('width')
 
-    def calculateBoundingBox(self):
-        return nodes.calculateBoundingBox()
+    def _calculateOwnBoundingBox(self, matrix):
+        return pointsBoundingBox(self.nodes.nodes, matrix)
 
     def _getRenderTreeText(self):
         render_text = Node._getRenderTreeText(self)
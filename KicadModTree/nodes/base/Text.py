@@ -14,7 +14,8 @@
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 from KicadModTree.Vector import *
-from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.Node import Node, geometryAttribute
+from KicadModTree.util.geometric_util import composeTransformation, placementMatrix, rectangleBoundingBox
 
 
 class Text(Node):
@@ -48,6 +49,11 @@ class Text(Node):
     >>> Text(type='value', text="footprint name", at=[0, 3], layer='F.Fab')
     """
 
+    text = geometryAttribute('text')
+    at = geometryAttribute('at')
+    rotation = geometryAttribute('rotation')
+    size = geometryAttribute('size')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.type = kwargs['type']
@@ -61,16 +67,13 @@ class Text(Node):
 
         self.hide = kwargs.get('hide', False)
 
-    def calculateBoundingBox(self):
-        width = len(self.text)*self.size['x']
-        height = self.size['y']
-
-        min_x = self.at['x']-width/2.
-        min_y = self.at['y']-height/2.
-        max_x = self.at['x']+width/2.
-        max_y = self.at['y']+height/2.
+    def _calculateOwnBoundingBox(self, matrix):
+        # approximation of the text extents, every character is assumed to be as wide as the font size
+        width = len(self.text)*self.size.x
+        height = self.size.y
 
-        return Node.calculateBoundingBox({'min': Vector2D(min_x, min_y), 'max': Vector2D(max_x, max_y)})
+        placement = composeTransformation(matrix, placementMatrix(self.at.x, self.at.y, self.rotation))
+        return rectangleBoundingBox(width, height, placement)
 
     def _getRenderTreeText(self):
         render_text = Node._getRenderTreeText(self)
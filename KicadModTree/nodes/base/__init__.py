@@ -13,16 +13,15 @@
 #
 # (C) 2016-2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
-from .Arc import Arc
+from KicadModTree.util import lazy_import as _lazy_import
 
-from .Circle import Circle
-
-from .Line import Line
-
-from .Model import Model
-
-from .Pad import Pad
-
-from .Polygon import Polygon
-
-from .Text import Text
+# the nodes are imported when they are used for the first time
+_lazy_import.lazyImport(__name__, [
+    ('.Arc', ['Arc']),
+    ('.Circle', ['Circle']),
+    ('.Line', ['Line']),
+    ('.Model', ['Model']),
+    ('.Pad', ['Pad']),
+    ('.Polygon', ['Polygon']),
+    ('.Text', ['Text']),
+])
@@ -228,6 +228,7 @@ class ChamferedPad(Node):
         self.radius_ratio = kwargs.get('radius_ratio', 0)
         self.maximum_radius = kwargs.get('maximum_radius')
         self.pad = self._generatePad()
+        self.pad._parent = self
 
     def _initSize(self, **kwargs):
         if not kwargs.get('size'):
@@ -359,6 +360,8 @@ class ChamferedPad(Node):
         self.chamfer_size = Vector2D([x if x > 0 else 0 for x in self.chamfer_size])
 
         self.pad = self._generatePad()
+        self.pad._parent = self
+        self._geometryChanged()
         return self.chamfer_size
 
     def getVirtualChilds(self):
@@ -20,6 +20,9 @@ from KicadModTree.util.paramUtil import *
 from KicadModTree.Vector import *
 from KicadModTree.nodes.base.Polygon import *
 from KicadModTree.nodes.specialized.ChamferedPad import *
+from KicadModTree.nodes.Node import LazyNode
+# private name, this module is star imported by KicadModTree.nodes.specialized and other nodes
+from KicadModTree.nodes.Node import geometryAttribute as _geometryAttribute
 
 
 class ChamferSelPadGrid(CornerSelection):
@@ -141,7 +144,7 @@ class ChamferSelPadGrid(CornerSelection):
         return result
 
 
-class ChamferedPadGrid(Node):
+class ChamferedPadGrid(LazyNode):
     r"""Add a ChamferedPad to the render tree
 
     :param \**kwargs:
@@ -187,6 +190,16 @@ class ChamferedPadGrid(Node):
           Limits the radius.
     """
 
+    # parameters the virtual childs are created from
+    number = _geometryAttribute('number')
+    center = _geometryAttribute('center')
+    pincount = _geometryAttribute('pincount')
+    size = _geometryAttribute('size')
+    grid = _geometryAttribute('grid')
+    chamfer_selection = _geometryAttribute('chamfer_selection')
+    chamfer_size = _geometryAttribute('chamfer_size')
+    padargs = _geometryAttribute('padargs')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         if len(kwargs) == 0:
@@ -200,6 +213,10 @@ class ChamferedPadGrid(Node):
         self._initGrid(**kwargs)
         self._initPadSettings(**kwargs)
 
+        # the pads are created when they are queried for the first time, all of them are created from the same
+        # parameters, so creating the first one reports invalid parameters here
+        next(self._generatePads(), None)
+
     def _initCount(self, **kwargs):
         if 'pincount' not in kwargs:
             raise KeyError('pincount not declared (like "pincount=10")')
@@ -322,24 +339,24 @@ class ChamferedPadGrid(Node):
         left = -self.grid['x']*(self.pincount[0]-1)/2+self.center['x']
         top = -self.grid['y']*(self.pincount[1]-1)/2+self.center['y']
 
-        pads = []
         for idx_x in range(self.pincount[0]):
             x = left+idx_x*self.grid['x']
             for idx_y in range(self.pincount[1]):
                 y = top+idx_y*self.grid['y']
                 corner = self.__padCornerSelection(idx_x, idx_y)
-                pads.append(ChamferedPad(
+                yield ChamferedPad(
                     at=[x, y], number=self.number, size=self.size,
                     chamfer_size=self.chamfer_size,
                     corner_selection=corner,
                     **self.padargs
-                    ))
-        return pads
+                    )
 
-    def getVirtualChilds(self):
+    def _createVirtualChilds(self):
         return self._generatePads()
 
     def __copy__(self):
         newone = type(self)()
         newone.__dict__.update(self.__dict__)
+        # the copy creates its own pads
+        newone._virtual_childs = None
         return newone
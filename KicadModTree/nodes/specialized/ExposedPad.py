@@ -23,13 +23,13 @@ from KicadModTree.util.paramUtil import *
 from KicadModTree.nodes.base.Pad import *
 from KicadModTree.nodes.specialized.ChamferedPadGrid import *
 from KicadModTree.nodes.specialized.PadArray import *
-from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.Node import Node, LazyNode, geometryAttribute
 from math import sqrt, floor
 from copy import copy
 import traceback
 
 
-class ExposedPad(Node):
+class ExposedPad(LazyNode):
     r"""Add an exposed pad
 
     Complete with correct paste, mask and via handling
@@ -120,6 +120,34 @@ class ExposedPad(Node):
     VIA_TENTED_BOTTOM_ONLY = 'bottom'
     VIA_NOT_TENTED = 'none'
 
+    # parameters the virtual childs are created from
+    number = geometryAttribute('number')
+    at = geometryAttribute('at')
+    size = geometryAttribute('size')
+    mask_size = geometryAttribute('mask_size')
+    size_round_base = geometryAttribute('size_round_base')
+    grid_round_base = geometryAttribute('grid_round_base')
+    radius_ratio = geometryAttribute('radius_ratio')
+    maximum_radius = geometryAttribute('maximum_radius')
+    kicad4_compatible = geometryAttribute('kicad4_compatible')
+    has_vias = geometryAttribute('has_vias')
+    via_layout = geometryAttribute('via_layout')
+    via_grid = geometryAttribute('via_grid')
+    via_drill = geometryAttribute('via_drill')
+    via_size = geometryAttribute('via_size')
+    via_tented = geometryAttribute('via_tented')
+    bottom_pad_Layers = geometryAttribute('bottom_pad_Layers')
+    add_bottom_pad = geometryAttribute('add_bottom_pad')
+    bottom_size = geometryAttribute('bottom_size')
+    vias_in_mask = geometryAttribute('vias_in_mask')
+    via_clarance = geometryAttribute('via_clarance')
+    paste_between_vias = geometryAttribute('paste_between_vias')
+    paste_rings_outside = geometryAttribute('paste_rings_outside')
+    paste_layout = geometryAttribute('paste_layout')
+    paste_avoid_via = geometryAttribute('paste_avoid_via')
+    paste_reduction = geometryAttribute('paste_reduction')
+    paste_area_size = geometryAttribute('paste_area_size')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.at = Vector2D(kwargs.get('at', [0, 0]))
@@ -139,6 +167,11 @@ class ExposedPad(Node):
         self._initThermalVias(**kwargs)
         self._initPaste(**kwargs)
 
+        # the pads are created when they are queried for the first time, creating the main pad reports invalid
+        # parameters (like the radius ratio) here
+        self.__initMainMaxRadius()
+        self.__createMainPad()
+
     def _initNumber(self, **kwargs):
         if not kwargs.get('number'):
             raise KeyError('pad number for exposed pad not declared (like "number=9")')
@@ -538,8 +571,7 @@ class ExposedPad(Node):
 
         return pads
 
-    def getVirtualChilds(self):
-        # traceback.print_stack()
+    def __initMainMaxRadius(self):
         if self.has_vias:
             if self.maximum_radius:
                 self.main_max_radius = min(self.maximum_radius, self.via_size/2)
@@ -548,6 +580,10 @@ class ExposedPad(Node):
         else:
             self.main_max_radius = self.maximum_radius
 
+    def _createVirtualChilds(self):
+        # traceback.print_stack()
+        self.__initMainMaxRadius()
+
         pads = []
         pads += self.__createMainPad()
         if self.has_vias:
@@ -36,6 +36,8 @@ class FilledRect(Node):
           layer on which the rect is drawn (default: 'F.SilkS')
         * *width* (``float``) --
           width of the outer line (default: 0.15)
+        * *fill_type* (``RectFill.FILL_HATCH``, ``RectFill.FILL_POLYGON``) --
+          how the rect is filled, see ``RectFill`` (default: ``RectFill.default_fill_type``)
 
     :Example:
 
@@ -51,13 +53,17 @@ class FilledRect(Node):
         self.layer = kwargs.get('layer', 'F.SilkS')
         self.width = kwargs.get('width', 0.12)  # TODO: better variation to get line width
 
-        rect_line = RectLine(**kwargs)
-        rect_line._parent = self
-
         rect_fill = RectFill(**kwargs)
         rect_fill._parent = self
 
-        self.virtual_childs = [rect_line, rect_fill]
+        if rect_fill.fill_type == RectFill.FILL_POLYGON:
+            # the outline of the polygon already draws the border of the rect
+            self.virtual_childs = [rect_fill]
+        else:
+            rect_line = RectLine(**kwargs)
+            rect_line._parent = self
+
+            self.virtual_childs = [rect_line, rect_fill]
 
     def getVirtualChilds(self):
         return self.virtual_childs
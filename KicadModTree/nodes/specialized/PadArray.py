@@ -18,16 +18,19 @@
 
 from KicadModTree.nodes.base.Pad import *
 from KicadModTree.nodes.specialized.ChamferedPad import *
-from KicadModTree.nodes.Node import Node
+from KicadModTree.nodes.Node import Node, LazyNode, geometryAttribute
 
 from KicadModTree.util.paramUtil import *
 
 
-class PadArray(Node):
+class PadArray(LazyNode):
     r"""Add a row of Pads
 
     Simplifies the handling of pads which are rendered in a specific form
 
+    The pads are only created when they are queried for the first time (for example while serializing). Their
+    parameters are checked by the constructor.
+
     :param \**kwargs:
         See below
 
@@ -87,6 +90,15 @@ class PadArray(Node):
     ...          type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, size=[1,2], layers=Pad.LAYERS_SMT)
     """
 
+    # parameters the virtual childs are created from
+    pad_params = geometryAttribute('pad_params')
+    pincount = geometryAttribute('pincount')
+    exclude_pin_list = geometryAttribute('exclude_pin_list')
+    startingPosition = geometryAttribute('startingPosition')
+    initialPin = geometryAttribute('initialPin')
+    increment = geometryAttribute('increment')
+    spacing = geometryAttribute('spacing')
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self._initPincount(**kwargs)
@@ -94,7 +106,8 @@ class PadArray(Node):
         self._initInitialNumber(**kwargs)
         self._initSpacing(**kwargs)
         self._initStartingPosition(**kwargs)
-        self.virtual_childs = self._createPads(**kwargs)
+        self._validatePadParameters(**kwargs)
+        self.pad_params = kwargs
 
     # How many pads in the array
     def _initPincount(self, **kwargs):
@@ -189,28 +202,22 @@ class PadArray(Node):
         if all([i == 0 for i in self.spacing]):
             raise ValueError('pad spacing ({sp}) must be non-zero'.format(sp=self.spacing))
 
-    def _createPads(self, **kwargs):
-
-        pads = []
-
-        x_start, y_start = self.startingPosition
-        x_spacing, y_spacing = self.spacing
-
-        padShape = kwargs.get('shape')
-
+    def _padNumbers(self):
         # Special case, increment = 0
         # this can be used for creating an array with all the same pad number
         if self.increment == 0:
-            pad_numbers = [self.initialPin] * self.pincount
+            return [self.initialPin] * self.pincount
         elif type(self.increment) == int:
-            pad_numbers = range(self.initialPin, self.initialPin + (self.pincount * self.increment), self.increment)
+            return range(self.initialPin, self.initialPin + (self.pincount * self.increment), self.increment)
         elif callable(self.increment):
             pad_numbers = [self.initialPin]
             for idx in range(1, self.pincount):
                 pad_numbers.append(self.increment(pad_numbers[-1]))
+            return pad_numbers
         else:
             raise TypeError("Wrong type for increment. It must be either a int or callable.")
 
+    def _endPadParameters(self, **kwargs):
         end_pad_params = copy(kwargs)
         if kwargs.get('end_pads_size_reduction'):
             size_reduction = kwargs['end_pads_size_reduction']
@@ -230,6 +237,48 @@ class PadArray(Node):
         else:
             delta_pos = Vector2D(0, 0)
 
+        return end_pad_params, delta_pos
+
+    def _validatePadParameters(self, **kwargs):
+        """
+        create one pad of every kind the array consists of, so invalid pad parameters are reported by the
+        constructor of the array and not when the pads are created
+        """
+        number = self._padNumbers()[0]
+        end_pad_params = self._endPadParameters(**kwargs)[0]
+
+        parameter_sets = [kwargs]
+        if kwargs.get('end_pads_size_reduction'):
+            parameter_sets.append(end_pad_params)
+        if kwargs.get('type') == Pad.TYPE_THT:
+            pad1_params = copy(kwargs)
+            pad1_params['shape'] = kwargs.get('tht_pad1_shape', Pad.SHAPE_ROUNDRECT)
+            pad1_params.setdefault('radius_ratio', 0.25)
+            pad1_params.setdefault('maximum_radius', 0.25)
+            parameter_sets.append(pad1_params)
+
+        for pad_params in parameter_sets:
+            Pad(number=number, at=self.startingPosition, **pad_params)
+
+        if kwargs.get('chamfer_size'):
+            for corner_selection in ('chamfer_corner_selection_first', 'chamfer_corner_selection_last'):
+                if corner_selection in kwargs:
+                    ChamferedPad(number=number, at=self.startingPosition,
+                                 corner_selection=kwargs.get(corner_selection), **end_pad_params)
+
+    def _createPads(self, **kwargs):
+        x_start, y_start = self.startingPosition
+        x_spacing, y_spacing = self.spacing
+
+        padShape = kwargs.get('shape')
+
+        pad_numbers = self._padNumbers()
+        end_pad_params, delta_pos = self._endPadParameters(**kwargs)
+
+        # parameters of all pads which are neither end pads nor pad 1 of a THT array
+        pad_params = copy(kwargs)
+        pad_params['shape'] = padShape
+
         for i, number in enumerate(pad_numbers):
             includePad = (i + self.initialPin) not in self.exclude_pin_list
             for exi in self.exclude_pin_list:
@@ -241,11 +290,13 @@ class PadArray(Node):
                     x_start + i * x_spacing,
                     y_start + i * y_spacing
                     )
-                current_pad_params = copy(kwargs)
+                current_pad_params = pad_params
                 if i == 0 or i == len(pad_numbers)-1:
                     current_pad_pos += delta_pos
                     current_pad_params = end_pad_params
                 if kwargs.get('type') == Pad.TYPE_THT and number == kwargs.get('tht_pad1_id', 1):
+                    if current_pad_params is pad_params:
+                        current_pad_params = copy(kwargs)
                     current_pad_params['shape'] = kwargs.get('tht_pad1_shape', Pad.SHAPE_ROUNDRECT)
                     if 'radius_ratio' not in current_pad_params:
                         current_pad_params['radius_ratio'] = 0.25
@@ -255,24 +306,24 @@ class PadArray(Node):
                     current_pad_params['shape'] = padShape
                 if kwargs.get('chamfer_size'):
                     if i == 0 and 'chamfer_corner_selection_first' in kwargs:
-                        pads.append(
-                            ChamferedPad(
+                        yield ChamferedPad(
                                 number=number, at=current_pad_pos,
                                 corner_selection=kwargs.get('chamfer_corner_selection_first'),
                                 **current_pad_params
-                                ))
+                                )
                         continue
                     if i == len(pad_numbers)-1 and 'chamfer_corner_selection_last' in kwargs:
-                        pads.append(
-                            ChamferedPad(
+                        yield ChamferedPad(
                                 number=number, at=current_pad_pos,
                                 corner_selection=kwargs.get('chamfer_corner_selection_last'),
                                 **current_pad_params
-                                ))
+                                )
                         continue
-                pads.append(Pad(number=number, at=current_pad_pos, **current_pad_params))
+                yield Pad(number=number, at=current_pad_pos, **current_pad_params)
 
-        return pads
+    def _createVirtualChilds(self):
+        return self._createPads(**self.pad_params)
 
-    def getVirtualChilds(self):
-        return self.virtual_childs
+    @property
+    def virtual_childs(self):
+        return self.getVirtualChilds()
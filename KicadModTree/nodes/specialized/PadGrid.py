@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+from array import array
+
+from KicadModTree.nodes.base.Pad import Pad
+from KicadModTree.nodes.Node import Node, geometryAttribute
+from KicadModTree.util.kicad_util import lispString
+from KicadModTree.util.paramUtil import *
+from KicadModTree.Vector import *
+
+
+class PadGrid(Node):
+    r"""Add a uniform grid of equal pads (like the balls of a BGA)
+
+    In contrast to creating one ``Pad`` per grid position, only the properties shared by all pads, the coordinates of
+    the rows and columns and a mask of skipped positions are stored. The pads are generated while serializing.
+
+    :param \**kwargs:
+        See below
+
+    :Keyword Arguments:
+        * *layout* (``[int, int]``) --
+          number of columns and rows of the grid
+        * *pitch* (``float``, ``Vector2D``) --
+          distance between two columns and two rows
+        * *center* (``Vector2D``) --
+          center the grid around a specific point (default: [0, 0])
+        * *row_names* (``list(str)``) --
+          names of the rows, the pad number is the row name followed by the column number (like "A1").
+          If not given, the pads are numbered row by row starting with 1.
+        * *row_skips* (``list(list(int, [int, int]))``) --
+          for every row the columns (starting with 1) which should be left out. A column range can be given as
+          ``[start, stop]`` (stop is excluded).
+        * *type*, *shape*, *rotation*, *size*, *drill*, *radius_ratio*, *layers*, ... --
+          properties of the pads, see ``Pad``
+
+    :Example:
+
+    >>> from KicadModTree import *
+    >>> PadGrid(layout=[10, 10], pitch=0.8, row_names=['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'J', 'K'],
+    ...         row_skips=[[1], [], [[4, 8]]], type=Pad.TYPE_SMT, shape=Pad.SHAPE_CIRCLE, size=0.4,
+    ...         layers=Pad.LAYERS_SMT)
+    """
+
+    pad = geometryAttribute('pad')
+    layout = geometryAttribute('layout')
+    pitch = geometryAttribute('pitch')
+    x_positions = geometryAttribute('x_positions')
+    y_positions = geometryAttribute('y_positions')
+    skip_mask = geometryAttribute('skip_mask')
+
+    def __init__(self, **kwargs):
+        Node.__init__(self)
+        self._initLayout(**kwargs)
+        self._initPositions(**kwargs)
+        self._initRowNames(**kwargs)
+        self._initSkipMask(**kwargs)
+
+        # properties shared by all pads. This pad is never added to the render tree.
+        pad_params = dict(kwargs)
+        pad_params.update(number="", at=[0, 0])
+        self.pad = Pad(**pad_params)
+
+    def _initLayout(self, **kwargs):
+        if not kwargs.get('layout'):
+            raise KeyError('layout not declared (like "layout=[10, 10]")')
+        self.layout = toIntArray(kwargs.get('layout'))
+
+    def _initPositions(self, **kwargs):
+        if kwargs.get('pitch') is None:
+            raise KeyError('pitch not declared (like "pitch=0.8")')
+        self.pitch = toVectorUseCopyIfNumber(kwargs.get('pitch'), low_limit=0)
+        center = Vector2D(kwargs.get('center', [0, 0]))
+
+        columns, rows = self.layout
+        x_start = center.x - self.pitch.x * ((columns - 1) / 2.0)
+        y_start = center.y - self.pitch.y * ((rows - 1) / 2.0)
+
+        self.x_positions = array('d', [x_start + column * self.pitch.x for column in range(columns)])
+        self.y_positions = array('d', [y_start + row * self.pitch.y for row in range(rows)])
+
+    def _initRowNames(self, **kwargs):
+        self.row_names = kwargs.get('row_names')
+        if self.row_names is not None:
+            if len(self.row_names) < self.layout[1]:
+                raise ValueError('{count} row names required, but only {given} given'.format(
+                    count=self.layout[1], given=len(self.row_names)))
+            self.row_names = list(self.row_names[:self.layout[1]])
+
+    def _initSkipMask(self, **kwargs):
+        columns, rows = self.layout
+        self.skip_mask = bytearray(columns * rows)
+
+        row_skips = kwargs.get('row_skips') or []
+        if len(row_skips) > rows:
+            raise ValueError('row skips given for {given} rows, but the grid has only {count} rows'.format(
+                given=len(row_skips), count=rows))
+
+        for row, skips in enumerate(row_skips):
+            for item in skips:
+                if type(item) in [list, tuple]:
+                    # If item is a range, remove that range
+                    skipped_columns = range(*item)
+                else:
+                    # If item is an int, remove that int
+                    skipped_columns = [item]
+
+                for column in skipped_columns:
+                    if column < 1 or column > columns:
+                        continue
+                    self.skip_mask[row * columns + column - 1] = 1
+
+    @property
+    def layers(self):
+        return self.pad.layers
+
+    def getPadNumber(self, column, row):
+        r"""Number of the pad at the given grid position (both starting with 0)"""
+        if self.row_names is None:
+            return row * self.layout[0] + column + 1
+        return "{}{}".format(self.row_names[row], column + 1)
+
+    def getPadCount(self):
+        r"""Number of pads which are not skipped"""
+        return len(self.skip_mask) - sum(self.skip_mask)
+
+    def iterPads(self):
+        r"""Iterate over all pads which are not skipped
+
+        :return: ``(number, x, y)`` for every pad, row by row
+        """
+        columns = self.layout[0]
+        x_positions = self.x_positions
+        skip_mask = self.skip_mask
+
+        for row, y in enumerate(self.y_positions):
+            offset = row * columns
+            for column, x in enumerate(x_positions):
+                if not skip_mask[offset + column]:
+                    yield self.getPadNumber(column, row), x, y
+
+    def _calculateOwnBoundingBox(self, matrix):
+        # all pads have the same shape, so only their positions have to be transformed one by one
+        if matrix is None:
+            shape_box = self.pad._calculatePadBoundingBox(None, 0, 0)
+            a, b, c, d, e, f = 1, 0, 0, 0, 1, 0
+        else:
+            a, b, c, d, e, f = matrix
+            shape_box = self.pad._calculatePadBoundingBox((a, b, 0, d, e, 0), 0, 0)
+
+        min_x = min_y = float('inf')
+        max_x = max_y = float('-inf')
+        for _, x, y in self.iterPads():
+            real_x = a*x + b*y + c
+            real_y = d*x + e*y + f
+            if real_x < min_x:
+                min_x = real_x
+            if real_x > max_x:
+                max_x = real_x
+            if real_y < min_y:
+                min_y = real_y
+            if real_y > max_y:
+                max_y = real_y
+
+        if min_x > max_x:
+            return None
+
+        return (min_x + shape_box[0], min_y + shape_box[1], max_x + shape_box[2], max_y + shape_box[3])
+
+    def _getRenderTreeText(self):
+        render_strings = ['pad_grid']
+        render_strings.append('(layout {} {})'.format(*self.layout))
+        render_strings.append(self.pitch.render('(pitch {x} {y})'))
+        render_strings.append('(count {})'.format(self.getPadCount()))
+        render_strings.append(lispString(self.pad.type))
+        render_strings.append(lispString(self.pad.shape))
+        render_strings.append(self.pad.size.render('(size {x} {y})'))
+        render_strings.append('(layers {})'.format(' '.join(self.pad.layers)))
+
+        render_text = Node._getRenderTreeText(self)
+        render_text += '({})'.format(' '.join(render_strings))
+
+        return render_text
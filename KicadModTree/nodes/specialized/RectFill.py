@@ -15,7 +15,7 @@
 
 from KicadModTree.Vector import *
 from KicadModTree.nodes.Node import Node
-from KicadModTree.nodes.base import Line
+from KicadModTree.nodes.base import Line, Polygon
 
 
 class RectFill(Node):
@@ -35,13 +35,26 @@ class RectFill(Node):
           layer on which the rect fill is drawn (default: 'F.SilkS')
         * *width* (``float``) --
           width of the filling lines (default: 0.12)
+        * *fill_type* (``RectFill.FILL_HATCH``, ``RectFill.FILL_POLYGON``) --
+          fill the rect with one line per line width, or with a single polygon
+          (default: ``RectFill.default_fill_type``)
+
+    The default fill type can be changed for a whole library by setting ``RectFill.default_fill_type`` before
+    the footprints are created.
 
     :Example:
 
     >>> from KicadModTree import *
     >>> RectFill(start=[-3, -2], end=[3, 2], layer='F.SilkS')
+    >>> RectFill(start=[-3, -2], end=[3, 2], layer='F.SilkS', fill_type=RectFill.FILL_POLYGON)
     """
 
+    FILL_HATCH = 'hatch'
+    FILL_POLYGON = 'polygon'
+    _FILL_TYPES = [FILL_HATCH, FILL_POLYGON]
+
+    default_fill_type = FILL_HATCH
+
     def __init__(self, **kwargs):
         Node.__init__(self)
         self.start_pos = Vector2D(kwargs['start'])
@@ -50,7 +63,23 @@ class RectFill(Node):
         self.layer = kwargs.get('layer', 'F.SilkS')
         self.width = kwargs.get('width', 0.12)  # TODO: auto detection
 
-        self.virtual_childs = self._createChildNodes(self.start_pos, self.end_pos, self.layer, self.width)
+        self.fill_type = kwargs.get('fill_type') or RectFill.default_fill_type
+        if self.fill_type not in RectFill._FILL_TYPES:
+            raise ValueError('{fill_type} is an invalid fill type'.format(fill_type=self.fill_type))
+
+        if self.fill_type == RectFill.FILL_POLYGON:
+            self.virtual_childs = self._createPolygonNode(self.start_pos, self.end_pos, self.layer, self.width)
+        else:
+            self.virtual_childs = self._createChildNodes(self.start_pos, self.end_pos, self.layer, self.width)
+
+    def _createPolygonNode(self, start_pos, end_pos, layer, width):
+        # the outline of the polygon is drawn with the line width, like the border of a FilledRect
+        new_node = Polygon(nodes=[[start_pos.x, start_pos.y], [end_pos.x, start_pos.y],
+                                  [end_pos.x, end_pos.y], [start_pos.x, end_pos.y]],
+                           layer=layer,
+                           width=width)
+        new_node._parent = self
+        return [new_node]
 
     def _createChildNodes(self, start_pos, end_pos, layer, width):
         nodes = []
@@ -76,7 +105,8 @@ class RectFill(Node):
         render_text = Node._getRenderTreeText(self)
 
         render_string = ['start: [x: {sx}, y: {sy}]'.format(sx=self.start_pos.x, sy=self.start_pos.y),
-                         'end: [x: {ex}, y: {ey}]'.format(ex=self.end_pos.x, ey=self.end_pos.y)]
+                         'end: [x: {ex}, y: {ey}]'.format(ex=self.end_pos.x, ey=self.end_pos.y),
+                         'fill_type: {}'.format(self.fill_type)]
 
         render_text += " [{}]".format(", ".join(render_string))
 
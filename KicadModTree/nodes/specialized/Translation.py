@@ -37,20 +37,29 @@ class Translation(Node):
         self.offset_x = x
         self.offset_y = y
 
-    def getRealPosition(self, coordinate, rotation=None):
-        parsed_coordinate = Vector2D(coordinate)
-
-        # calculate translation
-        translation_coordinate = {'x': parsed_coordinate.x + self.offset_x,
-                                  'y': parsed_coordinate.y + self.offset_y}
-
-        if not self._parent:
-            if rotation is None:
-                return translation_coordinate
-            else:
-                return translation_coordinate, rotation
-        else:
-            return self._parent.getRealPosition(translation_coordinate, rotation)
+    @property
+    def offset_x(self):
+        return self._offset_x
+
+    @offset_x.setter
+    def offset_x(self, value):
+        self._offset_x = value
+        self._invalidateTransformation()
+        self._invalidateBoundingBox()
+
+    @property
+    def offset_y(self):
+        return self._offset_y
+
+    @offset_y.setter
+    def offset_y(self, value):
+        self._offset_y = value
+        self._invalidateTransformation()
+        self._invalidateBoundingBox()
+
+    def _getTransformationMatrix(self):
+        return (1, 0, self.offset_x,
+                0, 1, self.offset_y)
 
     def _getRenderTreeText(self):
         render_text = Node._getRenderTreeText(self)
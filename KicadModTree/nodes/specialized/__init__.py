@@ -13,15 +13,21 @@
 #
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
-from .Translation import Translation
-from .Rotation import Rotation
+from KicadModTree.util import lazy_import as _lazy_import
 
-from .PolygoneLine import PolygoneLine
-from .RectLine import RectLine
-from .RectFill import RectFill
-from .FilledRect import FilledRect
+# the nodes are imported when they are used for the first time
+_lazy_import.lazyImport(__name__, [
+    ('.Translation', ['Translation']),
+    ('.Rotation', ['Rotation']),
 
-from .PadArray import PadArray
-from .ExposedPad import ExposedPad
-from .ChamferedPad import ChamferedPad, CornerSelection
-from .ChamferedPadGrid import *
+    ('.PolygoneLine', ['PolygoneLine']),
+    ('.RectLine', ['RectLine']),
+    ('.RectFill', ['RectFill']),
+    ('.FilledRect', ['FilledRect']),
+
+    ('.PadArray', ['PadArray']),
+    ('.PadGrid', ['PadGrid']),
+    ('.ExposedPad', ['ExposedPad']),
+    ('.ChamferedPad', ['ChamferedPad', 'CornerSelection']),
+    ('.ChamferedPadGrid', _lazy_import.ALL_NAMES),
+])
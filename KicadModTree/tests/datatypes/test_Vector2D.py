@@ -13,9 +13,13 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import copy
+import pickle
 import unittest
+import warnings
 
 from KicadModTree.Vector import *
+from KicadModTree.Point import Point2D
 
 
 class Vector2DTests(unittest.TestCase):
@@ -162,3 +166,45 @@ class Vector2DTests(unittest.TestCase):
 
         # TODO: division by zero tests
         # TODO: invalid type tests
+
+    def test_inplace(self):
+        p1 = Vector2D([1, 2])
+        p1_id = id(p1)
+
+        p1 += 5
+        self.assertEqual(p1.x, 6)
+        self.assertEqual(p1.y, 7)
+
+        p1 -= [1, 2]
+        self.assertEqual(p1.x, 5)
+        self.assertEqual(p1.y, 5)
+
+        p1 *= Vector2D(2, 3)
+        self.assertEqual(p1.x, 10)
+        self.assertEqual(p1.y, 15)
+
+        p1 /= 5
+        self.assertEqual(p1.x, 2)
+        self.assertEqual(p1.y, 3)
+
+        self.assertEqual(id(p1), p1_id)
+
+    def test_copy(self):
+        p1 = Vector2D([1, 2])
+
+        for p2 in [copy.copy(p1), copy.deepcopy(p1), pickle.loads(pickle.dumps(p1))]:
+            self.assertIsNot(p2, p1)
+            self.assertEqual(p2, p1)
+
+        # subclasses keep their class
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            p1 = Point2D([1, 2])
+        for p2 in [copy.copy(p1), copy.deepcopy(p1), pickle.loads(pickle.dumps(p1))]:
+            self.assertIs(type(p2), Point2D)
+            self.assertEqual(p2, p1)
+
+    def test_slots(self):
+        p1 = Vector2D([1, 2])
+        with self.assertRaises(AttributeError):
+            p1.z = 3
@@ -13,9 +13,13 @@
 #
 # (C) 2016-2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import copy
+import pickle
 import unittest
+import warnings
 
 from KicadModTree.Vector import *
+from KicadModTree.Point import Point3D
 
 
 class Vector3DTests(unittest.TestCase):
@@ -157,6 +161,15 @@ class Vector3DTests(unittest.TestCase):
 
         # TODO: invalid type tests
 
+    def test_neg(self):
+        p1 = Vector3D([1, -2, 3])
+
+        p2 = -p1
+        self.assertIs(type(p2), Vector3D)
+        self.assertEqual(p2.x, -1)
+        self.assertEqual(p2.y, 2)
+        self.assertEqual(p2.z, -3)
+
     def test_mul(self):
         p1 = Vector3D([1, 2, 3])
         self.assertEqual(p1.x, 1)
@@ -208,3 +221,49 @@ class Vector3DTests(unittest.TestCase):
 
         # TODO: division by zero tests
         # TODO: invalid type tests
+
+    def test_inplace(self):
+        p1 = Vector3D([1, 2, 3])
+        p1_id = id(p1)
+
+        p1 += 5
+        self.assertEqual(p1.x, 6)
+        self.assertEqual(p1.y, 7)
+        self.assertEqual(p1.z, 8)
+
+        p1 -= [1, 2, 3]
+        self.assertEqual(p1.x, 5)
+        self.assertEqual(p1.y, 5)
+        self.assertEqual(p1.z, 5)
+
+        p1 *= Vector3D(2, 3, 4)
+        self.assertEqual(p1.x, 10)
+        self.assertEqual(p1.y, 15)
+        self.assertEqual(p1.z, 20)
+
+        p1 /= 5
+        self.assertEqual(p1.x, 2)
+        self.assertEqual(p1.y, 3)
+        self.assertEqual(p1.z, 4)
+
+        p1 += Vector2D(1, 1)
+        self.assertEqual(p1.x, 3)
+        self.assertEqual(p1.y, 4)
+        self.assertEqual(p1.z, 4)
+
+        self.assertEqual(id(p1), p1_id)
+
+    def test_copy(self):
+        p1 = Vector3D([1, 2, 3])
+
+        for p2 in [copy.copy(p1), copy.deepcopy(p1), pickle.loads(pickle.dumps(p1))]:
+            self.assertIsNot(p2, p1)
+            self.assertEqual(p2, p1)
+
+        # subclasses keep their class
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            p1 = Point3D([1, 2, 3])
+        for p2 in [copy.copy(p1), copy.deepcopy(p1), pickle.loads(pickle.dumps(p1))]:
+            self.assertIs(type(p2), Point3D)
+            self.assertEqual(p2, p1)
@@ -16,3 +16,13 @@
 from .test_simple_footprints import SimpleFootprintTests
 from .test_kicad5_padshapes import Kicad5PadsTests
 from .test_exposed_pad import ExposedPadTests
+from .test_pad_grid import PadGridTests
+from .test_build_manifest import BuildManifestTests
+from .test_mod_argparser import ModArgparserTests
+from .test_kicad_file_reader import KicadFileReaderTests
+from .test_footprint_comparator import FootprintComparatorTests
+from .test_spatial_index import SpatialIndexTests
+from .test_rect_fill import RectFillTests
+from .test_geometry_optimizer import GeometryOptimizerTests
+from .test_profiler import ProfilerTests
+from .test_lazy_import import LazyImportTests
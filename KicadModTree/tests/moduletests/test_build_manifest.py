@@ -0,0 +1,124 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from KicadModTree import *
+
+
+class BuildManifestTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.generated = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generateFootprint(self, params):
+        self.generated.append(params['name'])
+
+        kicad_mod = Footprint(params['name'])
+        kicad_mod.append(Pad(number=1, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT,
+                             at=[0, 0], size=params['size'], layers=Pad.LAYERS_SMT))
+
+        file_handler = KicadFileHandler(kicad_mod)
+        file_handler.writeFile(os.path.join(self.directory, params['name'] + '.kicad_mod'))
+
+    def build(self, params):
+        manifest = BuildManifest(self.directory)
+        input_hash = manifest.inputHash(params)
+        manifest.build('test/' + params['name'], input_hash, self.generateFootprint, params)
+        manifest.save()
+        return manifest
+
+    def testBuildManifest(self):
+        params = {'name': 'test', 'size': [1, 2]}
+
+        manifest = self.build(params)
+        self.assertEqual(manifest.built, 1)
+        self.assertEqual(manifest.entries['test/test']['outputs'], ['test.kicad_mod'])
+
+        # nothing changed
+        manifest = self.build({'size': [1, 2], 'name': 'test'})
+        self.assertEqual(manifest.skipped, 1)
+        self.assertEqual(self.generated, ['test'])
+
+        # input changed
+        params['size'] = [1, 3]
+        manifest = self.build(params)
+        self.assertEqual(manifest.built, 1)
+        self.assertEqual(self.generated, ['test', 'test'])
+
+        # output removed
+        os.remove(os.path.join(self.directory, 'test.kicad_mod'))
+        manifest = self.build(params)
+        self.assertEqual(manifest.built, 1)
+        self.assertEqual(len(self.generated), 3)
+
+    def testInputHash(self):
+        manifest = BuildManifest(self.directory)
+
+        self.assertEqual(manifest.inputHash({'a': 1, 'b': [1, 2]}), manifest.inputHash({'b': [1, 2], 'a': 1}))
+        self.assertNotEqual(manifest.inputHash({'a': 1}), manifest.inputHash({'a': 2}))
+
+        path = os.path.join(self.directory, 'ipc.yaml')
+        with open(path, 'w') as f:
+            f.write('a: 1\n')
+        input_hash = manifest.inputHash({'a': 1}, files=[path])
+        with open(path, 'w') as f:
+            f.write('a: 2\n')
+        self.assertNotEqual(manifest.inputHash({'a': 1}, files=[path]), input_hash)
+
+    def saveEntry(self, key):
+        manifest = BuildManifest(self.directory)
+        manifest.record(key, 'hash', [])
+        manifest.save()
+
+    def testConcurrentSave(self):
+        processes = [multiprocessing.Process(target=self.saveEntry, args=('test/{}'.format(i), )) for i in range(8)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        # no entry is lost when the processes read and replace the manifest at the same time
+        self.assertEqual(sorted(BuildManifest(self.directory).entries),
+                         sorted('test/{}'.format(i) for i in range(8)))
+        self.assertEqual(os.listdir(self.directory), ['.kicad_build_manifest.json'])
+
+    def testLockFile(self):
+        manifest = BuildManifest(self.directory)
+        lock_path = manifest.path + '.lock'
+
+        # the manifest is saved after the lock was released by another process
+        open(lock_path, 'w').close()
+        release = threading.Timer(0.2, os.remove, [lock_path])
+        release.start()
+        self.saveEntry('test/waiting')
+        release.join()
+        self.assertIn('test/waiting', BuildManifest(self.directory).entries)
+
+        # lock files of killed processes are removed
+        open(lock_path, 'w').close()
+        stale_time = time.time() - 120
+        os.utime(lock_path, (stale_time, stale_time))
+        self.saveEntry('test/stale')
+        self.assertIn('test/stale', BuildManifest(self.directory).entries)
+        self.assertFalse(os.path.exists(lock_path))
@@ -1262,6 +1262,33 @@ class ExposedPadTests(unittest.TestCase):
         # file_handler.writeFile('test_ep.kicad_mod')
         self.assertEqual(result, RESULT_SIMPLE_EP_FP)
 
+    def testSimpleExposedPadChangedAfterSerialize(self):
+        kicad_mod = Footprint("simple_exposed")
+
+        kicad_mod.setDescription("A example footprint")
+        kicad_mod.setTags("example")
+
+        kicad_mod.append(Text(type='reference', text='REF**', at=[0, 0], layer='F.SilkS'))
+        kicad_mod.append(Text(type='value', text="simple_exposed", at=[0, 0], layer='F.Fab'))
+
+        exposed_pad = ExposedPad(
+            number=3, at=[0, 0], size=[2.1, 3],
+            mask_size=[2.1, 2.1], paste_layout=[2, 3], via_layout=[3, 2]
+            )
+        kicad_mod.append(exposed_pad)
+
+        file_handler = KicadFileHandler(kicad_mod)
+        self.assertNotEqual(file_handler.serialize(timestamp=0), RESULT_SIMPLE_EP_FP)
+
+        # the cached pads are created again after a parameter changed
+        exposed_pad.at = Vector2D(0, 1)
+        self.assertEqual(file_handler.serialize(timestamp=0), RESULT_SIMPLE_EP_FP)
+
+    def testExposedPadParameterErrors(self):
+        # the pads are created later, but their parameters are checked by the constructor
+        with self.assertRaises(ValueError):
+            ExposedPad(number=3, at=[0, 0], size=[2.1, 3], radius_ratio=0.6)
+
     def testSimpleExposedPadNoRounding(self):
         kicad_mod = Footprint("simple_exposed")
 
@@ -0,0 +1,110 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from KicadModTree import *
+from KicadModTree.FootprintComparator import compareLibraries
+
+
+class FootprintComparatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def createFootprint(self, offset=0, reverse=False, pad_x=1.27):
+        kicad_mod = Footprint("test_compare")
+        kicad_mod.setDescription("test footprint")
+
+        nodes = [Line(start=[-2 + offset, -2], end=[2, -2], layer='F.SilkS'),
+                 Line(start=[-2, 2], end=[2, 2 + offset], layer='F.SilkS'),
+                 Arc(center=[0, 0], start=[1 + offset, 0], angle=90, layer='F.Fab'),
+                 Pad(number=1, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[-1.27, 0], size=[1, 2],
+                     layers=Pad.LAYERS_SMT),
+                 Pad(number=2, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[pad_x, offset], size=[1, 2],
+                     layers=Pad.LAYERS_SMT)]
+        if reverse:
+            nodes.reverse()
+            # same line, arc in the opposite direction
+            nodes[-1] = Line(start=[2, -2], end=[-2 + offset, -2], layer='F.SilkS')
+            nodes[2] = Arc(center=[0, 0], start=[0, 1 + offset], angle=-90, layer='F.Fab')
+
+        for node in nodes:
+            kicad_mod.append(node)
+        return kicad_mod
+
+    def testCompareEquivalent(self):
+        comparator = FootprintComparator(tolerance=1e-4)
+
+        self.assertEqual(comparator.compare(self.createFootprint(), self.createFootprint()), ([], []))
+        self.assertEqual(comparator.compare(self.createFootprint(), self.createFootprint(offset=1e-5, reverse=True)),
+                         ([], []))
+
+    def testCompareChanged(self):
+        comparator = FootprintComparator(tolerance=1e-4)
+
+        removed, added = comparator.compare(self.createFootprint(), self.createFootprint(pad_x=1.3))
+        self.assertEqual(removed, ['(pad 2 smd rect (at 1.27 0) (size 1 2) (layers F.Cu F.Mask F.Paste))'])
+        self.assertEqual(added, ['(pad 2 smd rect (at 1.3 0) (size 1 2) (layers F.Cu F.Mask F.Paste))'])
+
+        removed, added = comparator.compare(self.createFootprint(), self.createFootprint(offset=1e-3))
+        self.assertEqual(len(removed), 4)
+        self.assertEqual(len(added), 4)
+
+    def writeFootprint(self, directory, kicad_mod, timestamp=0):
+        directory = os.path.join(self.directory, directory, 'test.pretty')
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        KicadFileHandler(kicad_mod).writeFile(os.path.join(directory, kicad_mod.name + '.kicad_mod'),
+                                              timestamp=timestamp)
+
+    def testCompareLibraries(self):
+        unchanged = self.createFootprint()
+        unchanged.name = "unchanged"
+        self.writeFootprint('old', unchanged, timestamp=1)
+        self.writeFootprint('new', unchanged, timestamp=2)
+
+        reordered = self.createFootprint()
+        reordered.name = "reordered"
+        self.writeFootprint('old', reordered)
+        with io.open(os.path.join(self.directory, 'old', 'test.pretty', 'reordered.kicad_mod'), 'r') as f:
+            lines = f.read().splitlines()
+        lines[1:-1] = reversed(lines[1:-1])
+        with io.open(os.path.join(self.directory, 'new', 'test.pretty', 'reordered.kicad_mod'), 'w') as f:
+            f.write(u'\n'.join(lines))
+
+        changed = self.createFootprint(pad_x=2)
+        changed.name = "changed"
+        self.writeFootprint('old', self.createFootprint())
+        self.writeFootprint('new', changed)
+        os.rename(os.path.join(self.directory, 'old', 'test.pretty', 'test_compare.kicad_mod'),
+                  os.path.join(self.directory, 'old', 'test.pretty', 'changed.kicad_mod'))
+
+        removed = self.createFootprint()
+        removed.name = "removed"
+        self.writeFootprint('old', removed)
+
+        for processes in (1, 2):
+            report = compareLibraries(os.path.join(self.directory, 'old'), os.path.join(self.directory, 'new'),
+                                      processes=processes)
+            self.assertEqual(report['summary'], {'unchanged': 2, 'changed': 1, 'added': 0, 'removed': 1, 'error': 0})
+            self.assertEqual([(result['footprint'], result['status']) for result in report['footprints']],
+                             [('test.pretty/changed.kicad_mod', 'changed'),
+                              ('test.pretty/removed.kicad_mod', 'removed')])
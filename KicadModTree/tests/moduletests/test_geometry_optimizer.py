@@ -0,0 +1,107 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import unittest
+
+from KicadModTree import *
+
+RESULT_OPTIMIZED_FP = """(module optimizer_test (layer F.Cu) (tedit 0)
+  (fp_text reference REF** (at 0 0) (layer F.SilkS)
+    (effects (font (size 1 1) (thickness 0.15)))
+  )
+  (fp_circle (center 0 0) (end 1 0) (layer F.Fab) (width 0.1))
+  (fp_line (start -2 2) (end 2 2) (layer F.SilkS) (width 0.12))
+  (fp_line (start 2 2) (end 2 -2) (layer F.SilkS) (width 0.12))
+  (fp_line (start 2 -2) (end -2 -2) (layer F.SilkS) (width 0.12))
+  (fp_line (start -2 -2) (end -2 2) (layer F.SilkS) (width 0.12))
+  (fp_line (start -2 3) (end 2 3) (layer F.Fab) (width 0.1))
+  (pad 1 smd rect (at 0 0) (size 1 1) (layers F.Cu F.Mask F.Paste))
+  (pad 1 smd rect (at 0 0) (size 1 1) (layers F.Cu F.Mask F.Paste))
+)"""
+
+
+class GeometryOptimizerTests(unittest.TestCase):
+
+    def line(self, start, end, layer='F.SilkS', width=0.12):
+        return ['fp_line', ['start'] + start, ['end'] + end, ['layer', layer], ['width', width]]
+
+    def testMergeLines(self):
+        optimizer = GeometryOptimizer()
+        result = optimizer.optimize([self.line([0, 0], [1, 1]),
+                                     self.line([3, 3], [2, 2]),
+                                     self.line([1, 1], [2.5, 2.5]),
+                                     self.line([0, 1], [1, 1]),
+                                     self.line([4, 4], [5, 5])])
+        self.assertEqual(result, [self.line([0, 0], [3, 3]),
+                                  self.line([0, 1], [1, 1]),
+                                  self.line([4, 4], [5, 5])])
+        self.assertEqual(optimizer.merged_lines, 2)
+
+        # lines on other layers, with another width or with a gap are kept
+        elements = [self.line([0, 0], [1, 0]),
+                    self.line([1, 0], [2, 0], layer='F.Fab'),
+                    self.line([1, 0], [2, 0], width=0.1),
+                    self.line([1.1, 0], [2, 0])]
+        self.assertEqual(optimizer.optimize(elements), elements)
+        self.assertEqual(optimizer.removed_elements, 2)
+
+        # the merged line keeps the direction of the first line
+        optimizer = GeometryOptimizer()
+        self.assertEqual(optimizer.optimize([self.line([2, 0], [1, 0]), self.line([0, 0], [1, 0])]),
+                         [self.line([2, 0], [0, 0])])
+
+    def testRemoveElements(self):
+        optimizer = GeometryOptimizer()
+        pad = ['pad', 1, 'smd', 'rect', ['at', 0, 0], ['size', 1, 1]]
+        result = optimizer.optimize([self.line([0, 0], [0, 0]),
+                                     ['fp_circle', ['center', 1, 1], ['end', 1, 1], ['layer', 'F.Fab']],
+                                     ['fp_arc', ['start', 0, 0], ['end', 1, 0], ['angle', 0], ['layer', 'F.Fab']],
+                                     ['fp_circle', ['center', 1, 1], ['end', 2, 1], ['layer', 'F.Fab']],
+                                     ['fp_circle', ['center', 1, 1], ['end', 2.0000001, 1], ['layer', 'F.Fab']],
+                                     pad,
+                                     pad])
+        self.assertEqual(result, [['fp_circle', ['center', 1, 1], ['end', 2, 1], ['layer', 'F.Fab']], pad, pad])
+        self.assertEqual(optimizer.removed_degenerated, 3)
+        self.assertEqual(optimizer.removed_duplicates, 1)
+
+    def testFileHandler(self):
+        kicad_mod = Footprint("optimizer_test")
+        kicad_mod.append(Text(type='reference', text='REF**', at=[0, 0], layer='F.SilkS'))
+
+        # the rect is drawn by lines with transformations
+        rotation = Rotation(90)
+        kicad_mod.append(rotation)
+        rotation.append(RectLine(start=[-2, -2], end=[2, 2], layer='F.SilkS', width=0.12))
+        kicad_mod.append(Line(start=[0, -2], end=[-2, -2], layer='F.SilkS', width=0.12))
+        kicad_mod.append(Line(start=[-2, 3], end=[0, 3], layer='F.Fab'))
+        kicad_mod.append(Line(start=[0, 3], end=[2, 3], layer='F.Fab', width=0.1))
+        kicad_mod.append(Line(start=[1, 1], end=[1, 1], layer='F.SilkS'))
+        kicad_mod.append(Circle(center=[0, 0], radius=1, layer='F.Fab'))
+        kicad_mod.append(Circle(center=[0, 0], radius=1, layer='F.Fab'))
+
+        # pads are never removed
+        for _ in range(2):
+            kicad_mod.append(Pad(number=1, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[0, 0], size=[1, 1],
+                                 layers=Pad.LAYERS_SMT))
+
+        file_handler = KicadFileHandler(kicad_mod)
+        removed_elements = KicadFileHandler.removed_elements
+        self.assertEqual(file_handler.serialize(timestamp=0, optimize=True), RESULT_OPTIMIZED_FP)
+        self.assertEqual(KicadFileHandler.removed_elements, removed_elements + 4)
+
+        self.assertEqual(file_handler.serialize(timestamp=0).count('fp_line'), 8)
+        try:
+            KicadFileHandler.optimize_geometry = True
+            self.assertEqual(file_handler.serialize(timestamp=0), RESULT_OPTIMIZED_FP)
+        finally:
+            KicadFileHandler.optimize_geometry = False
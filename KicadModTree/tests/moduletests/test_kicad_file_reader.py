@@ -0,0 +1,91 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from KicadModTree import *
+from KicadModTree.KicadFileReader import readSexprFile
+from KicadModTree.util.kicad_util import parseLispString
+
+
+class KicadFileReaderTests(unittest.TestCase):
+
+    def createFootprint(self):
+        kicad_mod = Footprint("test_reader")
+        kicad_mod.setDescription("quoted \"description\" with (brackets)")
+        kicad_mod.setTags("tag1 tag2")
+        kicad_mod.setAttribute('smd')
+        kicad_mod.setMaskMargin(0.05)
+
+        kicad_mod.append(Text(type='reference', text='REF**', at=[0, -3], layer='F.SilkS'))
+        kicad_mod.append(Text(type='value', text='test_reader', at=[0, 3], layer='F.Fab'))
+        kicad_mod.append(Text(type='user', text='%R', at=[0, 0], rotation=90, layer='F.Fab', hide=True))
+        kicad_mod.append(Line(start=[-2, -2], end=[2, -2], layer='F.SilkS', width=0.12))
+        kicad_mod.append(Circle(center=[0, 0], radius=1.5, layer='F.Fab', width=0.1))
+        kicad_mod.append(Arc(center=[0, 0], start=[1, 0], angle=90, layer='F.Fab', width=0.1))
+        kicad_mod.append(Polygon(nodes=[[-1, -1], [1, -1], [0, 1]], layer='F.CrtYd', width=0.05))
+
+        kicad_mod.append(Pad(number=1, type=Pad.TYPE_THT, shape=Pad.SHAPE_OVAL, at=[-1.27, 0], size=[1.5, 2],
+                             drill=[0.8, 1.2], layers=Pad.LAYERS_THT))
+        kicad_mod.append(Pad(number=2, type=Pad.TYPE_SMT, shape=Pad.SHAPE_ROUNDRECT, at=[1.27, 0], rotation=90,
+                             size=[1, 2], radius_ratio=0.25, solder_paste_margin_ratio=-0.1,
+                             layers=Pad.LAYERS_SMT))
+        kicad_mod.append(Pad(number=3, type=Pad.TYPE_SMT, shape=Pad.SHAPE_CUSTOM, at=[0, 2], size=[0.5, 0.5],
+                             layers=Pad.LAYERS_SMT, anchor_shape=Pad.ANCHOR_RECT,
+                             primitives=[Polygon(nodes=[[0, 0], [1, 0], [1, 1]]),
+                                         Line(start=[0, 0], end=[0, 1], width=0.2)]))
+
+        kicad_mod.append(Model(filename="example.3dshapes/example_footprint.wrl",
+                               at=[0, 0, 0], scale=[1, 1, 1], rotate=[0, 0, 90]))
+        return kicad_mod
+
+    def testRoundTrip(self):
+        serialized = KicadFileHandler(self.createFootprint()).serialize(timestamp=0)
+
+        kicad_mod = KicadFileReader().parse(serialized)
+        self.assertEqual(kicad_mod.name, "test_reader")
+        self.assertEqual(KicadFileHandler(kicad_mod).serialize(timestamp=0), serialized)
+
+    def testReadFile(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'test_reader.kicad_mod')
+            KicadFileHandler(self.createFootprint()).writeFile(filename, timestamp=0)
+
+            with open(filename, 'rb') as f:
+                serialized = f.read().decode('utf-8')
+            kicad_mod = KicadFileReader().readFile(filename)
+            self.assertEqual(KicadFileHandler(kicad_mod).serialize(timestamp=0), serialized)
+
+            sexpr = readSexprFile(filename)
+            self.assertEqual(len(sexpr), 1)
+            self.assertEqual(sexpr[0][:2], ['module', 'test_reader'])
+
+            empty_filename = os.path.join(directory, 'empty.kicad_mod')
+            open(empty_filename, 'wb').close()
+            self.assertEqual(readSexprFile(empty_filename), [])
+            self.assertRaises(ValueError, KicadFileReader().readFile, empty_filename)
+        finally:
+            shutil.rmtree(directory)
+
+    def testParseLispString(self):
+        self.assertEqual(parseLispString('(descr "a (b) c")'), ['descr', 'a (b) c'])
+        self.assertEqual(parseLispString('(text "say \\"hi\\"" "")'), ['text', 'say "hi"', ''])
+        self.assertEqual(parseLispString('(a (b 1 2)\n\t(c))'), ['a', ['b', '1', '2'], ['c']])
+
+        self.assertRaises(RuntimeError, parseLispString, '(a (b)')
+        self.assertRaises(RuntimeError, parseLispString, '(a))')
+        self.assertRaises(RuntimeError, parseLispString, '(a "b)')
@@ -0,0 +1,77 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import importlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+REPOSITORY_DIRECTORY = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../../..")
+
+# names of "from KicadModTree import *" when all modules were imported eagerly
+STAR_IMPORT_NAMES = {
+    'Arc', 'BuildManifest', 'ChamferSelPadGrid', 'ChamferedPad', 'ChamferedPadGrid', 'Circle', 'CornerSelection',
+    'ExposedPad', 'FileHandler', 'FilledRect', 'Footprint', 'FootprintComparator', 'GeometryOptimizer',
+    'KicadFileHandler', 'KicadFileReader', 'LazyNode', 'Line', 'ModArgparser', 'Model', 'MultipleParentsError', 'Node',
+    'Pad', 'PadArray', 'PadGrid', 'Point', 'Point2D', 'Point3D', 'Polygon', 'PolygonPoints', 'PolygoneLine',
+    'Profiler', 'RectFill', 'RectLine', 'RecursionDetectedError', 'Rotation', 'SpatialElement', 'SpatialIndex', 'Text',
+    'Translation', 'Vector', 'Vector2D', 'Vector3D', 'base', 'bisect', 'copy', 'division', 'formatFloat',
+    'isAnyLarger', 'nodes', 'pointsBoundingBox', 'round', 'specialized', 'sqrt', 'toFloatArray', 'toIntArray',
+    'toNumberArray', 'toVectorUseCopyIfNumber', 'util', 'warnings'}
+
+STAR_IMPORT_SCRIPT = """
+import json
+from KicadModTree import *
+print(json.dumps(sorted(name for name in dir() if not name.startswith('_') and name != 'json')))
+"""
+
+SUBMODULE_IMPORT_SCRIPT = """
+import inspect
+import json
+import KicadModTree.nodes.base.Pad
+import KicadModTree.nodes.specialized.PadArray
+from KicadModTree.nodes.base import Pad
+from KicadModTree import PadArray
+print(json.dumps([inspect.isclass(KicadModTree.nodes.base.Pad),
+                  inspect.isclass(KicadModTree.nodes.specialized.PadArray),
+                  inspect.isclass(KicadModTree.Pad), inspect.isclass(Pad), inspect.isclass(PadArray)]))
+"""
+
+
+class LazyImportTests(unittest.TestCase):
+
+    def runScript(self, script):
+        # a new interpreter, where none of the modules is imported yet
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=REPOSITORY_DIRECTORY)
+        return json.loads(output.decode('utf-8'))
+
+    def testStarImport(self):
+        self.assertEqual(set(self.runScript(STAR_IMPORT_SCRIPT)), STAR_IMPORT_NAMES)
+
+        names = {}
+        exec("from KicadModTree import *", names)
+        self.assertEqual({name for name in names if not name.startswith('_')}, STAR_IMPORT_NAMES)
+
+    def testSubmoduleImport(self):
+        # submodules are named like their classes, importing them must not replace the classes in their packages
+        self.assertEqual(self.runScript(SUBMODULE_IMPORT_SCRIPT), [True] * 5)
+
+        importlib.import_module('KicadModTree.nodes.base.Pad')
+        importlib.import_module('KicadModTree.nodes.specialized.PadArray')
+        import KicadModTree.nodes.base
+        import KicadModTree.nodes.specialized
+        self.assertTrue(inspect.isclass(KicadModTree.nodes.base.Pad))
+        self.assertTrue(inspect.isclass(KicadModTree.nodes.specialized.PadArray))
@@ -0,0 +1,160 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import yaml
+
+from KicadModTree import *
+from KicadModTree.ModArgparser import _iter_yaml_mapping
+
+DEFINITION_YML = """defaults: &defaults
+  size: 1.5
+  pins: 2
+part_a:
+  <<: *defaults
+  pins: 4
+part_b:
+  name: part_b
+"""
+
+DEFINITION_CSV = """name , size,pins
+part_a, 1.5 , 4
+
+part_b,2,
+"""
+
+DEFINITION_PINS_YML = "".join("part_{index}:\n  pins: {index}\n".format(index=index) for index in range(8))
+
+
+def create_footprint(args):
+    # module level function, so it can be used by the worker processes of --jobs
+    if args['pins'] == 3:
+        raise ValueError("unsupported pin count")
+    print("create {name} with {pins} pins".format(**args))
+
+
+class ModArgparserTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.parser = ModArgparser(lambda args: None)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        with io.open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def runParser(self, *arguments):
+        parser = ModArgparser(create_footprint)
+        parser.add_parameter("name", type=str, required=True)
+        parser.add_parameter("pins", type=int, required=True)
+
+        argv, stdout = sys.argv, sys.stdout
+        sys.argv = ['test'] + list(arguments)
+        sys.stdout = StringIO()
+        exit_code = 0
+        try:
+            parser.run()
+        except SystemExit as e:
+            exit_code = e.code
+        finally:
+            output = sys.stdout.getvalue()
+            sys.argv, sys.stdout = argv, stdout
+
+        return output, exit_code
+
+    def testIterYamlMapping(self):
+        self.assertEqual(list(_iter_yaml_mapping(io.StringIO(u"a: 1\nb: [1, 2]\n"))), [('a', 1), ('b', [1, 2])])
+        self.assertEqual(list(_iter_yaml_mapping(io.StringIO(u""))), [])
+        self.assertEqual(list(_iter_yaml_mapping(io.StringIO(u"~\n"))), [])
+        with self.assertRaises(yaml.YAMLError):
+            list(_iter_yaml_mapping(io.StringIO(u"- a\n- b\n")))
+
+        # entries of a merge key at the root are added for the keys which are not defined explicitly
+        document = u"a: &a {x: 1, b: 2}\n<<: [*a, {y: 3, x: 4}]\nx: 5\n"
+        self.assertEqual(list(_iter_yaml_mapping(io.StringIO(document))),
+                         [('a', {'x': 1, 'b': 2}), ('x', 5), ('b', 2), ('y', 3)])
+        self.assertEqual(dict(_iter_yaml_mapping(io.StringIO(document))), yaml.safe_load(document))
+        with self.assertRaises(yaml.YAMLError):
+            list(_iter_yaml_mapping(io.StringIO(u"<<: 1\n")))
+
+        # every definition of a duplicate key is returned
+        self.assertEqual(list(_iter_yaml_mapping(io.StringIO(u"a: 1\na: 2\n"))), [('a', 1), ('a', 2)])
+
+    def testParseYml(self):
+        rows = list(self.parser._parse_yml(self.writeFile('test.yml', DEFINITION_YML)))
+
+        self.assertEqual(rows, [('defaults', {'name': 'defaults', 'size': 1.5, 'pins': 2}, None),
+                                ('part_a', {'name': 'part_a', 'size': 1.5, 'pins': 4}, None),
+                                ('part_b', {'name': 'part_b'}, "name is already used for root name!")])
+
+    def testParseYmlDuplicates(self):
+        rows = list(self.parser._parse_yml(self.writeFile('test.yml', "part_a:\n  pins: 2\npart_a:\n  pins: 3\n")))
+
+        self.assertEqual(rows, [('part_a', {'name': 'part_a', 'pins': 2}, None),
+                                ('part_a', {'pins': 3}, "footprint is defined more than once in this file!")])
+
+    def testParseCsv(self):
+        rows = list(self.parser._parse_csv(self.writeFile('test.csv', DEFINITION_CSV)))
+
+        self.assertEqual(rows, [('part_a', {'name': 'part_a', 'size': '1.5', 'pins': '4'}, None),
+                                ('part_b', {'name': 'part_b', 'size': '2', 'pins': ''}, None)])
+
+    def testRunCollectsErrors(self):
+        yml_path = self.writeFile('test.yml', DEFINITION_PINS_YML)
+        csv_path = self.writeFile('test.csv', "name,pins\npart_x,2\npart_y,\n")
+        output, exit_code = self.runParser(yml_path, csv_path)
+
+        self.assertEqual(exit_code, 1)
+        # the failing definitions do not stop the remaining ones
+        self.assertIn("create part_7 with 7 pins", output)
+        self.assertIn("create part_x with 2 pins", output)
+        self.assertIn("2 footprint definitions failed:", output)
+        self.assertIn("  - {path}/part_3: ValueError: unsupported pin count".format(path=yml_path), output)
+        self.assertIn("  - {path}/part_y: parameter expected: pins".format(path=csv_path), output)
+
+    def testRunParallel(self):
+        path = self.writeFile('test.yml', DEFINITION_PINS_YML)
+        serial_output, serial_exit_code = self.runParser(path)
+        parallel_output, parallel_exit_code = self.runParser('--jobs', '2', path)
+
+        self.assertEqual(parallel_exit_code, serial_exit_code)
+        self.assertEqual(parallel_output, serial_output)
+
+        created = [line for line in parallel_output.splitlines() if line.startswith("create")]
+        self.assertEqual(created, ["create part_{index} with {index} pins".format(index=index)
+                                   for index in range(8) if index != 3])
+
+    def testRunInvalidYml(self):
+        path = self.writeFile('test.yml', "part_a:\n  pins: 2\npart_b: [\n")
+        output, exit_code = self.runParser(path)
+
+        self.assertEqual(exit_code, 1)
+        # the definitions before the error are generated
+        self.assertIn("create part_a with 2 pins", output)
+        self.assertIn("  - {path}: invalid yaml file".format(path=path), output)
@@ -0,0 +1,78 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import unittest
+
+from KicadModTree import *
+
+RESULT_PAD_GRID = """(module test (layer F.Cu) (tedit 0)
+  (fp_line (start -1 -1) (end 1 -1) (layer F.Fab) (width 0.1))
+  (pad A1 smd circle (at 0.2 1.6) (size 0.4 0.4) (layers F.Cu F.Mask F.Paste))
+  (pad A3 smd circle (at 1.8 1.6) (size 0.4 0.4) (layers F.Cu F.Mask F.Paste))
+  (pad B1 smd circle (at 0.2 2.4) (size 0.4 0.4) (layers F.Cu F.Mask F.Paste))
+  (pad B2 smd circle (at 1 2.4) (size 0.4 0.4) (layers F.Cu F.Mask F.Paste))
+  (pad B3 smd circle (at 1.8 2.4) (size 0.4 0.4) (layers F.Cu F.Mask F.Paste))
+  (pad 1 thru_hole rect (at 0 0) (size 2 2) (drill 1.2) (layers *.Cu *.Mask))
+)"""
+
+
+class PadGridTests(unittest.TestCase):
+
+    def testPadGrid(self):
+        kicad_mod = Footprint("test")
+
+        kicad_mod.append(Line(start=[-1, -1], end=[1, -1], layer='F.Fab'))
+        translation = Translation(1, 2)
+        kicad_mod.append(translation)
+        translation.append(PadGrid(layout=[3, 2], pitch=0.8, row_names=['A', 'B', 'C'], row_skips=[[2]],
+                                   type=Pad.TYPE_SMT, shape=Pad.SHAPE_CIRCLE, size=0.4, layers=Pad.LAYERS_SMT))
+        kicad_mod.append(Pad(number=1, type=Pad.TYPE_THT, shape=Pad.SHAPE_RECT,
+                             at=[0, 0], size=[2, 2], drill=1.2, layers=Pad.LAYERS_THT))
+
+        file_handler = KicadFileHandler(kicad_mod)
+        self.assertEqual(file_handler.serialize(timestamp=0), RESULT_PAD_GRID)
+
+    def testPadGridEqualsPads(self):
+        row_names = ['A', 'B', 'C', 'D', 'E']
+        row_skips = [[], [[2, 5]], [3], [], [1, 6]]
+        params = {'type': Pad.TYPE_SMT, 'shape': Pad.SHAPE_ROUNDRECT, 'size': [0.5, 0.5],
+                  'radius_ratio': 0.25, 'layers': Pad.LAYERS_SMT}
+
+        kicad_mod_grid = Footprint("test")
+        pad_grid = PadGrid(layout=[6, 5], pitch=[0.5, 0.65], center=[0.1, -0.2],
+                           row_names=row_names, row_skips=row_skips, **params)
+        kicad_mod_grid.append(pad_grid)
+
+        kicad_mod_pads = Footprint("test")
+        for row in range(5):
+            for column in range(6):
+                if column + 1 in [2, 3, 4] and row == 1 or column + 1 == 3 and row == 2 or \
+                        column + 1 in [1, 6] and row == 4:
+                    continue
+                kicad_mod_pads.append(Pad(number="{}{}".format(row_names[row], column + 1),
+                                          at=[0.1 - 0.5 * 2.5 + column * 0.5, -0.2 - 0.65 * 2 + row * 0.65],
+                                          **params))
+
+        self.assertEqual(pad_grid.getPadCount(), 24)
+        self.assertEqual(KicadFileHandler(kicad_mod_grid).serialize(timestamp=0),
+                         KicadFileHandler(kicad_mod_pads).serialize(timestamp=0))
+
+    def testPadGridNumbering(self):
+        pad_grid = PadGrid(layout=[2, 2], pitch=1, row_skips=[[], [1]],
+                           type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, size=1, layers=Pad.LAYERS_SMT)
+
+        self.assertEqual(list(pad_grid.iterPads()), [(1, -0.5, -0.5), (2, 0.5, -0.5), (4, 0.5, 0.5)])
+
+        kicad_mod = Footprint("test")
+        kicad_mod.append(pad_grid)
+        self.assertEqual(list(kicad_mod.walk(layer='F.Paste')), [pad_grid])
@@ -0,0 +1,138 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import gc
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import weakref
+
+from KicadModTree import *
+
+
+class ProfilerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'profile.jsonl')
+
+    def tearDown(self):
+        Profiler.disable()
+        shutil.rmtree(self.directory)
+
+    def records(self):
+        with io.open(self.path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def writeFootprint(self, name):
+        kicad_mod = Footprint(name)
+        kicad_mod.append(Line(start=[0, 0], end=[1, 0], layer='F.SilkS'))
+        kicad_mod.append(Pad(number=1, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT,
+                             at=[0, 0], size=[1, 1], layers=Pad.LAYERS_SMT))
+
+        filename = os.path.join(self.directory, name + '.kicad_mod')
+        KicadFileHandler(kicad_mod).writeFile(filename)
+        return filename
+
+    def testDisabled(self):
+        self.assertIsNone(Profiler.active)
+        with Profiler.phase('config'):
+            pass
+        self.writeFootprint('test')
+        self.assertFalse(os.path.exists(self.path))
+
+    def testFootprintRecords(self):
+        profiler = Profiler.enable(self.path)
+
+        @Profiler.profiled('courtyard')
+        def createCourtyard():
+            with Profiler.phase('keepout'):
+                time.sleep(0.01)
+            return 'courtyard'
+
+        # phases before the footprint is created are added to the next footprint
+        with Profiler.phase('config'):
+            pass
+
+        kicad_mod = Footprint('first')
+        self.assertEqual(createCourtyard(), 'courtyard')
+        filename = os.path.join(self.directory, 'first.kicad_mod')
+        KicadFileHandler(kicad_mod).writeFile(filename)
+        self.writeFootprint('second')
+        Profiler.disable()
+
+        self.assertEqual(profiler.records_written, 2)
+        first, second = self.records()
+
+        self.assertEqual(first['footprint'], 'first')
+        self.assertEqual(first['file'], os.path.abspath(filename))
+        self.assertEqual(first['bytes'], os.path.getsize(filename))
+        self.assertEqual(first['nodes'], 1)
+        self.assertEqual(sorted(first['phases']), ['build', 'config', 'courtyard', 'keepout', 'serialize', 'write'])
+        # nested phases are only counted in the innermost phase
+        self.assertGreaterEqual(first['phases']['keepout'], 0.01)
+        self.assertLess(first['phases']['courtyard'], 0.01)
+        self.assertAlmostEqual(sum(first['phases'].values()), first['total'], places=6)
+
+        self.assertEqual(second['footprint'], 'second')
+        self.assertEqual(second['nodes'], 3)
+        self.assertEqual(sorted(second['phases']), ['build', 'serialize', 'write'])
+
+    def testCapture(self):
+        self.assertRaises(ValueError, Profiler, self.path, capture=['invalid'])
+
+        Profiler.enable(self.path, capture=[Profiler.CAPTURE_CPROFILE], top_functions=5)
+        self.writeFootprint('test')
+        Profiler.disable()
+
+        record, = self.records()
+        self.assertEqual(len(record['profile']), 5)
+        self.assertTrue(any('writeFile' in function['function'] for function in record['profile']))
+
+    def testUnwrittenFootprints(self):
+        profiler = Profiler.enable(self.path, capture=[Profiler.CAPTURE_CPROFILE])
+
+        # footprints which are never written, like the ones parsed by KicadFileReader, are not kept by the profiler
+        footprint = Footprint('unwritten')
+        footprint_reference = weakref.ref(footprint)
+        del footprint
+        gc.collect()
+        self.assertIsNone(footprint_reference())
+        self.assertEqual(profiler._records, {})
+        self.assertIsNone(profiler._current)
+
+        self.writeFootprint('test')
+        Profiler.disable()
+
+        record, = self.records()
+        self.assertEqual(record['footprint'], 'test')
+        self.assertIn('profile', record)
+
+    def testEnvironment(self):
+        self.assertIsNone(Profiler.enableFromEnvironment({}))
+
+        profiler = Profiler.enableFromEnvironment({Profiler.ENVIRONMENT_VARIABLE: self.path,
+                                                   Profiler.CAPTURE_ENVIRONMENT_VARIABLE: 'cprofile, '})
+        self.assertIs(Profiler.active, profiler)
+        self.assertEqual(profiler.capture, set([Profiler.CAPTURE_CPROFILE]))
+
+        # records are appended to existing files
+        self.writeFootprint('first')
+        Profiler.enable(self.path)
+        self.writeFootprint('second')
+        Profiler.disable()
+        self.assertEqual([record['footprint'] for record in self.records()], ['first', 'second'])
@@ -0,0 +1,66 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import unittest
+
+from KicadModTree import *
+
+RESULT_HATCH_FILL = """(module rect_fill_test (layer F.Cu) (tedit 0)
+  (fp_line (start -1 1.1) (end 1 1.1) (layer F.Fab) (width 0.1))
+  (fp_line (start -1 1.2) (end 1 1.2) (layer F.Fab) (width 0.1))
+  (fp_line (start -1 1.3) (end 1 1.3) (layer F.Fab) (width 0.1))
+  (fp_line (start -1 1.4) (end 1 1.4) (layer F.Fab) (width 0.1))
+)"""
+
+RESULT_POLYGON_FILL = """(module rect_fill_test (layer F.Cu) (tedit 0)
+  (fp_poly (pts (xy -1 1) (xy 1 1) (xy 1 1.5) (xy -1 1.5)) (layer F.Fab) (width 0.1))
+)"""
+
+
+class RectFillTests(unittest.TestCase):
+
+    def serialize(self, node):
+        kicad_mod = Footprint("rect_fill_test")
+        kicad_mod.append(node)
+        return KicadFileHandler(kicad_mod).serialize(timestamp=0)
+
+    def testFillTypes(self):
+        self.assertEqual(self.serialize(RectFill(start=[-1, 1], end=[1, 1.5], layer='F.Fab', width=0.1)),
+                         RESULT_HATCH_FILL)
+        self.assertEqual(self.serialize(RectFill(start=[-1, 1], end=[1, 1.5], layer='F.Fab', width=0.1,
+                                                 fill_type=RectFill.FILL_POLYGON)),
+                         RESULT_POLYGON_FILL)
+
+        # the border of the rect is the outline of the polygon
+        self.assertEqual(self.serialize(FilledRect(start=[-1, 1], end=[1, 1.5], layer='F.Fab', width=0.1,
+                                                   fill_type=RectFill.FILL_POLYGON)),
+                         RESULT_POLYGON_FILL)
+
+        with self.assertRaises(ValueError):
+            RectFill(start=[-1, 1], end=[1, 1.5], fill_type='dots')
+
+    def testDefaultFillType(self):
+        hatch = FilledRect(start=[-1, 1], end=[1, 1.5], layer='F.Fab', width=0.1)
+        try:
+            RectFill.default_fill_type = RectFill.FILL_POLYGON
+            self.assertEqual(self.serialize(RectFill(start=[-1, 1], end=[1, 1.5], layer='F.Fab', width=0.1)),
+                             RESULT_POLYGON_FILL)
+            polygon = FilledRect(start=[-1, 1], end=[1, 1.5], layer='F.Fab', width=0.1)
+            self.assertEqual(self.serialize(RectFill(start=[-1, 1], end=[1, 1.5], layer='F.Fab', width=0.1,
+                                                     fill_type=RectFill.FILL_HATCH)),
+                             RESULT_HATCH_FILL)
+        finally:
+            RectFill.default_fill_type = RectFill.FILL_HATCH
+
+        self.assertEqual(len(polygon.getVirtualChilds()), 1)
+        self.assertEqual(hatch.calculateBoundingBox(), polygon.calculateBoundingBox())
@@ -13,9 +13,14 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import io
+import os
+import shutil
+import tempfile
 import unittest
 
 from KicadModTree import *
+from KicadModTree.FileHandler import FileHandler
 
 
 RESULT_MINIMUM = """(module test (layer F.Cu) (tedit 0)
@@ -71,6 +76,31 @@ RESULT_BASIC_NODES = """(module test (layer F.Cu) (tedit 0)
   )
 )"""
 
+RESULT_NODE_ORDER = """(module test (layer F.Cu) (tedit 0)
+  (fp_text reference REF** (at 0 -3) (layer F.SilkS)
+    (effects (font (size 1 1) (thickness 0.15)))
+  )
+  (fp_text value test (at 0 3) (layer F.Fab)
+    (effects (font (size 1 1) (thickness 0.15)))
+  )
+  (fp_line (start 1 0) (end -1 0) (layer F.SilkS) (width 0.12))
+  (fp_text user %R (at 0 0) (layer F.Fab)
+    (effects (font (size 1 1) (thickness 0.15)))
+  )
+  (fp_text user user (at 0 1) (layer F.SilkS)
+    (effects (font (size 1 1) (thickness 0.15)))
+  )
+  (model example.wrl
+    (at (xyz 0 0 0))
+    (scale (xyz 1 1 1))
+    (rotate (xyz 0 0 0))
+  )
+)"""
+
+RESULT_WRITE_FILE_ERROR = """(module test (layer F.Cu) (tedit 0)
+  (fp_line (start 1 0) (end -1 0) (layer F.SilkS) (width 0.12))
+)"""
+
 
 class SimpleFootprintTests(unittest.TestCase):
 
@@ -126,3 +156,84 @@ class SimpleFootprintTests(unittest.TestCase):
 
         file_handler = KicadFileHandler(kicad_mod)
         self.assertEqual(file_handler.serialize(timestamp=0), RESULT_BASIC_NODES)
+
+    def testWriteStream(self):
+        kicad_mod = Footprint("test")
+
+        kicad_mod.append(Text(type='reference', text='REF**', at=[0, -3], layer='F.SilkS'))
+        kicad_mod.append(Text(type='value', text="footprint name", at=[0, 3], layer='F.Fab'))
+
+        kicad_mod.append(Arc(center=[0, 0], start=[-1, 0], angle=180, layer='F.SilkS'))
+        kicad_mod.append(Circle(center=[0, 0], radius=1.5, layer='F.SilkS'))
+        kicad_mod.append(Line(start=[1, 0], end=[-1, 0], layer='F.SilkS'))
+        kicad_mod.append(Model(filename="example.3dshapes/example_footprint.wrl",
+                               at=[0, 0, 0], scale=[1, 1, 1], rotate=[0, 0, 0]))
+        kicad_mod.append(Pad(number=1, type=Pad.TYPE_THT, shape=Pad.SHAPE_RECT,
+                             at=[0, 0], size=[2, 2], drill=1.2, layers=Pad.LAYERS_THT))
+
+        file_handler = KicadFileHandler(kicad_mod)
+        stream = io.StringIO()
+        file_handler.writeStream(stream, timestamp=0)
+        self.assertEqual(stream.getvalue(), RESULT_BASIC_NODES)
+
+    def testNodeOrder(self):
+        kicad_mod = Footprint("test")
+
+        kicad_mod.append(Line(start=[1, 0], end=[-1, 0], layer='F.SilkS'))
+        kicad_mod.append(Text(type='user', text='%R', at=[0, 0], layer='F.Fab'))
+        kicad_mod.append(Text(type='value', text='test', at=[0, 3], layer='F.Fab'))
+        kicad_mod.append(Model(filename="example.wrl", at=[0, 0, 0], scale=[1, 1, 1], rotate=[0, 0, 0]))
+        kicad_mod.append(Text(type='reference', text='REF**', at=[0, -3], layer='F.SilkS'))
+        kicad_mod.append(Text(type='user', text='user', at=[0, 1], layer='F.SilkS'))
+
+        file_handler = KicadFileHandler(kicad_mod)
+        self.assertEqual(file_handler.serialize(timestamp=0), RESULT_NODE_ORDER)
+
+    def testWriteFileOnlyChanged(self):
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, 'test.kicad_mod')
+        try:
+            kicad_mod = Footprint("test")
+            kicad_mod.append(Line(start=[1, 0], end=[-1, 0], layer='F.SilkS'))
+            file_handler = KicadFileHandler(kicad_mod)
+            skipped_writes = FileHandler.skipped_writes
+
+            file_handler.writeFile(filename, only_changed=True, timestamp=0)
+            self.assertEqual(FileHandler.skipped_writes, skipped_writes)
+
+            # only the timestamp differs
+            file_handler.writeFile(filename, only_changed=True, timestamp=1)
+            self.assertEqual(FileHandler.skipped_writes, skipped_writes + 1)
+            with io.open(filename, 'r') as f:
+                self.assertIn('(tedit 0)', f.read())
+
+            kicad_mod.append(Circle(center=[0, 0], radius=1.5, layer='F.SilkS'))
+            file_handler.writeFile(filename, only_changed=True, timestamp=2)
+            self.assertEqual(FileHandler.skipped_writes, skipped_writes + 1)
+            with io.open(filename, 'r') as f:
+                self.assertEqual(f.read(), file_handler.serialize(timestamp=2))
+        finally:
+            shutil.rmtree(directory)
+
+    def testWriteFileError(self):
+        class FailingFileHandler(KicadFileHandler):
+            def _serialize_Circle(self, node):
+                raise RuntimeError("serialization failed")
+
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, 'test.kicad_mod')
+        try:
+            kicad_mod = Footprint("test")
+            kicad_mod.append(Line(start=[1, 0], end=[-1, 0], layer='F.SilkS'))
+            KicadFileHandler(kicad_mod).writeFile(filename, timestamp=0)
+
+            # the file is written while the footprint is serialized, an error must not leave a truncated file
+            kicad_mod.append(Circle(center=[0, 0], radius=1.5, layer='F.SilkS'))
+            for only_changed in (False, True):
+                with self.assertRaises(RuntimeError):
+                    FailingFileHandler(kicad_mod).writeFile(filename, only_changed=only_changed, timestamp=1)
+                with io.open(filename, 'r') as f:
+                    self.assertEqual(f.read(), RESULT_WRITE_FILE_ERROR)
+                self.assertEqual(os.listdir(directory), ['test.kicad_mod'])
+        finally:
+            shutil.rmtree(directory)
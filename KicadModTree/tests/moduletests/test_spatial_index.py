@@ -0,0 +1,106 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import math
+import random
+import unittest
+
+from KicadModTree import *
+from KicadModTree.PolygonPoints import PolygonPoints
+
+
+class SpatialIndexTests(unittest.TestCase):
+
+    def createGridFootprint(self):
+        kicad_mod = Footprint("test_spatial_index")
+        kicad_mod.append(PadGrid(layout=[40, 30], pitch=[1, 1], center=[0, 0], type=Pad.TYPE_SMT,
+                                 shape=Pad.SHAPE_CIRCLE, size=[0.5, 0.5], layers=Pad.LAYERS_SMT))
+        kicad_mod.append(Line(start=[-25, -14.6], end=[25, -14.6], layer='F.SilkS', width=0.1))
+        kicad_mod.append(Circle(center=[0, 0], radius=30, layer='F.Fab', width=0.1))
+        return kicad_mod
+
+    def testElements(self):
+        index = SpatialIndex(self.createGridFootprint())
+        self.assertEqual(len(index), 1202)
+        self.assertEqual(len(index.getElements('F.Cu')), 1200)
+        self.assertEqual(len(index.getElements(['F.SilkS', 'F.Fab'])), 2)
+        self.assertEqual(index.getElements('*.Cu'), index.getElements('F.Cu'))
+
+        pad = SpatialElement.fromNode(Pad(type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[1, 2], size=[2, 1],
+                                          rotation=90, layers=Pad.LAYERS_SMT))[0]
+        for value, expected in zip(pad.bounding_box, [0.5, 1, 1.5, 3]):
+            self.assertAlmostEqual(value, expected)
+
+        roundrect = SpatialElement.fromNode(Pad(type=Pad.TYPE_SMT, shape=Pad.SHAPE_ROUNDRECT, at=[0, 0], size=[2, 1],
+                                                radius_ratio=0.25, layers=Pad.LAYERS_SMT))[0]
+        self.assertAlmostEqual(roundrect.distance(SpatialElement.fromPoint(2, 0)), 1)
+        self.assertAlmostEqual(roundrect.distance(SpatialElement.fromPoint(2, 1)), math.hypot(1.25, 0.75) - 0.25)
+
+        self.assertEqual(SpatialElement.fromNode(Text(type='user', text='REF', at=[0, 0])), [])
+
+    def testQueries(self):
+        kicad_mod = self.createGridFootprint()
+        index = SpatialIndex(kicad_mod)
+
+        result = index.nearest([0.3, 0.1], layer='F.Cu', count=2)
+        self.assertEqual([element.number for element, _ in result], [621, 581])
+        self.assertAlmostEqual(result[0][1], math.hypot(0.2, 0.4) - 0.25)
+
+        # the silk line touches the pads of the first row, but not the second one
+        line = list(kicad_mod.walk(Line))[0]
+        self.assertEqual([element.number for element in index.overlapping(line, layer='F.Cu')], list(range(1, 41)))
+        self.assertEqual(len(index.withinDistance(line, 0.7, layer='F.Cu')), 40)
+        self.assertEqual(len(index.withinDistance(line, 0.8, layer='F.Cu')), 80)
+
+        # elements of the target are not part of the result
+        self.assertEqual(index.overlapping(line, layer='F.SilkS'), [])
+        self.assertEqual(index.overlapping([0, 0]), [])
+        grid = list(kicad_mod.walk(PadGrid))[0]
+        self.assertEqual([element.node for element in index.overlapping(grid)], [line])
+        self.assertEqual(index.nearest(kicad_mod, count=5), [])
+        self.assertEqual(len(index.query({'min': Vector2D(-1, -1), 'max': Vector2D(1, 1)}, layer='F.Cu')), 4)
+
+    def testBruteForce(self):
+        rng = random.Random(1)
+        kicad_mod = Footprint("test_spatial_index")
+        rotation = Rotation(17)
+        kicad_mod.append(rotation)
+        for number in range(200):
+            rotation.append(Pad(number=number, type=Pad.TYPE_SMT,
+                                shape=rng.choice([Pad.SHAPE_RECT, Pad.SHAPE_OVAL, Pad.SHAPE_CIRCLE]),
+                                at=[rng.uniform(-20, 20), rng.uniform(-20, 20)],
+                                size=[rng.uniform(0.2, 2), rng.uniform(0.2, 2)],
+                                rotation=rng.uniform(0, 90), layers=Pad.LAYERS_SMT))
+        for _ in range(20):
+            kicad_mod.append(Arc(center=[rng.uniform(-20, 20), rng.uniform(-20, 20)],
+                                 start=[rng.uniform(-20, 20), rng.uniform(-20, 20)],
+                                 angle=rng.uniform(-300, 300)))
+
+        index = SpatialIndex(kicad_mod)
+        elements = index.getElements()
+        for _ in range(50):
+            x, y = rng.uniform(-25, 25), rng.uniform(-25, 25)
+            point = SpatialElement.fromPoint(x, y)
+            distances = sorted(element.distance(point) for element in elements)
+
+            result = index.nearest([x, y], count=3)
+            for (_, distance), expected in zip(result, distances):
+                self.assertAlmostEqual(distance, expected)
+            self.assertEqual(len(index.withinDistance([x, y], 1)), len([d for d in distances if d <= 1]))
+
+    def testFindNearestPoints(self):
+        polygon = PolygonPoints(nodes=[[0, 0], [10, 0], [10, 10], [0, 10]])
+        self.assertEqual(polygon.findNearestPoints(PolygonPoints(nodes=[[2, 2], [8, 2], [8, 9], [2, 8]])), (2, 2))
+
+        # the first pair wins if several pairs have the same distance
+        self.assertEqual(polygon.findNearestPoints(PolygonPoints(nodes=[[5, 5], [1, 1], [9, 9], [1, 9]])), (0, 1))
@@ -14,3 +14,4 @@
 # (C) 2016 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 from .test_Node import NodeTests
+from .test_BoundingBox import BoundingBoxTests
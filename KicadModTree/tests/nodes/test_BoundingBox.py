@@ -0,0 +1,182 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import math
+import unittest
+
+from KicadModTree import *
+from KicadModTree.PolygonPoints import PolygonPoints
+
+
+class BoundingBoxTests(unittest.TestCase):
+
+    def assertBoundingBox(self, node, expected, places=7):
+        bounding_box = node.calculateBoundingBox()
+        result = [bounding_box['min'].x, bounding_box['min'].y, bounding_box['max'].x, bounding_box['max'].y]
+        for value, expected_value in zip(result, expected):
+            self.assertAlmostEqual(value, expected_value, places=places, msg="{} != {}".format(result, expected))
+
+    def testEmpty(self):
+        self.assertBoundingBox(Footprint("empty"), [0, 0, 0, 0])
+        self.assertEqual(Footprint("empty").calculateBoundingBox({'min': Vector2D(-1, -2), 'max': Vector2D(3, 4)}),
+                         {'min': Vector2D(-1, -2), 'max': Vector2D(3, 4)})
+
+    def testBaseNodes(self):
+        self.assertBoundingBox(Line(start=[1, 2], end=[-1, 5]), [-1, 2, 1, 5])
+        self.assertBoundingBox(Circle(center=[1, 1], radius=2), [-1, -1, 3, 3])
+        self.assertBoundingBox(Polygon(nodes=[[0, 0], [2, -1], [1, 3]]), [0, -1, 2, 3])
+        self.assertBoundingBox(Text(type='user', text='ABCD', at=[1, 1], size=[1, 2]), [-1, 0, 3, 2])
+        self.assertBoundingBox(Text(type='user', text='ABCD', at=[1, 1], size=[1, 2], rotation=90), [0, -1, 2, 3])
+        self.assertBoundingBox(Model(filename="example.wrl"), [0, 0, 0, 0])
+
+        points = PolygonPoints(nodes=[[0, 0], [2, -1], [1, 3]]).calculateBoundingBox()
+        self.assertEqual(points, {'min': Vector2D(0, -1), 'max': Vector2D(2, 3)})
+
+    def testArc(self):
+        # the arc runs through the lowest point of the circle (positive y)
+        self.assertBoundingBox(Arc(center=[0, 0], start=[1, 0], angle=180), [-1, 0, 1, 1])
+        self.assertBoundingBox(Arc(center=[0, 0], start=[1, 0], angle=-180), [-1, -1, 1, 0])
+        self.assertBoundingBox(Arc(center=[1, 1], start=[2, 1], angle=90), [1, 1, 2, 2])
+        self.assertBoundingBox(Arc(center=[0, 0], start=[0, -1], angle=270), [-1, -1, 1, 1])
+        self.assertBoundingBox(Arc(center=[0, 0], start=[0, -1], angle=360), [-1, -1, 1, 1])
+
+        half = math.sqrt(0.5)
+        self.assertBoundingBox(Arc(center=[0, 0], start=[half, -half], angle=45), [half, -half, 1, 0])
+
+    def testPads(self):
+        self.assertBoundingBox(Pad(type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[1, 2], size=[2, 1],
+                                   layers=Pad.LAYERS_SMT), [0, 1.5, 2, 2.5])
+        self.assertBoundingBox(Pad(type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[1, 2], size=[2, 1], rotation=90,
+                                   layers=Pad.LAYERS_SMT), [0.5, 1, 1.5, 3])
+
+        diagonal = math.sqrt(2)
+        self.assertBoundingBox(Pad(type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[0, 0], size=[2, 2], rotation=45,
+                                   layers=Pad.LAYERS_SMT), [-diagonal, -diagonal, diagonal, diagonal])
+        self.assertBoundingBox(Pad(type=Pad.TYPE_THT, shape=Pad.SHAPE_CIRCLE, at=[0, 0], size=2, rotation=45,
+                                   drill=1, layers=Pad.LAYERS_THT), [-1, -1, 1, 1])
+
+        # primitives are rotated with the pad, their width is part of the copper
+        pad = Pad(type=Pad.TYPE_SMT, shape=Pad.SHAPE_CUSTOM, at=[1, 0], size=[1, 1], rotation=90,
+                  layers=Pad.LAYERS_SMT, anchor_shape=Pad.ANCHOR_RECT,
+                  primitives=[Line(start=[0, 0], end=[3, 0], width=0.2)])
+        self.assertBoundingBox(pad, [0.5, -3.1, 1.5, 0.5])
+
+    def testTransformations(self):
+        kicad_mod = Footprint("transformed")
+        translation = Translation(10, 20)
+        rotation = Rotation(90)
+        kicad_mod.append(translation)
+        translation.append(rotation)
+        rotation.append(Line(start=[1, 0], end=[2, 0]))
+        rotation.append(Text(type='user', text='AB', at=[0, 0], size=[1, 1]))
+        self.assertBoundingBox(kicad_mod, [9.5, 18, 10.5, 21])
+
+        arc_rotation = Rotation(90)
+        arc_rotation.append(Arc(center=[0, 0], start=[1, 0], angle=180))
+        self.assertBoundingBox(arc_rotation, [0, -1, 1, 1])
+
+    def testPadGrid(self):
+        grid_params = dict(layout=[4, 3], pitch=[1, 1.5], center=[1, 1], row_skips=[[1], [], [[2, 4]]],
+                           type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, size=[0.5, 0.3], rotation=30,
+                           layers=Pad.LAYERS_SMT)
+
+        grid_rotation = Rotation(20)
+        grid_rotation.append(PadGrid(**grid_params))
+
+        pads_rotation = Rotation(20)
+        grid = PadGrid(**grid_params)
+        for number, x, y in grid.iterPads():
+            pads_rotation.append(Pad(number=number, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[x, y],
+                                     size=[0.5, 0.3], rotation=30, layers=Pad.LAYERS_SMT))
+
+        expected = pads_rotation.calculateBoundingBox()
+        self.assertBoundingBox(grid_rotation, [expected['min'].x, expected['min'].y,
+                                               expected['max'].x, expected['max'].y])
+
+    def testTransformedVirtualChilds(self):
+        pad_array_params = dict(pincount=3, x_spacing=1, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, size=[0.5, 0.5],
+                                layers=Pad.LAYERS_SMT)
+        translation = Translation(10, 0)
+        translation.append(PadArray(**pad_array_params))
+        self.assertBoundingBox(translation, [9.75, -0.25, 12.25, 0.25])
+
+        rotation = Rotation(90)
+        rotation.append(PadArray(**pad_array_params))
+        self.assertBoundingBox(rotation, [-0.25, -2.25, 0.25, 0.25])
+
+        # the paste pads of the exposed pad are chamfered pads, which are virtual childs of virtual childs
+        exposed_pad_params = dict(number=3, at=[0, 0], size=[2.1, 3], mask_size=[2.1, 2.1], paste_layout=[2, 3],
+                                  via_layout=[3, 2])
+        translation = Translation(0, 20)
+        translation.append(ExposedPad(**exposed_pad_params))
+        self.assertBoundingBox(translation, [-1.05, 18.5, 1.05, 21.5])
+        paste_pads = list(translation.walk(node_type=ChamferedPad))
+        self.assertEqual(len(paste_pads), 6)
+        for node in paste_pads:
+            self.assertBoundingBox(node, [node.at.x - node.size.x / 2, node.at.y + 20 - node.size.y / 2,
+                                          node.at.x + node.size.x / 2, node.at.y + 20 + node.size.y / 2])
+
+        rotation = Rotation(90)
+        rotation.append(ExposedPad(**exposed_pad_params))
+        self.assertBoundingBox(rotation, [-1.5, -1.05, 1.5, 1.05])
+
+    def testCacheInvalidation(self):
+        kicad_mod = Footprint("cached")
+        translation = Translation(0, 0)
+        line = Line(start=[0, 0], end=[1, 1])
+        kicad_mod.append(translation)
+        translation.append(line)
+
+        self.assertBoundingBox(kicad_mod, [0, 0, 1, 1])
+        self.assertIs(kicad_mod._getBoundingBox(), kicad_mod._getBoundingBox())
+
+        line.end_pos = Vector2D(2, 3)
+        self.assertBoundingBox(kicad_mod, [0, 0, 2, 3])
+
+        translation.offset_x = 1
+        self.assertBoundingBox(kicad_mod, [1, 0, 3, 3])
+        self.assertBoundingBox(line, [1, 0, 3, 3])
+
+        circle = Circle(center=[0, 0], radius=1)
+        kicad_mod.append(circle)
+        self.assertBoundingBox(kicad_mod, [-1, -1, 3, 3])
+
+        translation.remove(line)
+        self.assertBoundingBox(kicad_mod, [-1, -1, 1, 1])
+        self.assertBoundingBox(line, [0, 0, 2, 3])
+
+        rotation = Rotation(0)
+        rotation.append(line)
+        translation.append(rotation)
+        self.assertBoundingBox(kicad_mod, [-1, -1, 3, 3])
+        rotation.rotation = 180
+        self.assertBoundingBox(kicad_mod, [-1, -3, 1, 1])
+
+        pad_array = PadArray(pincount=3, x_spacing=1, type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, size=[0.5, 0.5],
+                             layers=Pad.LAYERS_SMT)
+        footprint = Footprint("lazy")
+        footprint.append(pad_array)
+        self.assertBoundingBox(footprint, [-0.25, -0.25, 2.25, 0.25])
+        pad_array.pincount = 5
+        self.assertBoundingBox(footprint, [-0.25, -0.25, 4.25, 0.25])
+
+        pad = Pad(type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, at=[0, 0], size=[1, 1], layers=Pad.LAYERS_SMT)
+        footprint.append(pad)
+        pad.at = Vector2D(5, 0)
+        self.assertBoundingBox(footprint, [-0.25, -0.5, 5.5, 0.5])
+        pad.size = Vector2D(1, 2)
+        self.assertBoundingBox(footprint, [-0.25, -1, 5.5, 1])
+        # attributes which do not change the geometry do not drop the cached bounding box
+        bounding_box = footprint._getBoundingBox()
+        pad.number = 2
+        self.assertIs(footprint._getBoundingBox(), bounding_box)
@@ -16,6 +16,11 @@
 import unittest
 
 from KicadModTree.nodes.Node import *
+from KicadModTree.nodes.specialized.Translation import Translation
+from KicadModTree.nodes.specialized.Rotation import Rotation
+from KicadModTree.nodes.base.Pad import Pad
+from KicadModTree.nodes.specialized.ChamferedPadGrid import ChamferedPadGrid
+from KicadModTree.nodes.specialized.PadArray import PadArray
 
 
 class TestChildNode(Node):
@@ -23,6 +28,34 @@ class TestChildNode(Node):
         Node.__init__(self)
 
 
+class TestLayerNode(Node):
+    def __init__(self, layer):
+        Node.__init__(self)
+        self.layer = layer
+
+
+class TestVirtualChildsNode(Node):
+    def __init__(self, virtual_childs):
+        Node.__init__(self)
+        self.virtual_childs = virtual_childs
+
+    def getVirtualChilds(self):
+        return self.virtual_childs
+
+
+class TestLazyNode(LazyNode):
+    count = geometryAttribute('count')
+
+    def __init__(self, count):
+        Node.__init__(self)
+        self.count = count
+        self.created = 0
+
+    def _createVirtualChilds(self):
+        self.created += 1
+        return (TestChildNode() for i in range(self.count))
+
+
 class NodeTests(unittest.TestCase):
 
     def testInit(self):
@@ -264,3 +297,109 @@ class NodeTests(unittest.TestCase):
         node.insert(insertNode)
         self.assertEqual(len(node.getNormalChilds()), 1)
         self.assertEqual(len(insertNode.getNormalChilds()), 200)
+
+    def testGetRealPosition(self):
+        node = Node()
+        self.assertEqual(node.getRealPosition([1, 2]), Vector3D(1, 2))
+        self.assertEqual(node.getRealPosition([1, 2], 45), (Vector3D(1, 2), 45))
+
+        translation = Translation(1, -2)
+        node.append(translation)
+        childNode = Node()
+        translation.append(childNode)
+        self.assertEqual(childNode.getRealPosition([1, 2]), Vector3D(2, 0))
+        self.assertEqual(childNode.getRealPosition([1, 2], 45), (Vector3D(2, 0), 45))
+
+        rotation = Rotation(90)
+        translation.append(rotation)
+        rotationChild = Node()
+        rotation.append(rotationChild)
+        position, rotation_angle = rotationChild.getRealPosition([1, 0], 10)
+        self.assertAlmostEqual(position.x, 1)
+        self.assertAlmostEqual(position.y, -3)
+        self.assertEqual(rotation_angle, 100)
+
+    def testTransformationCacheInvalidation(self):
+        node = Node()
+        translation = Translation(1, 1)
+        node.append(translation)
+        childNode = Node()
+        translation.append(childNode)
+        self.assertEqual(childNode.getRealPosition([0, 0]), Vector3D(1, 1))
+
+        translation.offset_x = 3
+        self.assertEqual(childNode.getRealPosition([0, 0]), Vector3D(3, 1))
+
+        outerTranslation = Translation(0, 5)
+        node.remove(translation)
+        self.assertEqual(childNode.getRealPosition([0, 0]), Vector3D(3, 1))
+        outerTranslation.append(translation)
+        self.assertEqual(childNode.getRealPosition([0, 0]), Vector3D(3, 6))
+
+        copyNode = outerTranslation.copy()
+        copyTranslation = Translation(-3, -6)
+        copyTranslation.append(copyNode)
+        copyChild = copyNode.getNormalChilds()[0].getNormalChilds()[0]
+        self.assertEqual(copyChild.getRealPosition([0, 0]), Vector3D(0, 0))
+        self.assertEqual(childNode.getRealPosition([0, 0]), Vector3D(3, 6))
+
+    def testWalk(self):
+        node = Node()
+        childNode1 = TestLayerNode('F.SilkS')
+        childNode2 = TestChildNode()
+        childNode3 = TestLayerNode('F.Fab')
+        virtualNode = TestLayerNode('F.SilkS')
+        childNode4 = TestVirtualChildsNode([virtualNode])
+        node.extend([childNode1, childNode2])
+        childNode1.append(childNode3)
+        childNode2.append(childNode4)
+
+        self.assertEqual(list(node.walk()), [node, childNode1, childNode3, childNode2, childNode4, virtualNode])
+        self.assertEqual(node.serialize(), list(node.walk()))
+        self.assertEqual(list(node.walk(virtual_childs=False)), [node, childNode1, childNode3, childNode2, childNode4])
+        self.assertEqual(list(node.walk(node_type=TestLayerNode)), [childNode1, childNode3, virtualNode])
+        self.assertEqual(list(node.walk(layer='F.SilkS')), [childNode1, virtualNode])
+        self.assertEqual(list(node.walk(layer=['F.Fab', 'B.Fab'])), [childNode3])
+        self.assertEqual(list(node.walk(node_type=TestChildNode, layer='F.SilkS')), [])
+
+    def testWalkDeepTree(self):
+        node = Node()
+        current = node
+        for i in range(5000):
+            child = Node()
+            current.append(child)
+            current = child
+
+        self.assertEqual(len(list(node.walk())), 5001)
+
+    def testLazyVirtualChilds(self):
+        node = TestLazyNode(3)
+        self.assertEqual(node.created, 0)
+
+        childs = node.getVirtualChilds()
+        self.assertEqual(len(childs), 3)
+        self.assertIs(node.getVirtualChilds(), childs)
+        self.assertEqual(len(node.serialize()), 4)
+        self.assertEqual(node.created, 1)
+
+        # changing a parameter creates the virtual childs again
+        node.count = 5
+        self.assertEqual(len(node.getVirtualChilds()), 5)
+        self.assertEqual(node.created, 2)
+        # the virtual childs are placed in the coordinate system of their node
+        translation = Translation(1, 2)
+        translation.append(node)
+        for child in node.getVirtualChilds():
+            self.assertIs(child.getParent(), node)
+            self.assertEqual(child.getRealPosition([0, 0]), Vector3D(1, 2))
+
+    def testLazyNodeParameterErrors(self):
+        # only the creation of the pads is deferred, invalid parameters are reported by the constructors
+        with self.assertRaises(ValueError):
+            PadArray(pincount=3, x_spacing=1, type=Pad.TYPE_SMT, shape='bogus', size=1, layers=Pad.LAYERS_SMT)
+        with self.assertRaises(ValueError):
+            PadArray(pincount=3, x_spacing=2, type=Pad.TYPE_THT, shape=Pad.SHAPE_CIRCLE, size=1.5, drill=1,
+                     layers=Pad.LAYERS_THT, tht_pad1_shape='bogus')
+        with self.assertRaises(ValueError):
+            ChamferedPadGrid(number=1, type=Pad.TYPE_SMT, center=[0, 0], size=1, pincount=[2, 2], grid=[1, 1],
+                             chamfer_size=0.1, chamfer_selection=0, layers=Pad.LAYERS_SMT, radius_ratio=0.9)
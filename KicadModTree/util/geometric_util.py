@@ -0,0 +1,266 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+from __future__ import division
+
+import math
+
+# Bounding boxes are tuples (min_x, min_y, max_x, max_y). Transformations are affine matrices (a, b, c, d, e, f)
+# which map a point with x' = a*x + b*y + c and y' = d*x + e*y + f, None is the identity transformation.
+
+# bounding box which does not contain anything, merging it with another box results in the other box
+EMPTY_BOUNDING_BOX = (float('inf'), float('inf'), float('-inf'), float('-inf'))
+
+
+def composeTransformation(parent, child):
+    '''
+    compose two affine matrices given as (a, b, c, d, e, f). The child matrix is applied first.
+
+    ``None`` represents the identity transformation.
+    '''
+    if parent is None:
+        return child
+    if child is None:
+        return parent
+
+    a, b, c, d, e, f = parent
+    ca, cb, cc, cd, ce, cf = child
+    return (a*ca + b*cd, a*cb + b*ce, a*cc + b*cf + c,
+            d*ca + e*cd, d*cb + e*ce, d*cc + e*cf + f)
+
+
+def placementMatrix(x, y, rotation=0):
+    '''
+    affine matrix which rotates by rotation (in degree, like the ``Rotation`` node) and then moves to (x, y)
+    '''
+    if rotation % 360 == 0:
+        return (1, 0, x, 0, 1, y)
+
+    phi = math.radians(rotation)
+    cos_phi = math.cos(phi)
+    sin_phi = math.sin(phi)
+    return (cos_phi, sin_phi, x,
+            -sin_phi, cos_phi, y)
+
+
+def mergeBoundingBoxes(box, other):
+    '''
+    smallest bounding box containing both boxes
+    '''
+    return (box[0] if box[0] < other[0] else other[0],
+            box[1] if box[1] < other[1] else other[1],
+            box[2] if box[2] > other[2] else other[2],
+            box[3] if box[3] > other[3] else other[3])
+
+
+def growBoundingBox(box, distance):
+    '''
+    enlarge a bounding box by distance into all directions
+    '''
+    if not distance or box[0] > box[2]:
+        return box
+    return (box[0] - distance, box[1] - distance, box[2] + distance, box[3] + distance)
+
+
+def pointsBoundingBox(points, matrix=None):
+    '''
+    bounding box of a list of points (objects with x and y attributes) after applying the transformation
+    '''
+    if matrix is None:
+        xs = [point.x for point in points]
+        ys = [point.y for point in points]
+    else:
+        a, b, c, d, e, f = matrix
+        xs = [a*point.x + b*point.y + c for point in points]
+        ys = [d*point.x + e*point.y + f for point in points]
+
+    if not xs:
+        return EMPTY_BOUNDING_BOX
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def rectangleBoundingBox(width, height, matrix=None):
+    '''
+    bounding box of a rectangle centered at the origin after applying the transformation
+    '''
+    half_width = width / 2.
+    half_height = height / 2.
+    if matrix is None:
+        return (-half_width, -half_height, half_width, half_height)
+
+    a, b, c, d, e, f = matrix
+    extent_x = abs(a) * half_width + abs(b) * half_height
+    extent_y = abs(d) * half_width + abs(e) * half_height
+    return (c - extent_x, f - extent_y, c + extent_x, f + extent_y)
+
+
+def circleBoundingBox(x, y, radius, matrix=None):
+    '''
+    bounding box of a circle after applying the transformation
+    '''
+    if matrix is None:
+        return (x - radius, y - radius, x + radius, y + radius)
+
+    a, b, c, d, e, f = matrix
+    center_x = a*x + b*y + c
+    center_y = d*x + e*y + f
+    # a circle is transformed into an ellipse, which is the circle itself for rotations and translations
+    extent_x = radius * math.hypot(a, b)
+    extent_y = radius * math.hypot(d, e)
+    return (center_x - extent_x, center_y - extent_y, center_x + extent_x, center_y + extent_y)
+
+
+def arcBoundingBox(center, start, angle, matrix=None):
+    '''
+    bounding box of an arc after applying the transformation (only rotations, translations and mirroring)
+
+    The arc starts at start and runs angle degree around center, in the direction of the ``Arc`` node. Beside both end
+    points, every crossing of the horizontal and vertical axis through the center is included.
+    '''
+    center_x, center_y = center.x, center.y
+    start_x, start_y = start.x, start.y
+    if matrix is not None:
+        a, b, c, d, e, f = matrix
+        center_x, center_y = a*center_x + b*center_y + c, d*center_x + e*center_y + f
+        start_x, start_y = a*start.x + b*start.y + c, d*start.x + e*start.y + f
+        if a*e - b*d < 0:
+            # mirroring changes the direction of the arc
+            angle = -angle
+
+    radius = math.hypot(start_x - center_x, start_y - center_y)
+    if abs(angle) >= 360:
+        return (center_x - radius, center_y - radius, center_x + radius, center_y + radius)
+
+    start_angle = math.degrees(math.atan2(start_y - center_y, start_x - center_x))
+    end_angle = start_angle + angle
+    end_x = center_x + radius * math.cos(math.radians(end_angle))
+    end_y = center_y + radius * math.sin(math.radians(end_angle))
+
+    xs = [start_x, end_x]
+    ys = [start_y, end_y]
+
+    # axis crossings at multiples of 90 degree between the lower and the higher angle
+    low_angle, high_angle = min(start_angle, end_angle), max(start_angle, end_angle)
+    quadrant = int(math.ceil(low_angle / 90.))
+    while quadrant * 90 <= high_angle:
+        direction = quadrant % 4
+        if direction == 0:
+            xs.append(center_x + radius)
+        elif direction == 1:
+            ys.append(center_y + radius)
+        elif direction == 2:
+            xs.append(center_x - radius)
+        else:
+            ys.append(center_y - radius)
+        quadrant += 1
+
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def boundingBoxDistance(box, other):
+    '''
+    distance between two bounding boxes, 0 if they overlap
+    '''
+    dx = max(other[0] - box[2], box[0] - other[2], 0)
+    dy = max(other[1] - box[3], box[1] - other[3], 0)
+    return math.hypot(dx, dy)
+
+
+def pointSegmentDistance(x, y, x1, y1, x2, y2):
+    '''
+    distance between the point (x, y) and the line segment from (x1, y1) to (x2, y2)
+    '''
+    dx = x2 - x1
+    dy = y2 - y1
+    length_squared = dx*dx + dy*dy
+    if length_squared == 0:
+        return math.hypot(x - x1, y - y1)
+
+    t = ((x - x1)*dx + (y - y1)*dy) / length_squared
+    t = 0 if t < 0 else 1 if t > 1 else t
+    return math.hypot(x - (x1 + t*dx), y - (y1 + t*dy))
+
+
+def _orientation(ax, ay, bx, by, cx, cy):
+    value = (bx - ax)*(cy - ay) - (by - ay)*(cx - ax)
+    return (value > 0) - (value < 0)
+
+
+def segmentsIntersect(segment, other):
+    '''
+    check if two line segments given as (x1, y1, x2, y2) intersect or touch each other
+    '''
+    ax, ay, bx, by = segment[:4]
+    cx, cy, dx, dy = other[:4]
+
+    o1 = _orientation(ax, ay, bx, by, cx, cy)
+    o2 = _orientation(ax, ay, bx, by, dx, dy)
+    o3 = _orientation(cx, cy, dx, dy, ax, ay)
+    o4 = _orientation(cx, cy, dx, dy, bx, by)
+
+    if o1 != o2 and o3 != o4:
+        return True
+
+    # collinear cases, one end point lies on the other segment
+    return ((o1 == 0 and pointSegmentDistance(cx, cy, ax, ay, bx, by) == 0) or
+            (o2 == 0 and pointSegmentDistance(dx, dy, ax, ay, bx, by) == 0) or
+            (o3 == 0 and pointSegmentDistance(ax, ay, cx, cy, dx, dy) == 0) or
+            (o4 == 0 and pointSegmentDistance(bx, by, cx, cy, dx, dy) == 0))
+
+
+def segmentDistance(segment, other):
+    '''
+    distance between two line segments given as (x1, y1, x2, y2), 0 if they intersect
+    '''
+    if segmentsIntersect(segment, other):
+        return 0.
+
+    ax, ay, bx, by = segment[:4]
+    cx, cy, dx, dy = other[:4]
+    return min(pointSegmentDistance(ax, ay, cx, cy, dx, dy),
+               pointSegmentDistance(bx, by, cx, cy, dx, dy),
+               pointSegmentDistance(cx, cy, ax, ay, bx, by),
+               pointSegmentDistance(dx, dy, ax, ay, bx, by))
+
+
+def pointInPolygon(x, y, points):
+    '''
+    check if the point (x, y) is inside of the polygon given as list of (x, y) tuples (even-odd rule)
+    '''
+    inside = False
+    x1, y1 = points[-1]
+    for x2, y2 in points:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def arcPolyline(center_x, center_y, radius, start_angle, angle, max_error=0.001):
+    '''
+    approximate an arc by a list of (x, y) points
+
+    :param start_angle: angle of the start point in degree (like math.atan2, in the coordinate system of the arc)
+    :param angle: angle of the arc in degree, in the direction of the ``Arc`` node
+    :param max_error: maximum distance between the arc and the line segments
+    '''
+    sweep = math.radians(angle)
+    if radius <= max_error:
+        segments = 1
+    else:
+        segments = int(math.ceil(abs(sweep) / (2 * math.acos(1 - max_error / radius))))
+    segments = max(segments, 1)
+
+    start = math.radians(start_angle)
+    return [(center_x + radius * math.cos(start + sweep * i / segments),
+             center_y + radius * math.sin(start + sweep * i / segments)) for i in range(segments + 1)]
@@ -13,6 +13,8 @@
 #
 # (C) 2016-2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import io
+import sys
 import time
 import re
 
@@ -37,79 +39,65 @@ def lispString(string):
     return string
 
 
+# tokens of a sexpr: brackets, quoted strings (escaped quotation marks are allowed inside), everything else and
+# quotation marks which are not closed
+_SEXPR_TOKEN_REGEX = re.compile(br'[()]|"(?:[^"\\]|\\.)*"|[^\s()"][^\s()]*|"')
+
+
 def lispTokenizer(input):
     '''
     Convert a string of characters into a list of tokens.
     '''
-    input = input.replace('(', ' ( ').replace(')', ' ) ')
-
-    # split input, including whitespaces
-    base_tokens = re.split(r'(\s+)', input)
-
     tokens = []
-    in_string = False
-
-    for token in base_tokens:
-        if not in_string and token.isspace():
-            continue
-
-        if len(token) == 0:
-            continue
-
-        if token[0] == '"':
-            if in_string:
-                tokens[-1] += token[1:]
-                in_string = False
-            else:
-                tokens.append(token[1:])
-                in_string = True
-
-        elif token[-1] == '"':
-            if in_string:
-                tokens[-1] += token[:-1]
-                in_string = False
-            else:
-                tokens.append(token[:-1])
-                in_string = True
-
-        else:
-            if in_string:
-                tokens[-1] += token
-            else:
-                tokens.append(token)
-
-    if in_string:
-        raise RuntimeError("missing closing quotation mark")
-
-    # TOOD: remove invalid spaces from quotation (when having brackets inside)
+    for match in _SEXPR_TOKEN_REGEX.finditer(input.encode('utf-8')):
+        token = match.group()
+        if token[:1] == b'"':
+            if len(token) == 1:
+                raise RuntimeError("missing closing quotation mark")
+            token = token[1:-1].replace(b'\\"', b'"')
+        tokens.append(token.decode('utf-8'))
 
     return tokens
 
 
-def parseLispString(input):
+def parseSexpr(data):
+    '''
+    Parse a sexpr into nested lists of strings in a single pass
+
+    :param data: bytes-like object like ``bytes`` or a ``mmap``. The input is tokenized in place, one token at a
+                 time, so apart from the result only memory for the current nesting depth is required.
+    :return: list of all top level expressions
+    '''
     syntax_tree = []
     current_node = syntax_tree
-    scope = [syntax_tree]
-
-    for token in lispTokenizer(input):
-        if token == "(":
-            scope.append([])
-            current_node.append(scope[-1])
-            current_node = scope[-1]
-
-        elif token == ")":
-            if len(scope) <= 1:
+    scope = []
+
+    for match in _SEXPR_TOKEN_REGEX.finditer(data):
+        token = match.group()
+        if token == b'(':
+            scope.append(current_node)
+            current_node = []
+            scope[-1].append(current_node)
+        elif token == b')':
+            if not scope:
                 raise RuntimeError("missing opening brackets")
-
-            scope.pop()
-            current_node = scope[-1]
-
+            current_node = scope.pop()
+        elif token[:1] == b'"':
+            if len(token) == 1:
+                raise RuntimeError("missing closing quotation mark")
+            current_node.append(token[1:-1].replace(b'\\"', b'"').decode('utf-8'))
         else:
-            current_node.append(token)
+            current_node.append(token.decode('utf-8'))
 
-    if len(scope) > 1:
+    if scope:
         raise RuntimeError("missing closing brackets")
 
+    return syntax_tree
+
+
+def parseLispString(input):
+    syntax_tree = parseSexpr(input.encode('utf-8'))
+
     if len(syntax_tree) == 1:
         syntax_tree = syntax_tree[0]
 
@@ -119,13 +107,17 @@ def parseLispString(input):
 class SexprSerializer(object):
     '''
     Converts a nested python list into a sexpr syntax which can be parsed by KiCad
+
+    The output is written token by token into a text stream, which means serializing a file only requires linear
+    time and does not hold intermediate copies of already serialized sub-expressions in memory.
     '''
 
     NEW_LINE = object
 
     def __init__(self, sexpr):
         '''
-        :param sexpr: A list of lists and primitive values representing the file
+        :param sexpr: A list of lists and primitive values representing the file.
+                      The top level can be any iterable, which allows generating the file content lazily.
         '''
         self.sexpr = sexpr
 
@@ -140,47 +132,63 @@ class SexprSerializer(object):
         else:
             raise RuntimeError("unexpected type: {}".format(pType))
 
-    def sexpr_to_string(self, sexpr, prefix=None):
-        if prefix is None:
-            prefix = ""
-
-        serial_string = "("
-
-        # see: https://stackoverflow.com/questions/3190706/nonlocal-keyword-in-python-2-x
-        loop_ctrl = {'first': True, 'indentation': False}
+    def write(self, stream):
+        '''
+        Write the sexpr into a text stream (file, ``io.StringIO``,...)
 
-        def get_separator():
-            if loop_ctrl['first']:
-                loop_ctrl['first'] = False
-                return_str = ""
-            else:
-                return_str = " "
+        :param stream: object with a ``write(str)`` method
+        '''
+        self._write_sexpr(stream.write, self.sexpr, "\n", "")
 
-            if loop_ctrl['indentation']:
-                return_str += " "
-                loop_ctrl['indentation'] = False
+    def _write_sexpr(self, write, sexpr, newline, indentation):
+        '''
+        :param write: write function of the output stream
+        :param sexpr: the expression to write
+        :param newline: string which is written for a SexprSerializer.NEW_LINE inside this expression
+        :param indentation: additional indentation of this expression, which is inserted after line breaks
+                            contained inside primitives
+        '''
+        write("(")
 
-            return return_str
+        first = True
+        after_newline = False
 
         for attr in sexpr:
             if isinstance(attr, (tuple, list)):
-                return_string = self.sexpr_to_string(attr, prefix + " ")
-
-                if loop_ctrl['indentation']:
-                    return_string = return_string.replace('\n', '\n ')
-                serial_string += get_separator()
-
-                serial_string += return_string
-            elif attr == SexprSerializer.NEW_LINE:
-                serial_string += "\n"
-                serial_string += prefix
-                loop_ctrl['indentation'] = True
+                if not first:
+                    write(" ")
+                if after_newline:
+                    # sub-expressions which start on a new line are indented one level further
+                    write(" ")
+                    self._write_sexpr(write, attr, newline + "  ", indentation + " ")
+                else:
+                    self._write_sexpr(write, attr, newline + " ", indentation)
+                first = False
+                after_newline = False
+            elif attr is SexprSerializer.NEW_LINE:
+                write(newline)
+                after_newline = True
             else:
-                serial_string += get_separator()
-                serial_string += self.primitive_to_string(attr)
+                if not first:
+                    write(" ")
+                if after_newline:
+                    write(" ")
+                primitive = self.primitive_to_string(attr)
+                if indentation and "\n" in primitive:
+                    primitive = primitive.replace("\n", "\n" + indentation)
+                write(primitive)
+                first = False
+                after_newline = False
+
+        write(")")
+
+    def sexpr_to_string(self, sexpr, prefix=None):
+        if prefix is None:
+            prefix = ""
 
-        serial_string += ")"
-        return serial_string
+        output = io.StringIO() if sys.version_info[0] >= 3 else io.BytesIO()
+        self._write_sexpr(output.write, sexpr, "\n" + prefix, "")
+        return output.getvalue()
 
     def __str__(self):
         '''
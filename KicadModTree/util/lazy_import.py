@@ -0,0 +1,118 @@
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import importlib
+import sys
+import types
+
+# exports of a submodule: all public names of the submodule (like "from .submodule import *")
+ALL_NAMES = '*'
+
+
+def _publicNames(module):
+    names = getattr(module, '__all__', None)
+    if names is None:
+        names = [name for name in vars(module) if not name.startswith('_')]
+    return list(names)
+
+
+class _LazyModule(types.ModuleType):
+    r"""Package which imports the submodules of its public names on first access"""
+
+    def __getattr__(self, name):
+        # only called for names which are not imported yet
+        lazy_names = self.__dict__['_lazy_names']
+        if name == '__all__':
+            value = self._allNames()
+        elif name in lazy_names:
+            module_name, attribute = lazy_names[name]
+            module = importlib.import_module(module_name, self.__name__)
+            value = module if attribute is None else getattr(module, attribute)
+        else:
+            value = self._findInStarModules(name)
+
+        self.__dict__[name] = value
+        return value
+
+    def __setattr__(self, name, value):
+        # the import system binds every submodule to its package, which would replace the class of the same name
+        if (isinstance(value, types.ModuleType) and value.__name__ == '{}.{}'.format(self.__name__, name) and
+                name in vars(value)):
+            return
+        types.ModuleType.__setattr__(self, name, value)
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(self.__all__))
+
+    def _findInStarModules(self, name):
+        if not name.startswith('_'):
+            for module_name in self.__dict__['_star_modules']:
+                module = importlib.import_module(module_name, self.__name__)
+                if name in _publicNames(module):
+                    return getattr(module, name)
+        raise AttributeError("module '{module}' has no attribute '{name}'".format(module=self.__name__, name=name))
+
+    def _allNames(self):
+        names = list(self.__dict__['_eager_names']) + list(self.__dict__['_lazy_names'])
+        for module_name in self.__dict__['_star_modules']:
+            names.extend(_publicNames(importlib.import_module(module_name, self.__name__)))
+
+        # keep the first occurrence of every name
+        seen = set()
+        return [name for name in names if not (name in seen or seen.add(name))]
+
+
+def lazyImport(module_name, exports):
+    r"""Import the public names of a package from its submodules when they are accessed for the first time
+
+    The names are still available by ``from package import *``, which imports all of them. Python versions which do
+    not allow to change the class of a module (python 2) import all submodules directly.
+
+    :param module_name: ``__name__`` of the package
+    :param exports: list of ``(submodule, names)``, where names is a list of attribute names of the submodule,
+        ``None`` to export the submodule itself or ``ALL_NAMES`` for all public names of the submodule. The name of
+        the submodule is relative to the package.
+
+    :Example:
+
+    >>> from KicadModTree.util.lazy_import import lazyImport, ALL_NAMES
+    >>> lazyImport(__name__, [('.Arc', ['Arc']), ('.base', None), ('.specialized', ALL_NAMES)])
+    """
+    module = sys.modules[module_name]
+
+    if sys.version_info < (3, 5):
+        # the class of modules can not be changed, import everything in the given order
+        for submodule, names in exports:
+            value = importlib.import_module(submodule, module_name)
+            if names is None:
+                setattr(module, submodule.rpartition('.')[2], value)
+                continue
+            for name in (_publicNames(value) if names == ALL_NAMES else names):
+                setattr(module, name, getattr(value, name))
+        return
+
+    lazy_names = {}
+    star_modules = []
+    for submodule, names in exports:
+        if names is None:
+            lazy_names[submodule.rpartition('.')[2]] = (submodule, None)
+        elif names == ALL_NAMES:
+            star_modules.append(submodule)
+        else:
+            for name in names:
+                lazy_names[name] = (submodule, name)
+
+    module._eager_names = [name for name in vars(module) if not name.startswith('_')]
+    module._lazy_names = lazy_names
+    module._star_modules = star_modules
+    module.__class__ = _LazyModule
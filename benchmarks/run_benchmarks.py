@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+"""Benchmark suite for the hot paths of KicadModTree
+
+Every case is a synthetic, deterministic workload. For each case the suite measures
+
+* the wall time of one run (the best of several repetitions)
+* the peak memory traced by tracemalloc during one run
+* the number of memory blocks allocated by one run which are still alive at its end (including the result). A full
+  garbage collection runs before they are counted, it also empties the free lists of the interpreter, whose size
+  depends on the depth of the calls and not on the objects kept by KicadModTree
+
+The results are compared against a stored baseline and every value which is worse than the baseline by more than
+the threshold is flagged as regression, in which case the script exits with 1:
+
+    python benchmarks/run_benchmarks.py                       # compare against benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py serialize             # only run cases containing "serialize"
+    python benchmarks/run_benchmarks.py --save-baseline       # store the results as new baseline
+
+The import cases measure the time ``python -X importtime`` reports for an import statement in a new interpreter, and
+the memory allocated by the import.
+
+Wall times depend on the machine. To compare runs on machines of different speed (or a machine which is busy),
+the time of a fixed pure python workload is measured directly before every case and the times are scaled by it
+before they are compared. Cases whose time regressed are measured again before they are reported. The baseline
+should still be created on the machine which runs the comparison.
+"""
+
+import argparse
+import collections
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+sys.path.append(ROOT)
+
+from KicadModTree import *  # NOQA
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "baseline.json")
+
+# name -> function which prepares a case and returns the workload to measure
+CASES = collections.OrderedDict()
+
+
+def benchmark(name):
+    def register(function):
+        CASES[name] = function
+        return function
+    return register
+
+
+def expand(node):
+    # lazy nodes create their childs on demand, walking the tree creates all of them
+    collections.deque(node.walk(), maxlen=0)
+    return node
+
+
+def create_footprint(pad_rows, pad_columns, line_count):
+    kicad_mod = Footprint("benchmark_{}x{}_{}".format(pad_rows, pad_columns, line_count))
+    kicad_mod.setDescription("Synthetic footprint to benchmark the serialization")
+    kicad_mod.setTags("benchmark")
+    kicad_mod.setAttribute('smd')
+
+    kicad_mod.append(Text(type='reference', text='REF**', at=[0, -5], layer='F.SilkS'))
+    kicad_mod.append(Text(type='value', text=kicad_mod.name, at=[0, 5], layer='F.Fab'))
+    kicad_mod.append(Text(type='user', text='%R', at=[0, 0], layer='F.Fab'))
+
+    kicad_mod.append(PadGrid(layout=[pad_columns, pad_rows], pitch=[0.8, 0.8], center=[0, 0], type=Pad.TYPE_SMT,
+                             shape=Pad.SHAPE_CIRCLE, size=[0.4, 0.4], layers=Pad.LAYERS_SMT))
+
+    rotation = Rotation(45)
+    kicad_mod.append(rotation)
+    for i in range(line_count):
+        rotation.append(Line(start=[i * 0.01, 0], end=[i * 0.01, 1], layer='F.Fab'))
+    kicad_mod.append(RectLine(start=[-3, -3], end=[3, 3], layer='F.CrtYd'))
+    kicad_mod.append(Arc(center=[0, 0], start=[2, 0], angle=270, layer='F.SilkS'))
+    kicad_mod.append(Circle(center=[0, 0], radius=0.5, layer='F.Fab'))
+
+    kicad_mod.append(Model(filename="example.3dshapes/benchmark.wrl"))
+    return kicad_mod
+
+
+@benchmark('vector_arithmetic')
+def vector_arithmetic():
+    def run():
+        position = Vector2D(0, 0)
+        step = Vector2D(0.5, 0.25)
+        for i in range(10000):
+            position = (position + step) * 1.001 - 0.1
+            position += step
+            position.distance_to(step)
+        return position
+    return run
+
+
+@benchmark('pads_10k')
+def pads_10k():
+    def run():
+        return [Pad(number=i, type=Pad.TYPE_SMT, shape=Pad.SHAPE_ROUNDRECT, at=[i * 0.5, 0], size=[0.3, 1],
+                    radius_ratio=0.25, layers=Pad.LAYERS_SMT) for i in range(10000)]
+    return run
+
+
+@benchmark('pad_array_200')
+def pad_array_200():
+    def run():
+        return expand(PadArray(pincount=200, spacing=[0.5, 0], center=[0, 0], initial=1, increment=1,
+                               type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, size=[0.3, 1.5], layers=Pad.LAYERS_SMT))
+    return run
+
+
+@benchmark('exposed_pad')
+def exposed_pad():
+    def run():
+        return expand(ExposedPad(number=33, at=[0, 0], size=[10, 10], mask_size=[9.5, 9.5], paste_layout=[8, 8],
+                                 via_layout=[12, 12], via_drill=0.3, via_grid=0.8))
+    return run
+
+
+@benchmark('chamfered_pad_grid')
+def chamfered_pad_grid():
+    def run():
+        return expand(ChamferedPadGrid(number=1, type=Pad.TYPE_SMT, center=[0, 0], size=0.4, pincount=[30, 30],
+                                       grid=0.5, chamfer_selection=ChamferSelPadGrid(1), chamfer_size=0.1,
+                                       layers=['F.Paste']))
+    return run
+
+
+@benchmark('polygone_line_5k')
+def polygone_line_5k():
+    nodes = [(i * 0.01, (i % 7) * 0.2) for i in range(5000)]
+
+    def run():
+        return expand(PolygoneLine(nodes=nodes, layer='F.SilkS', width=0.12))
+    return run
+
+
+@benchmark('serialize_small')
+def serialize_small():
+    file_handler = KicadFileHandler(create_footprint(2, 4, 10))
+    return lambda: file_handler.serialize(timestamp=0)
+
+
+@benchmark('serialize_medium')
+def serialize_medium():
+    file_handler = KicadFileHandler(create_footprint(10, 10, 500))
+    return lambda: file_handler.serialize(timestamp=0)
+
+
+@benchmark('serialize_huge')
+def serialize_huge():
+    file_handler = KicadFileHandler(create_footprint(60, 60, 20000))
+    return lambda: file_handler.serialize(timestamp=0)
+
+
+class ImportWorkload(object):
+    r"""Import statement which is measured in a new interpreter"""
+
+    MARKER = 'benchmark import starts here'
+
+    def __init__(self, statement):
+        self.statement = statement
+
+    def _run(self, prefix, suffix='', options=()):
+        code = "import sys; sys.path.insert(0, {root!r}); {prefix}; {statement}; {suffix}".format(
+            root=ROOT, prefix=prefix, statement=self.statement, suffix=suffix)
+        process = subprocess.Popen([sys.executable] + list(options) + ['-c', code],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError("{} failed:\n{}".format(self.statement, stderr.decode('utf-8', 'replace')))
+        return stdout.decode('utf-8'), stderr.decode('utf-8')
+
+    def importTime(self):
+        r"""Time in seconds of all modules imported by the statement, as reported by python -X importtime"""
+        _, stderr = self._run("sys.stderr.write({!r})".format(self.MARKER + '\n'), options=['-X', 'importtime'])
+        microseconds = 0
+        for line in stderr.split(self.MARKER, 1)[1].splitlines():
+            # "import time: self [us] | cumulative | imported package", nested imports are indented
+            parts = line.split('|')
+            if line.startswith('import time:') and len(parts) == 3 and not parts[2].startswith('  '):
+                microseconds += int(parts[1])
+        return microseconds * 1e-6
+
+    def measureTime(self, repeat):
+        return min(self.importTime() for _ in range(repeat))
+
+    def measureMemory(self):
+        stdout, _ = self._run("import tracemalloc; tracemalloc.start()",
+                              "snapshot = tracemalloc.take_snapshot(); "
+                              "print(tracemalloc.get_traced_memory()[1]); "
+                              "print(sum(statistic.count for statistic in snapshot.statistics('filename')))")
+        peak, blocks = stdout.split()
+        return int(peak), int(blocks)
+
+
+@benchmark('import_all')
+def import_all():
+    return ImportWorkload("from KicadModTree import *")
+
+
+@benchmark('import_footprint')
+def import_footprint():
+    # the names needed by a simple generator
+    return ImportWorkload("from KicadModTree import Footprint, KicadFileHandler, Pad, RectLine, Text")
+
+
+def calibration_workload():
+    # pure python code without KicadModTree, its time represents the speed of the machine
+    values = {}
+    for i in range(20000):
+        values[i % 100] = values.get(i % 100, 0) + float(i) * 0.5
+    return sorted(values.items())
+
+
+def measure_time(workload, repeat, min_duration=0.2):
+    r"""Best time of a single run in seconds"""
+    timer = timeit.Timer(workload)
+
+    # enough runs per repetition to get above the timer resolution
+    number = 1
+    while True:
+        duration = timer.timeit(number)
+        if duration >= min_duration or number >= 1000:
+            break
+        number *= 2 if duration == 0 else max(2, int(min_duration / duration) + 1)
+
+    return min([duration] + timer.repeat(repeat=repeat - 1, number=number)) / number
+
+
+def measure_memory(workload):
+    r"""Peak memory in bytes and the number of memory blocks still allocated after one run"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = workload()
+        _, peak = tracemalloc.get_traced_memory()
+        gc.collect()
+        blocks = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, blocks
+
+
+def measure_speed(workload, repeat):
+    r"""Time of the workload and of the calibration workload measured directly before it"""
+    calibration = measure_time(calibration_workload, repeat)
+    if isinstance(workload, ImportWorkload):
+        return workload.measureTime(repeat), calibration
+    return measure_time(workload, repeat), calibration
+
+
+def run_case(workload, repeat):
+    if isinstance(workload, ImportWorkload):
+        peak_memory, blocks = workload.measureMemory()
+    else:
+        # the first run fills caches (like the serialize methods of the file handler)
+        workload()
+        peak_memory, blocks = measure_memory(workload)
+    duration, calibration = measure_speed(workload, repeat)
+    return {'time': duration, 'calibration': calibration, 'peak_memory': peak_memory, 'blocks': blocks}
+
+
+def compare(result, baseline, threshold, memory_threshold):
+    r"""Changes of all values relative to the baseline and the names of all regressed values
+
+    Times are scaled by the time of the calibration workload before they are compared.
+    """
+    changes = {}
+    regressions = []
+    if baseline is None:
+        return changes, regressions
+
+    for key, limit in [('time', threshold), ('peak_memory', memory_threshold), ('blocks', memory_threshold)]:
+        if not baseline.get(key):
+            continue
+        value = result[key]
+        if key == 'time' and baseline.get('calibration'):
+            value *= baseline['calibration'] / result['calibration']
+        change = value / float(baseline[key]) - 1
+        changes[key] = change
+        if change > limit:
+            regressions.append(key)
+    return changes, regressions
+
+
+def format_change(changes, key):
+    if key not in changes:
+        return ""
+    return "{:+.0%}".format(changes[key])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the KicadModTree benchmark suite and compare it to a baseline')
+    parser.add_argument('cases', nargs='*', help='only run cases whose name contains one of the given strings')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='baseline file (default: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as new baseline')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='relative increase of the time which is a regression (default: 0.5)')
+    parser.add_argument('--memory-threshold', type=float, default=0.05,
+                        help='relative increase of peak memory and blocks which is a regression (default: 0.05)')
+    parser.add_argument('--repeat', type=int, default=5, help='number of time measurements per case (default: 5)')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='number of times the time of a regressed case is measured again (default: 2)')
+    parser.add_argument('--json', help='write the results into this file')
+    args = parser.parse_args()
+
+    names = [name for name in CASES if not args.cases or any(case in name for case in args.cases)]
+    if not names:
+        parser.error("no benchmark case matches {}".format(", ".join(args.cases)))
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('cases', {})
+
+    print("{:<20} {:>12} {:>7} {:>12} {:>7} {:>10} {:>7}".format(
+        "case", "time [ms]", "", "peak [KiB]", "", "blocks", ""))
+
+    results = collections.OrderedDict()
+    regressed_cases = []
+    for name in names:
+        workload = CASES[name]()
+        result = run_case(workload, args.repeat)
+        changes, regressions = compare(result, baseline.get(name), args.threshold, args.memory_threshold)
+
+        for _ in range(args.retries):
+            if 'time' not in regressions:
+                break
+            # another process could have slowed down the machine, measure the time again before reporting it
+            duration, calibration = measure_speed(workload, args.repeat)
+            if duration / calibration < result['time'] / result['calibration']:
+                result['time'], result['calibration'] = duration, calibration
+            changes, regressions = compare(result, baseline.get(name), args.threshold, args.memory_threshold)
+
+        results[name] = result
+        if regressions:
+            regressed_cases.append((name, regressions))
+
+        print("{:<20} {:>12.3f} {:>7} {:>12.1f} {:>7} {:>10} {:>7}{}".format(
+            name, result['time'] * 1e3, format_change(changes, 'time'),
+            result['peak_memory'] / 1024., format_change(changes, 'peak_memory'),
+            result['blocks'], format_change(changes, 'blocks'),
+            "  REGRESSION" if regressions else ""))
+
+    output = {'python': platform.python_version(), 'cases': results}
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            # keep the baseline of cases which did not run
+            with open(args.baseline) as f:
+                stored_cases = json.load(f).get('cases', {})
+            stored_cases.update(results)
+            output['cases'] = collections.OrderedDict((name, stored_cases[name]) for name in CASES
+                                                      if name in stored_cases)
+        with open(args.baseline, 'w') as f:
+            json.dump(output, f, indent=2)
+            f.write("\n")
+        print("baseline written to {}".format(args.baseline))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(output, f, indent=2)
+
+    if regressed_cases:
+        print("{} cases regressed:".format(len(regressed_cases)))
+        for name, regressions in regressed_cases:
+            print("  - {}: {}".format(name, ", ".join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+"""Measure how flattening the render tree scales with the number of nodes
+
+The time per node printed for each tree size should stay roughly constant.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+from KicadModTree import *  # NOQA
+
+
+def create_footprint(node_count, depth):
+    kicad_mod = Footprint("tree_walk")
+
+    parent = kicad_mod
+    for i in range(depth):
+        translation = Translation(0.1, 0.1)
+        parent.append(translation)
+        parent = translation
+
+    for i in range(node_count):
+        parent.append(Line(start=[i, 0], end=[i, 1], layer='F.Fab'))
+
+    return kicad_mod
+
+
+def main():
+    print("{:>10} {:>6} {:>12} {:>16}".format("nodes", "depth", "walk [ms]", "per node [us]"))
+    for depth in [1, 50]:
+        for node_count in [1000, 10000, 100000]:
+            kicad_mod = create_footprint(node_count, depth)
+            repeat = max(1, 100000 // node_count)
+            duration = min(timeit.repeat(lambda: kicad_mod.serialize(), number=repeat, repeat=3)) / repeat
+            print("{:>10} {:>6} {:>12.2f} {:>16.3f}".format(
+                node_count, depth, duration * 1e3, duration / node_count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
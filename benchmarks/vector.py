@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+# KicadModTree is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# KicadModTree is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+"""Measure time and memory of the vector heavy workloads
+
+To compare against another version of KicadModTree, put it in front of the search path:
+
+    PYTHONPATH=/path/to/other/tree python benchmarks/vector.py
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+from KicadModTree import *  # NOQA
+
+
+def vector_arithmetic():
+    position = Vector2D(0, 0)
+    step = Vector2D(0.5, 0.25)
+    for i in range(10000):
+        position = (position + step) * 1.001 - 0.1
+        position += step
+
+
+def pad_array():
+    PadArray(pincount=1000, spacing=[1, 0], center=[0, 0], initial=1, increment=1,
+             type=Pad.TYPE_SMT, shape=Pad.SHAPE_RECT, size=[1, 2], layers=Pad.LAYERS_SMT)
+
+
+def polygon_points():
+    nodes = [(i * 0.1, (i % 7) * 0.2) for i in range(10000)]
+    PolygonPoints(nodes=nodes, x_mirror=0)
+
+
+def vector_memory(count=100000):
+    r"""Memory allocated to keep the given number of vectors alive"""
+    tracemalloc.start()
+    vectors = [Vector2D(i, i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del vectors
+    return size
+
+
+def main():
+    print("{:>20} {:>12}".format("workload", "time [ms]"))
+    for workload in [vector_arithmetic, pad_array, polygon_points]:
+        duration = min(timeit.repeat(workload, number=5, repeat=3)) / 5
+        print("{:>20} {:>12.2f}".format(workload.__name__, duration * 1e3))
+
+    print("{:>20} {:>12.1f}".format("bytes per Vector2D", vector_memory() / 100000.))
+
+
+if __name__ == '__main__':
+    main()
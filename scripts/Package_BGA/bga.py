@@ -148,28 +148,13 @@ def generateFootprint(config, fp_params, fp_id):
                           layer="F.SilkS", width=wSilkS))
 
     # Pads
-    balls = layoutX * layoutY
-    if rowSkips == []:
-        for _ in range(layoutY):
-            rowSkips.append([])
-    for rowNum, row in zip(range(layoutY), rowNames):
-        rowSet = set(range(1, layoutX + 1))
-        for item in rowSkips[rowNum]:
-            try:
-                # If item is a range, remove that range
-                rowSet -= set(range(*item))
-                balls -= item[1] - item[0]
-            except TypeError:
-                # If item is an int, remove that int
-                rowSet -= {item}
-                balls -= 1
-        for col in rowSet:
-            f.append(Pad(number="{}{}".format(row, col), type=Pad.TYPE_SMT,
-                         shape=padShape,
-                         at=[xPadLeft + (col-1) * pitch_x, yPadTop + rowNum * pitch_y],
-                         size=[fp_params["pad_diameter"], fp_params["pad_diameter"]],
-                         layers=Pad.LAYERS_SMT, 
-                         radius_ratio=config['round_rect_radius_ratio']))
+    padGrid = PadGrid(layout=[layoutX, layoutY], pitch=[pitch_x, pitch_y], center=[xCenter, yCenter],
+                      row_names=rowNames, row_skips=rowSkips, type=Pad.TYPE_SMT, shape=padShape,
+                      size=[fp_params["pad_diameter"], fp_params["pad_diameter"]],
+                      layers=Pad.LAYERS_SMT,
+                      radius_ratio=config['round_rect_radius_ratio'])
+    f.append(padGrid)
+    balls = padGrid.getPadCount()
 
     # If this looks like a CSP footprint, use the CSP 3dshapes library
     package_type = 'CSP' if 'BGA' not in fp_id and 'CSP' in fp_id else 'BGA'
@@ -12,6 +12,7 @@ from KicadModTree import *  # NOQA
 from KicadModTree.nodes.base.Pad import Pad  # NOQA
 sys.path.append(os.path.join(sys.path[0], "..", "..", "tools"))  # load parent path of tools
 from footprint_text_fields import addTextFields
+from configuration_loader import loadConfiguration, loadYaml
 from ipc_pad_size_calculators import *
 from quad_dual_pad_border import add_dual_or_quad_pad_border
 from drawing_tools import nearestSilkPointOnOrthogonalLine
@@ -29,15 +30,11 @@ def roundToBase(value, base):
 class Gullwing():
     def __init__(self, configuration):
         self.configuration = configuration
-        with open(ipc_doc_file, 'r') as ipc_stream:
-            try:
-                self.ipc_defintions = yaml.load(ipc_stream)
+        self.ipc_defintions = loadYaml(ipc_doc_file)
 
-                self.configuration['min_ep_to_pad_clearance'] = 0.2
-                if 'ipc_generic_rules' in self.ipc_defintions:
-                    self.configuration['min_ep_to_pad_clearance'] = self.ipc_defintions['ipc_generic_rules'].get('min_ep_to_pad_clearance', 0.2)
-            except yaml.YAMLError as exc:
-                print(exc)
+        self.configuration['min_ep_to_pad_clearance'] = 0.2
+        if 'ipc_generic_rules' in self.ipc_defintions:
+            self.configuration['min_ep_to_pad_clearance'] = self.ipc_defintions['ipc_generic_rules'].get('min_ep_to_pad_clearance', 0.2)
 
     def calcPadDetails(self, device_dimensions, EP_size, ipc_data, ipc_round_base):
         # Zmax = Lmin + 2JT + √(CL^2 + F^2 + P^2)
@@ -576,6 +573,8 @@ if __name__ == "__main__":
     parser.add_argument('--ipc_doc', type=str, nargs='?', help='IPC definition document', default='../ipc_definitions.yaml')
     parser.add_argument('--force_rectangle_pads', action='store_true', help='Force the generation of rectangle pads instead of rounded rectangle')
     parser.add_argument('--kicad4_compatible', action='store_true', help='Create footprints kicad 4 compatible')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only create footprints whose definition or generator changed since the last run')
     args = parser.parse_args()
 
     if args.density == 'L':
@@ -585,17 +584,7 @@ if __name__ == "__main__":
 
     ipc_doc_file = args.ipc_doc
 
-    with open(args.global_config, 'r') as config_stream:
-        try:
-            configuration = yaml.load(config_stream)
-        except yaml.YAMLError as exc:
-            print(exc)
-
-    with open(args.series_config, 'r') as config_stream:
-        try:
-            configuration.update(yaml.load(config_stream))
-        except yaml.YAMLError as exc:
-            print(exc)
+    configuration = loadConfiguration(args.global_config, args.series_config)
 
     if args.force_rectangle_pads or args.kicad4_compatible:
         configuration['round_rect_max_radius'] = None
@@ -603,6 +592,8 @@ if __name__ == "__main__":
 
     configuration['kicad4_compatible'] = args.kicad4_compatible
 
+    manifest = BuildManifest() if args.incremental else None
+
     for filepath in args.files:
         gw = Gullwing(configuration)
 
@@ -615,4 +606,13 @@ if __name__ == "__main__":
 
         for pkg in cmd_file:
             print("generating part for parameter set {}".format(pkg))
-            gw.generateFootprint(cmd_file[pkg], header)
+            if manifest is None:
+                gw.generateFootprint(cmd_file[pkg], header)
+                continue
+
+            input_hash = manifest.inputHash(cmd_file[pkg], header, configuration, ipc_density, files=[ipc_doc_file])
+            if not manifest.build("{}/{}".format(filepath, pkg), input_hash, gw.generateFootprint, cmd_file[pkg], header):
+                print("footprint for parameter set {} is up to date".format(pkg))
+
+    if manifest is not None:
+        manifest.save()
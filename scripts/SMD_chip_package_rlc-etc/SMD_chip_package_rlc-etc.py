@@ -12,6 +12,7 @@ from KicadModTree import *  # NOQA
 from KicadModTree.nodes.base.Pad import Pad  # NOQA
 sys.path.append(os.path.join(sys.path[0], "..", "tools"))  # load parent path of tools
 from footprint_text_fields import addTextFields
+from configuration_loader import loadConfiguration, loadYaml
 from ipc_pad_size_calculators import *
 from drawing_tools import nearestSilkPointOnOrthogonalLineSmallClerance
 
@@ -32,17 +33,14 @@ def merge_dicts(*dict_args):
 class TwoTerminalSMDchip():
     def __init__(self, command_file, configuration):
         self.configuration = configuration
+        self.command_file = command_file
         with open(command_file, 'r') as command_stream:
             try:
                 self.footprint_group_definitions = yaml.load(command_stream)
             except yaml.YAMLError as exc:
                 print(exc)
         ipc_doc = configuration['ipc_definition']
-        with open(ipc_doc, 'r') as ipc_stream:
-            try:
-                self.ipc_defintions = yaml.load(ipc_stream)
-            except yaml.YAMLError as exc:
-                print(exc)
+        self.ipc_defintions = loadYaml(ipc_doc)
 
     def calcPadDetails(self, device_dimensions, ipc_data, ipc_round_base, footprint_group_data):
         # Zmax = Lmin + 2JT + √(CL^2 + F^2 + P^2)
@@ -102,7 +100,7 @@ class TwoTerminalSMDchip():
 
         return dimensions
 
-    def generateFootprints(self):
+    def generateFootprints(self, manifest=None):
         fab_line_width = self.configuration.get('fab_line_width', 0.1)
         silk_line_width = self.configuration.get('silk_line_width', 0.12)
 
@@ -113,15 +111,19 @@ class TwoTerminalSMDchip():
             device_size_docs = footprint_group_data['size_definitions']
             package_size_defintions={}
             for device_size_doc in device_size_docs:
-                with open(size_definition_path+device_size_doc, 'r') as size_stream:
-                    try:
-                        package_size_defintions.update(yaml.load(size_stream))
-                    except yaml.YAMLError as exc:
-                        print(exc)
+                package_size_defintions.update(loadYaml(size_definition_path+device_size_doc))
 
             for size_name in package_size_defintions:
                 device_size_data = package_size_defintions[size_name]
 
+                if manifest is not None:
+                    build_key = '{}/{}/{}'.format(self.command_file, group_name, size_name)
+                    input_hash = manifest.inputHash(footprint_group_data, device_size_data, self.configuration,
+                        self.ipc_defintions[footprint_group_data['ipc_reference']])
+                    if manifest.isUpToDate(build_key, input_hash):
+                        manifest.skipped += 1
+                        continue
+
                 device_dimensions = TwoTerminalSMDchip.deviceDimensions(device_size_data)
 
                 ipc_reference = footprint_group_data['ipc_reference']
@@ -320,6 +322,9 @@ class TwoTerminalSMDchip():
                 file_handler = KicadFileHandler(kicad_mod)
                 file_handler.writeFile(filename)
 
+                if manifest is not None:
+                    manifest.record(build_key, input_hash, [filename])
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='use confing .yaml files to create footprints.')
     parser.add_argument('files', metavar='file', type=str, nargs='+',
@@ -328,25 +333,22 @@ if __name__ == "__main__":
     parser.add_argument('--series_config', type=str, nargs='?', help='the config file defining series parameters.', default='config_KLCv3.0.yaml')
     parser.add_argument('--ipc_definition', type=str, nargs='?', help='the ipc definition file', default='ipc7351B_smd_two_terminal_chip.yaml')
     parser.add_argument('--force_rectangle_pads', action='store_true', help='Force the generation of rectangle pads instead of rounded rectangle (KiCad 4.x compatibility.)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only create footprints whose definition or generator changed since the last run')
     args = parser.parse_args()
 
-    with open(args.global_config, 'r') as config_stream:
-        try:
-            configuration = yaml.load(config_stream)
-        except yaml.YAMLError as exc:
-            print(exc)
-
-    with open(args.series_config, 'r') as config_stream:
-        try:
-            configuration.update(yaml.load(config_stream))
-        except yaml.YAMLError as exc:
-            print(exc)
+    configuration = loadConfiguration(args.global_config, args.series_config)
     args = parser.parse_args()
     configuration['ipc_definition'] = args.ipc_definition
     if args.force_rectangle_pads:
         configuration['round_rect_max_radius'] = None
         configuration['round_rect_radius_ratio'] = 0
 
+    manifest = BuildManifest() if args.incremental else None
+
     for filepath in args.files:
         two_terminal_smd =TwoTerminalSMDchip(filepath, configuration)
-        two_terminal_smd.generateFootprints()
+        two_terminal_smd.generateFootprints(manifest)
+
+    if manifest is not None:
+        manifest.save()
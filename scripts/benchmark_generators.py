@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+"""Measure where the generators of the library spend their time
+
+A curated set of real generators (or the generators matching the given globs) is run inside of this process, with
+the same definition files ``build_library.py`` uses. The time of every generator is split into phases:
+
+* config: loading .yml, .yaml and .csv files (``yaml.load`` and friends, ``ModArgparser`` definition files)
+* build: creating the footprint tree, which is everything between two written footprints that is not config
+* serialize: ``FileHandler.serialize`` of a footprint
+* write: writing the serialized footprint into its file
+* other: the time after the last written footprint (like printing a summary)
+
+Generators are run in a mirror of the scripts directory inside of a temporary directory: the files of the
+generator directory are linked into it, so the output is written into the temporary directory while relative paths
+(like ``../../tools/global_config_files/config_KLCv3.0.yaml``) keep working. Footprints are serialized and written
+in two steps instead of streaming them into the file, so both phases can be measured.
+
+usage:
+    python benchmark_generators.py                          # run the curated generators
+    python benchmark_generators.py "Packages/*" --slowest 20
+    python benchmark_generators.py --report generator_benchmark.json --output /tmp/library
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import timeit
+import traceback
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+SCRIPTS_ROOT = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(SCRIPTS_ROOT, ".."))
+
+from build_library import discover_jobs  # NOQA
+from KicadModTree.FileHandler import FileHandler  # NOQA
+from KicadModTree.ModArgparser import ModArgparser  # NOQA
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# generators representing the typical workloads of a library build
+CURATED_GENERATORS = [
+    'Battery/BatteryHolder.py',
+    'Connector_PinSocket/main_generator.py',
+    'Package_BGA/bga.py',
+    'Packages/Package_Gullwing__QFP_SOIC_SO/ipc_gullwing_generator.py',
+    'Packages/Package_NoLead__DFN_QFN_LGA_SON/ipc_noLead_generator.py',
+    'Packages/TO_SOT_THT/TO_SOT_THT_generate.py',
+    'SMD_chip_package_rlc-etc/SMD_chip_package_rlc-etc.py',
+    'TerminalBlock_Phoenix/make_TerminalBlock_Phoenix.py',
+]
+
+PHASES = ('config', 'build', 'serialize', 'write', 'other')
+
+_clock = timeit.default_timer
+
+
+class PhaseTimer(object):
+    r"""Split the time of a generator into phases, using the written footprints as boundaries"""
+
+    def __init__(self):
+        self.footprints = []
+        self.phases = dict((phase, 0.) for phase in PHASES)
+
+        self._config = 0.  # config time since the last written footprint
+        self._config_depth = 0
+        self._boundary = None
+
+    def start(self):
+        self._boundary = _clock()
+
+    @contextlib.contextmanager
+    def config(self):
+        # config loaders can call each other, only the outermost one is measured
+        self._config_depth += 1
+        start = _clock()
+        try:
+            yield
+        finally:
+            self._config_depth -= 1
+            if self._config_depth == 0:
+                self._config += _clock() - start
+
+    def addFootprint(self, filename, start, serialized, written):
+        footprint = {'file': filename,
+                     'config': self._config,
+                     'build': start - self._boundary - self._config,
+                     'serialize': serialized - start,
+                     'write': written - serialized}
+        self.footprints.append(footprint)
+        for phase in ('config', 'build', 'serialize', 'write'):
+            self.phases[phase] += footprint[phase]
+
+        self._config = 0.
+        self._boundary = written
+
+    def finish(self):
+        self.phases['config'] += self._config
+        self.phases['other'] += _clock() - self._boundary - self._config
+        self._config = 0.
+
+
+def _timed(function, timer):
+    def wrapper(*args, **kwargs):
+        with timer.config():
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def _timed_iteration(function, timer):
+    # generators do their work while they are iterated
+    def wrapper(*args, **kwargs):
+        with timer.config():
+            iterator = iter(function(*args, **kwargs))
+        while True:
+            with timer.config():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    return wrapper
+
+
+@contextlib.contextmanager
+def _patched(patches):
+    originals = [(owner, name, getattr(owner, name)) for owner, name, _ in patches]
+    try:
+        for owner, name, value in patches:
+            setattr(owner, name, value)
+        yield
+    finally:
+        for owner, name, value in originals:
+            setattr(owner, name, value)
+
+
+def _instrumentation(timer, output_dir):
+    def writeFile(handler, filename, **kwargs):
+        kwargs.pop('only_changed', None)
+        start = _clock()
+        output = handler._serializeText(**kwargs)
+        serialized = _clock()
+        with io.open(filename, "w", newline='\n') as f:
+            f.write(output)
+        written = _clock()
+        timer.addFootprint(os.path.relpath(os.path.abspath(filename), output_dir).replace(os.sep, '/'),
+                           start, serialized, written)
+
+        for listener in FileHandler._write_listeners:
+            listener(filename)
+
+    patches = [(FileHandler, 'writeFile', writeFile),
+               (ModArgparser, '_parse_yml', _timed_iteration(ModArgparser._parse_yml, timer)),
+               (ModArgparser, '_parse_csv', _timed_iteration(ModArgparser._parse_csv, timer))]
+    if yaml is not None:
+        for name in ('load', 'safe_load', 'full_load', 'unsafe_load'):
+            if hasattr(yaml, name):
+                patches.append((yaml, name, _timed(getattr(yaml, name), timer)))
+        for name in ('load_all', 'safe_load_all', 'full_load_all', 'unsafe_load_all'):
+            if hasattr(yaml, name):
+                patches.append((yaml, name, _timed_iteration(getattr(yaml, name), timer)))
+    return _patched(patches)
+
+
+def _link(source, destination):
+    try:
+        os.symlink(source, destination)
+    except (AttributeError, NotImplementedError, OSError):
+        # no symlinks available (like on some windows systems)
+        if os.path.isdir(source):
+            shutil.copytree(source, destination)
+        else:
+            shutil.copy2(source, destination)
+
+
+def create_mirror(script, output_dir, root=SCRIPTS_ROOT):
+    r"""Mirror the directories from the repository root to the directory of the script inside of output_dir
+
+    The directories on the way to the script are created, all other files and directories are linked. Existing
+    .pretty directories in the directory of the script are not linked, so the generator creates them again.
+
+    :return: the mirrored directory of the script
+    """
+    repository_root = os.path.dirname(root)
+    parts = os.path.relpath(os.path.join(root, os.path.dirname(script)), repository_root).split(os.sep)
+
+    source = repository_root
+    destination = output_dir
+    for part in parts + [None]:
+        if os.path.islink(destination):
+            # linked by the mirror of another generator, the output has to be written into the mirror
+            os.remove(destination)
+        if not os.path.isdir(destination):
+            os.makedirs(destination)
+        for entry in sorted(os.listdir(source)):
+            target = os.path.join(destination, entry)
+            if entry == part or os.path.lexists(target) or entry == '.git':
+                continue
+            if part is None and entry.endswith('.pretty'):
+                continue
+            _link(os.path.join(source, entry), target)
+        if part is not None:
+            source = os.path.join(source, part)
+            destination = os.path.join(destination, part)
+    return destination
+
+
+def run_generator(job, output_dir, root=SCRIPTS_ROOT, tail_lines=20):
+    r"""Run a generator inside of this process and measure its phases
+
+    :return: dict with the result of the generator, its phases and the measured footprints
+    """
+    script_path = os.path.join(root, job.script)
+    directory = create_mirror(job.script, output_dir, root)
+
+    timer = PhaseTimer()
+    result = {'script': job.script, 'args': job.args, 'error': None}
+
+    saved_state = (os.getcwd(), list(sys.path), list(sys.argv), set(sys.modules), sys.stdout, sys.stderr)
+    output = StringIO()
+    os.chdir(directory)
+    sys.path[0] = os.path.dirname(script_path)
+    sys.argv = [script_path] + job.args
+    sys.stdout = sys.stderr = output
+
+    start = _clock()
+    try:
+        with _instrumentation(timer, output_dir):
+            timer.start()
+            try:
+                runpy.run_path(script_path, run_name='__main__')
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    result['error'] = 'exit code {}'.format(e.code)
+            except Exception as e:
+                traceback.print_exc()
+                result['error'] = '{type}: {error}'.format(type=type(e).__name__, error=e)
+            finally:
+                timer.finish()
+    finally:
+        duration = _clock() - start
+        cwd, path, argv, modules, stdout, stderr = saved_state
+        os.chdir(cwd)
+        sys.path[:] = path
+        sys.argv[:] = argv
+        sys.stdout, sys.stderr = stdout, stderr
+
+        # helper modules of different generators often have the same name (like tools.py)
+        for name in set(sys.modules) - modules:
+            if not name.startswith('KicadModTree'):
+                del sys.modules[name]
+
+    result['duration'] = duration
+    result['phases'] = timer.phases
+    result['footprints'] = timer.footprints
+    result['output_tail'] = output.getvalue().splitlines()[-tail_lines:]
+    return result
+
+
+def _format_phases(phases, total):
+    return ' '.join('{:8.2f}s {:3.0f}%'.format(phases[phase], 100. * phases[phase] / total if total else 0)
+                    for phase in PHASES)
+
+
+def print_summary(results, slowest):
+    header = ' '.join('{:>14}'.format(phase) for phase in PHASES)
+    print('{:>9} {:>6} {} generator'.format('total', 'files', header))
+
+    totals = dict((phase, 0.) for phase in PHASES)
+    for result in results:
+        for phase in PHASES:
+            totals[phase] += result['phases'][phase]
+        print('{:8.2f}s {:6} {} {}{}'.format(
+            result['duration'], len(result['footprints']), _format_phases(result['phases'], result['duration']),
+            result['script'], '  FAILED ({})'.format(result['error']) if result['error'] else ''))
+
+    duration = sum(result['duration'] for result in results)
+    print('{:8.2f}s {:6} {} total'.format(duration, sum(len(result['footprints']) for result in results),
+                                          _format_phases(totals, duration)))
+
+    footprints = [footprint for result in results for footprint in result['footprints']]
+    if slowest and footprints:
+        print('')
+        print('slowest footprints:')
+        print('{:>9} {}'.format('total', ' '.join('{:>9}'.format(phase) for phase in PHASES[:-1])))
+        footprints.sort(key=lambda f: sum(f[phase] for phase in PHASES[:-1]), reverse=True)
+        for footprint in footprints[:slowest]:
+            print('{:8.3f}s {} {}'.format(sum(footprint[phase] for phase in PHASES[:-1]),
+                                          ' '.join('{:8.3f}s'.format(footprint[phase]) for phase in PHASES[:-1]),
+                                          footprint['file']))
+
+    for result in results:
+        if result['error']:
+            print('')
+            print('{script} failed: {error}'.format(**result))
+            for line in result['output_tail']:
+                print('    ' + line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run generators of the library and measure where they spend time.')
+    parser.add_argument('scripts', metavar='pattern', type=str, nargs='*',
+                        help='run the generators matching one of those globs instead of the curated set')
+    parser.add_argument('--output', type=str,
+                        help='directory the footprints are written to (default: a temporary directory, removed '
+                             'afterwards)')
+    parser.add_argument('--report', type=str, help='write the measured phases of all footprints into this file')
+    parser.add_argument('--slowest', type=int, default=10,
+                        help='number of slowest footprints which are printed (default: 10)')
+    args = parser.parse_args()
+
+    jobs = discover_jobs(patterns=args.scripts or CURATED_GENERATORS)
+    skipped = [job for job in jobs if job.skip_reason is not None]
+    jobs = [job for job in jobs if job.skip_reason is None]
+    if not jobs:
+        parser.error('no generator found')
+
+    output_dir = os.path.realpath(args.output or tempfile.mkdtemp(prefix='benchmark_generators_'))
+    try:
+        results = []
+        for job in jobs:
+            results.append(run_generator(job, output_dir))
+            print('{duration:7.1f}s {files:5} files  {script}'.format(
+                duration=results[-1]['duration'], files=len(results[-1]['footprints']), script=job.script))
+            sys.stdout.flush()
+    finally:
+        if args.output is None:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    print('')
+    print_summary(results, args.slowest)
+    for job in skipped:
+        print('skipped: {script} ({reason})'.format(script=job.script, reason=job.skip_reason))
+
+    if args.report:
+        with io.open(args.report, 'wb') as f:
+            f.write(json.dumps({'generators': results}, indent=1, sort_keys=True).encode('utf-8'))
+
+    sys.exit(1 if any(result['error'] for result in results) else 0)
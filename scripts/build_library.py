@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+"""Regenerate the whole library by running all generator scripts in parallel
+
+Every generator is executed in its own directory, exactly like it is run by hand, so the argparse defaults of the
+scripts (like ``--global_config ../../tools/global_config_files/config_KLCv3.0.yaml``) keep working.
+
+Generators are discovered below the scripts directory:
+
+* every python file with a ``__main__`` block is a generator
+* generators which expect definition files (``ModArgparser`` or a positional ``files`` argument) get the .yml, .yaml
+  and .csv files named like the script (``bga.py`` -> ``bga.yml``), or the inputs listed in ``GENERATOR_INPUTS``.
+  Generators without known inputs are reported as skipped.
+* all other generators are executed without arguments
+
+Generators in the same directory often write into the same .pretty folders, so they are run one after another. The
+chains of jobs of all directories are run in parallel.
+
+usage:
+    python build_library.py -j 32 --report build_report.json
+    python build_library.py --profile profile.jsonl "Packages/*"  # find the slowest footprints
+"""
+
+import argparse
+import fnmatch
+import glob
+import io
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+SCRIPTS_ROOT = os.path.dirname(os.path.realpath(__file__))
+
+# directories which do not contain generators
+EXCLUDED_DIRECTORIES = ['tools']
+
+# scripts which are not part of the library
+EXCLUDED_SCRIPTS = ['benchmark_generators.py', 'build_library.py', 'compare_library.py',
+                    'example_kicadmodtree_script.py', 'generator_worker.py']
+
+# inputs of generators which do not use definition files named like the script (globs relative to the script)
+GENERATOR_INPUTS = {
+    'Package_BGA/bga.py': ['bga.yml', 'csp.yml'],
+    'Packages/Package_Gullwing__QFP_SOIC_SO/ipc_gullwing_generator.py': ['size_definitions/[!t]*.yaml'],
+    'Packages/Package_NoLead__DFN_QFN_LGA_SON/ipc_noLead_generator.py': ['size_definitions/*.yaml'],
+    'Packages/Package_PLCC/ipc_plcc_jLead_generator.py': ['plcc_jLead_definitions.yaml'],
+    'SMD_chip_package_rlc-etc/SMD_chip_package_rlc-etc.py': ['SMD_chip_devices.yaml'],
+    'Shielding/smd_shielding.py': ['*.kicad_mod.yaml'],
+    'Buzzers_Beepers/buzzer_round_tht.py': ['*.csv'],
+    'Connector/Connector_SMD_single_row_plus_mounting_pad/smd_single_row_plus_mounting_pad.py': ['conn_*.yaml'],
+}
+
+DEFINITION_FILE_EXTENSIONS = ('.yml', '.yaml', '.csv')
+
+_MAIN_REGEX = re.compile(r'''^if\s+__name__\s*==\s*['"]__main__['"]''', re.MULTILINE)
+_FILE_ARGUMENTS_REGEX = re.compile(r'''ModArgparser\(|add_argument\(\s*['"]files['"]''')
+
+
+class Job(object):
+    def __init__(self, script, args=None, skip_reason=None):
+        self.script = script
+        self.args = args or []
+        self.skip_reason = skip_reason
+
+        self.returncode = None
+        self.duration = None
+        self.outputs = []
+        self.output_tail = []
+
+    @property
+    def directory(self):
+        return os.path.dirname(self.script)
+
+    def toDict(self):
+        return {'script': self.script,
+                'args': self.args,
+                'skipped': self.skip_reason,
+                'returncode': self.returncode,
+                'duration': self.duration,
+                'outputs': self.outputs,
+                'output_tail': self.output_tail}
+
+
+def _read_source(path):
+    with io.open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _find_inputs(root, script):
+    directory = os.path.join(root, os.path.dirname(script))
+
+    patterns = GENERATOR_INPUTS.get(script)
+    if patterns is None:
+        name = os.path.splitext(os.path.basename(script))[0]
+        patterns = [name + extension for extension in DEFINITION_FILE_EXTENSIONS]
+
+    inputs = []
+    for pattern in patterns:
+        inputs.extend(sorted(os.path.relpath(path, directory)
+                             for path in glob.glob(os.path.join(directory, pattern))))
+    return inputs
+
+
+def discover_jobs(root=SCRIPTS_ROOT, patterns=None):
+    r"""Find all generators below root and the arguments they have to be called with
+
+    :param patterns: only include scripts matching one of those globs (relative to root)
+    :return: list of ``Job``, sorted by script path
+    """
+    jobs = []
+    for directory, directories, files in os.walk(root):
+        directories[:] = sorted(d for d in directories
+                                if d not in EXCLUDED_DIRECTORIES and not d.startswith(('.', '__')))
+
+        for filename in sorted(files):
+            if not filename.endswith('.py') or filename in EXCLUDED_SCRIPTS:
+                continue
+
+            path = os.path.join(directory, filename)
+            script = os.path.relpath(path, root).replace(os.sep, '/')
+            if patterns and not any(fnmatch.fnmatch(script, pattern) for pattern in patterns):
+                continue
+
+            source = _read_source(path)
+            if not _MAIN_REGEX.search(source):
+                continue
+
+            if script in GENERATOR_INPUTS or _FILE_ARGUMENTS_REGEX.search(source):
+                inputs = _find_inputs(root, script)
+                if not inputs:
+                    jobs.append(Job(script, skip_reason='no definition files found'))
+                    continue
+                jobs.append(Job(script, inputs))
+            else:
+                jobs.append(Job(script))
+
+    return jobs
+
+
+def _read_output_list(path):
+    with io.open(path, 'rb') as f:
+        return sorted(set(line.decode('utf-8') for line in f.read().splitlines() if line))
+
+
+def run_job(job, root=SCRIPTS_ROOT, python=sys.executable, timeout=None, tail_lines=20):
+    r"""Execute a single generator in its directory and store exit status, duration and written files in the job
+
+    The written files are the ones reported by ``KicadModTree.FileHandler`` of the generator (including files which
+    were not written because their content did not change), so generators running at the same time in other
+    directories do not interfere.
+    """
+    directory = os.path.join(root, job.directory)
+
+    output_list_fd, output_list = tempfile.mkstemp(prefix='kicad_outputs_', suffix='.txt')
+    os.close(output_list_fd)
+    environment = dict(os.environ)
+    environment['KICADMODTREE_OUTPUT_LIST'] = output_list  # read by KicadModTree.FileHandler
+
+    start = time.time()
+    try:
+        process = subprocess.Popen([python, os.path.basename(job.script)] + job.args, cwd=directory,
+                                   env=environment, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, process.kill)
+            timer.start()
+        try:
+            output = process.communicate()[0]
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        outputs = _read_output_list(output_list)
+    finally:
+        os.remove(output_list)
+
+    job.duration = time.time() - start
+    job.returncode = process.returncode
+    job.outputs = [os.path.relpath(path, root).replace(os.sep, '/') for path in outputs]
+    job.output_tail = output.decode('utf-8', 'replace').splitlines()[-tail_lines:]
+    return job
+
+
+def _run_chain(chain, **kwargs):
+    for job in chain:
+        run_job(job, **kwargs)
+    return chain
+
+
+def run_jobs(jobs, processes=None, callback=None, **kwargs):
+    r"""Run all jobs on a pool of worker processes
+
+    Jobs in the same directory are executed one after another, because most generators create their output
+    directories without expecting that another generator creates the same directory at the same time.
+
+    :param processes: number of generators running at the same time (default: number of cpus)
+    :param callback: called with every finished job
+    """
+    chains = {}
+    for job in jobs:
+        if job.skip_reason is None:
+            chains.setdefault(job.directory, []).append(job)
+
+    # start long chains first, so they do not end up running alone at the end of the build
+    ordered_chains = sorted(chains.values(), key=len, reverse=True)
+
+    # every worker only waits for the generator it started, the work itself is done in separate processes
+    pool = ThreadPool(processes or multiprocessing.cpu_count())
+    try:
+        for chain in pool.imap_unordered(lambda chain: _run_chain(chain, **kwargs), ordered_chains):
+            if callback is not None:
+                for job in chain:
+                    callback(job)
+    finally:
+        pool.close()
+        pool.join()
+
+    return jobs
+
+
+def write_report(path, jobs, duration):
+    report = {'duration': duration,
+              'jobs': [job.toDict() for job in jobs]}
+    with io.open(path, 'wb') as f:
+        f.write(json.dumps(report, indent=1, sort_keys=True).encode('utf-8'))
+
+
+def print_slowest_footprints(path, count=10):
+    r"""Print the slowest footprints recorded by ``KicadModTree.Profiler`` into a JSON lines file"""
+    records = []
+    with io.open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line.decode('utf-8')))
+
+    records.sort(key=lambda record: record['total'], reverse=True)
+    print('slowest footprints:')
+    for record in records[:count]:
+        print('{total:7.3f}s {phases}  {file}'.format(
+            total=record['total'], file=os.path.relpath(record['file'], SCRIPTS_ROOT),
+            phases=' '.join('{}={:.3f}s'.format(phase, duration) for phase, duration in
+                            sorted(record['phases'].items(), key=lambda item: item[1], reverse=True))))
+
+
+def _print_job(job):
+    status = 'ok' if job.returncode == 0 else 'FAILED ({})'.format(job.returncode)
+    print('{duration:7.1f}s {status:12} {count:5} files  {script} {args}'.format(
+        duration=job.duration, status=status, count=len(job.outputs), script=job.script, args=' '.join(job.args)))
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Regenerate the library by running all generators in parallel.')
+    parser.add_argument('scripts', metavar='pattern', type=str, nargs='*',
+                        help='only run generators matching one of those globs (like "Packages/*")')
+    parser.add_argument('-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='number of generators running at the same time (default: number of cpus)')
+    parser.add_argument('--report', type=str, default='build_report.json',
+                        help='file the build report is written to (default: build_report.json)')
+    parser.add_argument('--timeout', type=float, help='kill generators running longer than this (seconds)')
+    parser.add_argument('--list', action='store_true', help='only print the generators which would be run')
+    parser.add_argument('--profile', type=str,
+                        help='collect the time, node count and size of every footprint into this JSON lines file')
+    args = parser.parse_args()
+
+    jobs = discover_jobs(patterns=args.scripts)
+
+    if args.list:
+        for job in jobs:
+            print('{script} {args}{skipped}'.format(
+                script=job.script, args=' '.join(job.args),
+                skipped='  (skipped: {})'.format(job.skip_reason) if job.skip_reason else ''))
+        sys.exit(0)
+
+    if args.profile:
+        # the file is appended to by the KicadModTree.Profiler of every generator
+        args.profile = os.path.abspath(args.profile)
+        if os.path.exists(args.profile):
+            os.remove(args.profile)
+        os.environ['KICADMODTREE_PROFILE'] = args.profile
+
+    start = time.time()
+    run_jobs(jobs, processes=args.jobs, callback=_print_job, timeout=args.timeout)
+    duration = time.time() - start
+
+    write_report(args.report, jobs, duration)
+
+    executed = [job for job in jobs if job.skip_reason is None]
+    failed = [job for job in executed if job.returncode != 0]
+    print('{count} generators run in {duration:.1f}s, {failed} failed, {skipped} skipped, {outputs} files written'
+          .format(count=len(executed), duration=duration, failed=len(failed), skipped=len(jobs) - len(executed),
+                  outputs=sum(len(job.outputs) for job in executed)))
+    for job in failed:
+        print('failed: {script} {args}'.format(script=job.script, args=' '.join(job.args)))
+
+    if args.profile and os.path.exists(args.profile):
+        print_slowest_footprints(args.profile)
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+"""Find the footprints which really changed between two versions of a library
+
+Footprints are compared element by element with a numeric tolerance (see ``FootprintComparator``), so changes of the
+edit timestamp, float formatting or element order are not reported.
+
+The directories can be single .pretty folders or folders containing .pretty folders, footprints are matched by their
+relative path. The exit status is 0 if no footprint changed and 1 otherwise.
+
+usage:
+    python compare_library.py -j 32 --report diff_report.json /path/to/kicad-footprints .
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(sys.path[0], ".."))  # load parent path of KicadModTree
+
+from KicadModTree.FootprintComparator import compareLibraries  # NOQA
+
+
+def write_report(path, report):
+    with io.open(path, 'wb') as f:
+        f.write(json.dumps(report, indent=1, sort_keys=True).encode('utf-8'))
+
+
+def _print_footprint(result, verbose):
+    print('{status:10} {footprint}'.format(**result))
+    if result.get('error'):
+        print('    ' + result['error'])
+    if verbose:
+        for element in result['removed']:
+            print('  - ' + element)
+        for element in result['added']:
+            print('  + ' + element)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the footprints of two libraries semantically.')
+    parser.add_argument('old', type=str, help='directory of the existing footprints')
+    parser.add_argument('new', type=str, help='directory of the generated footprints')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of worker processes (default: number of cpus)')
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help='maximum difference of numbers which are considered equal (default: 1e-6)')
+    parser.add_argument('--report', type=str, help='write the result as json into this file')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print the removed and added elements')
+    args = parser.parse_args()
+
+    for directory in (args.old, args.new):
+        if not os.path.isdir(directory):
+            parser.error('{} is not a directory'.format(directory))
+
+    report = compareLibraries(args.old, args.new, tolerance=args.tolerance, processes=args.jobs)
+
+    for result in report['footprints']:
+        _print_footprint(result, args.verbose)
+
+    if args.report:
+        write_report(args.report, report)
+
+    summary = report['summary']
+    print('{unchanged} unchanged, {changed} changed, {added} added, {removed} removed, {error} errors'
+          .format(**summary))
+
+    sys.exit(0 if summary['unchanged'] == sum(summary.values()) else 1)
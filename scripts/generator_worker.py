@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+"""Long running worker which runs generators on request, without starting a new python process for every run
+
+Requests are JSON objects, one per line, read from stdin or from the connections of a unix socket. Generators are run
+inside of the worker, like ``benchmark_generators.py`` does. KicadModTree, pyyaml and the shared helpers of
+``scripts/tools`` and ``scripts/general`` (including the configs cached by ``configuration_loader``) stay loaded
+between the runs, so a run only pays for the generator itself. Modules of the generator directories are imported
+again for every run (many directories have their own ``helpers.py``). When a kept module is modified, all kept modules
+of the repository are imported again before the next run.
+
+Requests:
+
+* ``{"id": 1, "generator": "Battery/BatteryHolder.py", "args": ["BatteryHolder.yml", "--offset", "2", "--limit", "1"]}``
+  run a generator (relative to the scripts directory). Without ``args``, the generator is called with the
+  definition files ``build_library.py`` uses. Optional keys: ``output`` (directory the footprints are written
+  into, using a mirror of the scripts directory like ``benchmark_generators.py``; default: next to the generator
+  like a manual run) and ``content`` (return the serialized footprints instead of writing them).
+* ``{"id": 2, "command": "ping"}`` check if the worker is alive
+* ``{"id": 3, "command": "shutdown"}`` stop the worker
+
+Responses are JSON objects, one per line. Every written footprint is reported immediately by a ``footprint``
+event (``file`` and, in content mode, ``content``). Every request is finished by exactly one ``done`` event, which
+contains ``error`` (``null`` if the request succeeded). All responses contain the ``id`` of their request.
+
+Generators share the state of the worker process (working directory, ``sys.modules``), so requests are executed one
+after another. Start multiple workers to generate in parallel. The library wide settings of KicadModTree a generator can
+change (``CLASS_SWITCHES``, like ``KicadFileHandler.optimize_geometry``) are restored after every run.
+
+usage:
+    python generator_worker.py                               # requests from stdin, responses to stdout
+    python generator_worker.py --socket /tmp/generator.sock
+"""
+
+import argparse
+import importlib
+import json
+import os
+import runpy
+import socket
+import stat
+import sys
+import timeit
+import traceback
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+SCRIPTS_ROOT = os.path.dirname(os.path.realpath(__file__))
+REPOSITORY_ROOT = os.path.dirname(SCRIPTS_ROOT)
+sys.path.append(REPOSITORY_ROOT)
+
+from build_library import discover_jobs  # NOQA
+from benchmark_generators import create_mirror  # NOQA
+
+# directories of helper modules shared by many generators, kept loaded like KicadModTree
+SHARED_DIRECTORIES = ['tools', 'general']
+
+# class attributes generators set for the whole library (like ModArgparser does for --optimize), restored after every
+# run so they do not change the following runs
+CLASS_SWITCHES = [
+    ('KicadModTree.FileHandler', 'FileHandler', 'only_write_changed'),
+    ('KicadModTree.FileHandler', 'FileHandler', '_write_listeners'),
+    ('KicadModTree.KicadFileHandler', 'KicadFileHandler', 'optimize_geometry'),
+    ('KicadModTree.Profiler', 'Profiler', 'active'),
+    ('KicadModTree.nodes.specialized.RectFill', 'RectFill', 'default_fill_type'),
+]
+
+_clock = timeit.default_timer
+
+
+def _module_source(module):
+    path = getattr(module, '__file__', None)
+    if not path:
+        return None
+    if path.endswith(('.pyc', '.pyo')):
+        path = path[:-1]
+    return os.path.realpath(path)
+
+
+def _is_inside(path, directory):
+    return path.startswith(directory + os.sep)
+
+
+def _modification_time(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _save_class_switches():
+    saved = []
+    for module_name, class_name, attribute in CLASS_SWITCHES:
+        owner = getattr(importlib.import_module(module_name), class_name)
+        value = getattr(owner, attribute)
+        # lists (like the write listeners) are changed in-place
+        saved.append((owner, attribute, value, list(value) if isinstance(value, list) else None))
+    return saved
+
+
+def _restore_class_switches(saved):
+    for owner, attribute, value, items in saved:
+        setattr(owner, attribute, value)
+        if items is not None:
+            value[:] = items
+
+
+class GeneratorWorker(object):
+    r"""Run generators inside of this process, keeping KicadModTree and the shared helpers loaded between the runs"""
+
+    def __init__(self, root=SCRIPTS_ROOT, tail_lines=20):
+        self.root = root
+        self.tail_lines = tail_lines
+        self.runs = 0
+
+        # modules in those directories are kept between the runs, other modules of the repository are removed
+        self._warm_directories = [os.path.join(REPOSITORY_ROOT, 'KicadModTree')] + \
+            [os.path.join(root, directory) for directory in SHARED_DIRECTORIES]
+        self._warm_modules = {}  # name -> (source, modification time) of the kept modules
+        self._sortModules(set(sys.modules), remove=False)
+
+    def warmUp(self):
+        r"""Import everything the generators import anyway, so the first run is fast as well"""
+        modules = set(sys.modules)
+        kicad_mod_tree = importlib.import_module('KicadModTree')
+        for name in kicad_mod_tree.__all__:
+            getattr(kicad_mod_tree, name)
+        importlib.import_module('KicadModTree.ModArgparser')._import_yaml()
+        self._sortModules(set(sys.modules) - modules)
+
+    def _sortModules(self, names, remove=True):
+        for name in names:
+            source = _module_source(sys.modules.get(name))
+            if source is None or not _is_inside(source, REPOSITORY_ROOT):
+                continue  # builtin, standard library or installed package
+            if any(_is_inside(source, directory) for directory in self._warm_directories):
+                self._warm_modules[name] = (source, _modification_time(source))
+            elif remove:
+                # modules of the generator directories often have the same name (like helpers.py)
+                del sys.modules[name]
+
+    def _reloadModifiedModules(self):
+        r"""Remove all kept modules if one of them was modified, so the next run imports them again
+
+        :return: ``True`` if the modules were removed
+        """
+        if all(_modification_time(source) == mtime for source, mtime in self._warm_modules.values()):
+            return False
+
+        for name in self._warm_modules:
+            sys.modules.pop(name, None)
+        self._warm_modules = {}
+        self.warmUp()
+        return True
+
+    def _resolveScript(self, script):
+        script_path = os.path.realpath(os.path.join(self.root, script))
+        if not _is_inside(script_path, self.root) or not script_path.endswith('.py') or \
+                not os.path.isfile(script_path):
+            raise ValueError('unknown generator: {}'.format(script))
+        return os.path.relpath(script_path, self.root).replace(os.sep, '/')
+
+    def generate(self, script, args=None, output=None, content=False, callback=None):
+        r"""Run a generator inside of this process
+
+        :param script: path of the generator, relative to the scripts directory
+        :param args: command line arguments, default: the definition files used by ``build_library.py``
+        :param output: directory the footprints are written into (default: next to the generator)
+        :param content: do not write the footprints, pass their serialized content to the callback
+        :param callback: called with ``(filename, content)`` for every footprint, content is ``None`` if the
+            footprints are written
+        :return: dict with the result of the run
+        """
+        script = self._resolveScript(script)
+        if args is None:
+            args = []
+            for job in discover_jobs(self.root, [script]):
+                if job.skip_reason is not None:
+                    raise ValueError('{script} can not be run without arguments: {reason}'.format(
+                        script=script, reason=job.skip_reason))
+                args = job.args
+
+        reloaded = self._reloadModifiedModules()
+        # the modules can be new after reloading
+        from KicadModTree.FileHandler import FileHandler
+        from KicadModTree.Profiler import Profiler
+
+        script_path = os.path.join(self.root, script)
+        if output is None:
+            directory = os.path.dirname(script_path)
+        else:
+            directory = create_mirror(script, os.path.realpath(output), self.root)
+
+        files = []
+        write_file = FileHandler.writeFile
+
+        def writeFile(handler, filename, **kwargs):
+            filename = os.path.abspath(filename)
+            if content:
+                kwargs.pop('only_changed', None)
+                serialized = handler._serializeText(**kwargs)
+            else:
+                write_file(handler, filename, **kwargs)
+                serialized = None
+            files.append(filename)
+            if callback is not None:
+                callback(filename, serialized)
+
+        result = {'script': script, 'args': args, 'error': None, 'reloaded': reloaded}
+
+        saved_state = (os.getcwd(), list(sys.path), list(sys.argv), set(sys.modules), sys.stdout, sys.stderr)
+        saved_switches = _save_class_switches()
+        log = StringIO()
+        os.chdir(directory)
+        sys.path[0] = os.path.dirname(script_path)
+        sys.argv = [script_path] + list(args)
+        sys.stdout = sys.stderr = log
+        FileHandler.writeFile = writeFile
+
+        start = _clock()
+        try:
+            runpy.run_path(script_path, run_name='__main__')
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                result['error'] = 'exit code {}'.format(e.code)
+        except Exception as e:
+            traceback.print_exc()
+            result['error'] = '{type}: {error}'.format(type=type(e).__name__, error=e)
+        finally:
+            result['duration'] = _clock() - start
+            FileHandler.writeFile = write_file
+            profiler = Profiler.active
+            _restore_class_switches(saved_switches)
+            if profiler is not None and profiler is not Profiler.active:
+                profiler.close()  # enabled by the generator
+            cwd, path, argv, modules, stdout, stderr = saved_state
+            os.chdir(cwd)
+            sys.path[:] = path
+            sys.argv[:] = argv
+            sys.stdout, sys.stderr = stdout, stderr
+            self._sortModules(set(sys.modules) - modules)
+            self.runs += 1
+
+        result['files'] = len(files)
+        result['output_tail'] = log.getvalue().splitlines()[-self.tail_lines:]
+        return result
+
+    def handle(self, request, send):
+        r"""Execute a request and send its responses
+
+        :param request: the decoded request
+        :param send: function called with every response
+        :return: ``False`` if the worker has to stop
+        """
+        request_id = request.get('id') if isinstance(request, dict) else None
+
+        def reply(event, **values):
+            values.update(id=request_id, event=event)
+            send(values)
+
+        def footprint(filename, content):
+            if content is None:
+                reply('footprint', file=filename)
+            else:
+                reply('footprint', file=filename, content=content)
+
+        if not isinstance(request, dict):
+            reply('done', error='a request has to be a JSON object')
+            return True
+
+        command = request.get('command', 'generate')
+        if command == 'ping':
+            reply('done', error=None, pid=os.getpid(), runs=self.runs)
+        elif command == 'shutdown':
+            reply('done', error=None)
+            return False
+        elif command == 'generate':
+            args = request.get('args')
+            if args is not None and not (isinstance(args, list) and
+                                         all(isinstance(arg, (str, type(u''))) for arg in args)):
+                reply('done', error='args has to be a list of strings')
+                return True
+            try:
+                result = self.generate(request.get('generator') or '', args, request.get('output'),
+                                       bool(request.get('content')), footprint)
+            except ValueError as e:
+                reply('done', error=str(e))
+            except Exception as e:
+                # like a syntax error in a modified module of KicadModTree, the next request can still succeed
+                reply('done', error='{type}: {error}'.format(type=type(e).__name__, error=e),
+                      output_tail=traceback.format_exc().splitlines()[-self.tail_lines:])
+            else:
+                reply('done', **result)
+        else:
+            reply('done', error='unknown command: {}'.format(command))
+        return True
+
+
+def serve_stream(worker, stream, write):
+    r"""Execute the requests of a binary stream, until it is closed or the worker is stopped
+
+    :return: ``False`` if the worker has to stop
+    """
+    def send(response):
+        write((json.dumps(response, sort_keys=True) + '\n').encode('utf-8'))
+
+    for line in iter(stream.readline, b''):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line.decode('utf-8'))
+        except ValueError as e:
+            send({'id': None, 'event': 'done', 'error': 'invalid request: {}'.format(e)})
+            continue
+        if not worker.handle(request, send):
+            return False
+    return True
+
+
+def serve_stdin(worker):
+    stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+    stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+
+    def write(data):
+        stdout.write(data)
+        stdout.flush()
+
+    serve_stream(worker, stdin, write)
+
+
+def serve_socket(worker, path):
+    if not hasattr(socket, 'AF_UNIX'):
+        sys.exit('unix sockets are not available on this platform, use stdin instead')
+
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            sys.exit('{} exists and is not a socket'.format(path))
+        os.remove(path)  # left behind by a worker which was killed
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(5)
+    print('listening on {}'.format(path))
+    sys.stdout.flush()
+
+    running = True
+    try:
+        while running:
+            connection, _ = server.accept()
+            try:
+                running = serve_stream(worker, connection.makefile('rb'), connection.sendall)
+            except socket.error:
+                pass  # the client disconnected while the responses were sent
+            finally:
+                connection.close()
+    finally:
+        server.close()
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run generators on request, keeping the libraries loaded.')
+    parser.add_argument('--socket', type=str, metavar='PATH',
+                        help='accept requests on this unix socket instead of stdin')
+    parser.add_argument('--tail', type=int, default=20,
+                        help='number of lines of the generator output returned per run (default: 20)')
+    args = parser.parse_args()
+
+    worker = GeneratorWorker(tail_lines=args.tail)
+    worker.warmUp()
+
+    try:
+        if args.socket:
+            serve_socket(worker, args.socket)
+        else:
+            serve_stdin(worker)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,63 @@
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIRECTORY = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+sys.path.append(SCRIPTS_DIRECTORY)
+
+from build_library import Job, run_job  # NOQA
+
+# writes two footprints into a .pretty folder, and a footprint of another generator without using KicadModTree
+GENERATOR = u"""
+import os
+import sys
+sys.path.append({repository!r})
+from KicadModTree import *
+
+if not os.path.isdir('Test.pretty'):
+    os.makedirs('Test.pretty')
+for name in ['first', 'second']:
+    KicadFileHandler(Footprint(name)).writeFile(os.path.join('Test.pretty', name + '.kicad_mod'))
+    KicadFileHandler(Footprint(name)).writeFile(os.path.join('Test.pretty', name + '.kicad_mod'), only_changed=True)
+
+with open(os.path.join('Test.pretty', 'other.kicad_mod'), 'w') as f:
+    f.write('(module other)')
+"""
+
+
+class BuildLibraryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = os.path.realpath(tempfile.mkdtemp())
+        os.makedirs(os.path.join(self.directory, 'Test'))
+        with io.open(os.path.join(self.directory, 'Test', 'generator.py'), 'w') as f:
+            f.write(GENERATOR.format(repository=os.path.realpath(os.path.join(SCRIPTS_DIRECTORY, '..'))))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testOutputs(self):
+        # only files written by the FileHandler of the job are its outputs, whatever their modification time is
+        job = run_job(Job('Test/generator.py'), root=self.directory)
+        self.assertEqual(job.returncode, 0, job.output_tail)
+        self.assertEqual(job.outputs, ['Test/Test.pretty/first.kicad_mod', 'Test/Test.pretty/second.kicad_mod'])
+
+        # unchanged files are outputs as well
+        job = run_job(Job('Test/generator.py'), root=self.directory)
+        self.assertEqual(job.outputs, ['Test/Test.pretty/first.kicad_mod', 'Test/Test.pretty/second.kicad_mod'])
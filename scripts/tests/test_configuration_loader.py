@@ -0,0 +1,154 @@
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import hashlib
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+
+import yaml
+
+SCRIPTS_DIRECTORY = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+sys.path.append(os.path.join(SCRIPTS_DIRECTORY, "tools"))
+
+import configuration_loader  # NOQA
+from configuration_loader import loadConfiguration, loadYaml  # NOQA
+
+
+class ConfigurationLoaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.directory, 'cache')
+        self.environment = os.environ.get('KICAD_FOOTPRINT_GENERATOR_CACHE')
+        os.environ['KICAD_FOOTPRINT_GENERATOR_CACHE'] = self.cache_directory
+        configuration_loader._loaded_files.clear()
+
+    def tearDown(self):
+        if self.environment is None:
+            del os.environ['KICAD_FOOTPRINT_GENERATOR_CACHE']
+        else:
+            os.environ['KICAD_FOOTPRINT_GENERATOR_CACHE'] = self.environment
+        configuration_loader._loaded_files.clear()
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, filename, content, mtime=None):
+        path = os.path.join(self.directory, filename)
+        with io.open(path, 'w') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def cachePath(self, path):
+        return os.path.join(self.cache_directory,
+                            hashlib.sha1(os.path.realpath(path).encode('utf-8')).hexdigest() + '.pickle')
+
+    def replaceCachedData(self, path, data):
+        # changes the cache entry, to find out if the next call uses it instead of parsing the file
+        cache_path = self.cachePath(path)
+        entry = configuration_loader._readCacheEntry(cache_path)
+        entry['data'] = pickle.dumps(data)
+        configuration_loader._writeCacheEntry(cache_path, entry)
+        configuration_loader._loaded_files.clear()
+
+    def testCachedResult(self):
+        path = self.writeFile('config.yaml', u"a: 1\nb: [1, 2]\n")
+        data = loadYaml(path)
+        self.assertEqual(data, {'a': 1, 'b': [1, 2]})
+        self.assertEqual(os.listdir(self.cache_directory), [os.path.basename(self.cachePath(path))])
+
+        # every call returns new objects
+        data['b'].append(3)
+        self.assertEqual(loadYaml(path), {'a': 1, 'b': [1, 2]})
+
+        self.replaceCachedData(path, {'cached': True})
+        self.assertEqual(loadYaml(path), {'cached': True})
+
+        # the content did not change, only the modification time
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        self.assertEqual(loadYaml(path), {'cached': True})
+
+    def testEditedFile(self):
+        path = self.writeFile('config.yaml', u"a: 1\n", mtime=1000000)
+        self.assertEqual(loadYaml(path), {'a': 1})
+
+        # new size and modification time, the in memory cache of this process is checked too
+        self.writeFile('config.yaml', u"a: 12\n", mtime=1000010)
+        self.assertEqual(loadYaml(path), {'a': 12})
+
+        # new modification time with the same size
+        self.writeFile('config.yaml', u"a: 13\n", mtime=1000020)
+        configuration_loader._loaded_files.clear()
+        self.assertEqual(loadYaml(path), {'a': 13})
+
+        # a valid cache entry of the previous content is not used
+        self.replaceCachedData(path, {'cached': True})
+        self.assertEqual(loadYaml(path), {'cached': True})
+        self.writeFile('config.yaml', u"a: 14\n", mtime=1000030)
+        self.assertEqual(loadYaml(path), {'a': 14})
+
+    def testCorruptCache(self):
+        path = self.writeFile('config.yaml', u"a: 1\n")
+        loadYaml(path)
+        cache_path = self.cachePath(path)
+
+        for content in (b"", b"no pickle", pickle.dumps({'version': -1, 'data': pickle.dumps({'a': 2})}),
+                        pickle.dumps([1, 2])):
+            with io.open(cache_path, 'wb') as f:
+                f.write(content)
+            configuration_loader._loaded_files.clear()
+            self.assertEqual(loadYaml(path), {'a': 1})
+            # the entry is written again
+            self.assertEqual(pickle.loads(configuration_loader._readCacheEntry(cache_path)['data']), {'a': 1})
+
+    def testUnwritableCache(self):
+        os.environ['KICAD_FOOTPRINT_GENERATOR_CACHE'] = self.writeFile('cache', u"")
+        path = self.writeFile('config.yaml', u"a: 1\n")
+        self.assertEqual(loadYaml(path), {'a': 1})
+
+    def testLoadConfiguration(self):
+        global_config = self.writeFile('global.yaml', u"a: 1\nb: 1\nc: {x: 1}\n")
+        series_config = self.writeFile('series.yaml', u"b: 2\nc: {y: 2}\n")
+        empty_config = self.writeFile('empty.yaml', u"")
+
+        self.assertEqual(loadConfiguration(global_config, series_config),
+                         {'a': 1, 'b': 2, 'c': {'y': 2}})
+        self.assertEqual(loadConfiguration(series_config, global_config),
+                         {'a': 1, 'b': 1, 'c': {'x': 1}})
+        self.assertEqual(loadConfiguration(global_config, empty_config, series_config, overrides={'a': 3}),
+                         {'a': 3, 'b': 2, 'c': {'y': 2}})
+        self.assertEqual(loadConfiguration(), {})
+
+        with self.assertRaises(ValueError):
+            loadConfiguration(global_config, self.writeFile('list.yaml', u"- a\n"))
+
+    def testLoadGeneratorConfiguration(self):
+        # the configs of the generators merge like they did when the files were parsed by the generators
+        global_config = os.path.join(SCRIPTS_DIRECTORY, 'tools/global_config_files/config_KLCv3.0.yaml')
+        series_config = os.path.join(SCRIPTS_DIRECTORY, 'Packages/package_config_KLCv3.yaml')
+
+        with io.open(global_config, 'r') as config_stream:
+            expected = yaml.safe_load(config_stream)
+        with io.open(series_config, 'r') as config_stream:
+            expected.update(yaml.safe_load(config_stream))
+
+        self.assertEqual(loadConfiguration(global_config, series_config), expected)
+        # a second time from the cache
+        configuration_loader._loaded_files.clear()
+        self.assertEqual(loadConfiguration(global_config, series_config), expected)
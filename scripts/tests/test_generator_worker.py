@@ -0,0 +1,79 @@
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+from generator_worker import GeneratorWorker  # NOQA
+from KicadModTree import KicadFileHandler, Profiler, RectFill  # NOQA
+from KicadModTree.FileHandler import FileHandler  # NOQA
+
+# prints the library wide settings, and changes them like a generator with --only-changed, --optimize and --profile
+GENERATOR = u"""from __future__ import print_function
+import sys
+from KicadModTree import *
+from KicadModTree.FileHandler import FileHandler
+
+print('switches', FileHandler.only_write_changed, KicadFileHandler.optimize_geometry, Profiler.active is None,
+      RectFill.default_fill_type, len(FileHandler._write_listeners))
+
+if len(sys.argv) > 1:
+    FileHandler.only_write_changed = True
+    KicadFileHandler.optimize_geometry = True
+    Profiler.enable(sys.argv[1])
+    RectFill.default_fill_type = RectFill.FILL_POLYGON
+    FileHandler._write_listeners.append(print)
+    if sys.argv[2:] == ['fail']:
+        raise RuntimeError('failed run')
+"""
+
+
+class GeneratorWorkerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with io.open(os.path.join(self.directory, 'generator.py'), 'w') as f:
+            f.write(GENERATOR)
+        self.worker = GeneratorWorker(root=os.path.realpath(self.directory))
+        self.worker.warmUp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def switches(self, result):
+        return [line for line in result['output_tail'] if line.startswith('switches')]
+
+    def testClassSwitchesRestored(self):
+        default = 'switches False False True {} 0'.format(RectFill.default_fill_type)
+        profile = os.path.join(self.directory, 'profile.jsonl')
+
+        for args in ([profile], [profile, 'fail']):
+            result = self.worker.generate('generator.py', args)
+            self.assertEqual(self.switches(result), [default])
+            self.assertEqual(result['error'], None if len(args) == 1 else 'RuntimeError: failed run')
+
+            # the next request starts with the settings of the library again
+            result = self.worker.generate('generator.py', [])
+            self.assertEqual(self.switches(result), [default])
+            self.assertEqual(result['error'], None)
+
+        self.assertFalse(FileHandler.only_write_changed)
+        self.assertFalse(KicadFileHandler.optimize_geometry)
+        self.assertIsNone(Profiler.active)
+        self.assertEqual(FileHandler._write_listeners, [])
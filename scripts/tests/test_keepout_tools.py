@@ -0,0 +1,160 @@
+# kicad-footprint-generator is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kicad-footprint-generator is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+
+import math
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), "../tools"))
+
+from keepout_tools import KeepoutIndex, addKeepoutRect, addKeepoutRound, applyKeepouts, containedInAnyKeepout, \
+    getKeepoutIndex  # NOQA
+
+RECT = [-1, 1, -1, 1]
+CIRCLE = [-1, 1, -1, 1, 1]
+
+
+class KeepoutToolsTests(unittest.TestCase):
+
+    def assertParts(self, parts, expected):
+        self.assertEqual(len(parts), len(expected), "{} != {}".format(parts, expected))
+        for part, expected_part in zip(parts, expected):
+            for value, expected_value in zip(part, expected_part):
+                self.assertAlmostEqual(value, expected_value)
+
+    def testAddKeepout(self):
+        self.assertEqual(addKeepoutRect(1, 2, 4, 2), [[-1, 3, 1, 3]])
+        self.assertParts(addKeepoutRound(1, 2, 2, 2), [[-0.015, 2.015, 0.985, 3.015, 1.015]])
+        self.assertEqual(addKeepoutRound(1, 2, 4, 2), [[-1, 3, 1, 3]])
+
+    def testContains(self):
+        self.assertTrue(containedInAnyKeepout(1, 1, [RECT]))
+        self.assertFalse(containedInAnyKeepout(1.1, 0, [RECT]))
+        self.assertTrue(containedInAnyKeepout(1, 0, [CIRCLE]))
+        self.assertFalse(containedInAnyKeepout(0.8, 0.8, [CIRCLE]))
+        self.assertFalse(containedInAnyKeepout(0, 0, []))
+
+    def testClipHLine(self):
+        rect = KeepoutIndex([RECT])
+        self.assertParts(rect.clipHLine(-5, 5, 0), [[-5, -1], [1, 5]])
+        self.assertParts(rect.clipHLine(5, -5, 0.5), [[-5, -1], [1, 5]])
+        self.assertParts(rect.clipHLine(-5, 0, 0), [[-5, -1]])
+        self.assertParts(rect.clipHLine(-0.5, 0.5, 0), [])
+        self.assertParts(rect.clipHLine(-5, 5, 1.5), [[-5, 5]])
+        # the border belongs to the keepout
+        self.assertParts(rect.clipHLine(-5, 5, 1), [[-5, -1], [1, 5]])
+        # lines touching a keepout from outside are kept
+        self.assertParts(rect.clipHLine(-5, -1, 0), [[-5, -1]])
+
+        circle = KeepoutIndex([CIRCLE])
+        self.assertParts(circle.clipHLine(-5, 5, 0), [[-5, -1], [1, 5]])
+        self.assertParts(circle.clipHLine(-5, 5, 0.6), [[-5, -0.8], [0.8, 5]])
+        self.assertParts(circle.clipHLine(-5, 5, 1.5), [[-5, 5]])
+        # a tangent only splits the line
+        self.assertParts(circle.clipHLine(-5, 5, 1), [[-5, 0], [0, 5]])
+
+    def testClipVLine(self):
+        rect = KeepoutIndex([RECT])
+        self.assertParts(rect.clipVLine(-5, 5, 0), [[-5, -1], [1, 5]])
+        self.assertParts(rect.clipVLine(0, 5, -1), [[1, 5]])
+        self.assertParts(rect.clipVLine(-5, 5, -1.5), [[-5, 5]])
+
+        circle = KeepoutIndex([CIRCLE])
+        self.assertParts(circle.clipVLine(5, -5, 0.6), [[-5, -0.8], [0.8, 5]])
+        self.assertParts(circle.clipVLine(-5, 5, -1.5), [[-5, 5]])
+
+    def testClipLine(self):
+        rect = KeepoutIndex([RECT])
+        self.assertParts(rect.clipLine(-3, -3, 3, 3), [[-3, -3, -1, -1], [1, 1, 3, 3]])
+        self.assertParts(rect.clipLine(3, 3, 0, 0), [[3, 3, 1, 1]])
+        self.assertParts(rect.clipLine(-3, 0, 0, 3), [[-3, 0, 0, 3]])
+        self.assertParts(rect.clipLine(-3, 0, 3, 0), [[-3, 0, -1, 0], [1, 0, 3, 0]])
+
+        circle = KeepoutIndex([CIRCLE])
+        d = math.sqrt(0.5)
+        self.assertParts(circle.clipLine(-3, -3, 3, 3), [[-3, -3, -d, -d], [d, d, 3, 3]])
+        self.assertParts(circle.clipLine(-3, 1.5, 3, 1.5), [[-3, 1.5, 3, 1.5]])
+        self.assertParts(circle.clipLine(0, 0, 0.5, 0.5), [])
+
+    def testClipArc(self):
+        # keepout around the start of a full circle: the remaining arc starts where the circle leaves the keepout
+        index = KeepoutIndex([[1.5, 2.5, -0.5, 0.5]])
+        phi = math.asin(0.25)
+        self.assertParts(index.clipArc(0, 0, 2, 0, 360),
+                         [[2 * math.cos(phi), 0.5, 360 - 2 * math.degrees(phi)]])
+        self.assertParts(index.clipArc(0, 0, 0, 2, 90), [[0, 2, 90]])
+
+        # round keepout at the end of the arc, in both directions
+        phi = math.degrees(math.acos(0.96875))
+        self.assertParts(KeepoutIndex([[-0.5, 0.5, 1.5, 2.5, 0.5]]).clipArc(0, 0, 2, 0, 90), [[2, 0, 90 - phi]])
+        self.assertParts(KeepoutIndex([[-0.5, 0.5, -2.5, -1.5, 0.5]]).clipArc(0, 0, 2, 0, -90), [[2, 0, phi - 90]])
+
+        # round keepout in the middle of the arc
+        start = math.radians(90 + phi)
+        self.assertParts(KeepoutIndex([[-0.5, 0.5, 1.5, 2.5, 0.5]]).clipArc(0, 0, 2, 0, 180),
+                         [[2, 0, 90 - phi], [2 * math.cos(start), 2 * math.sin(start), 90 - phi]])
+
+        # a keepout touching the arc does not split it
+        self.assertParts(KeepoutIndex([[-1, 1, 2, 3]]).clipArc(0, 0, 2, 0, 180), [[2, 0, 180]])
+        self.assertParts(KeepoutIndex([RECT]).clipArc(0, 0, 2, 0, 360), [[2, 0, 360]])
+
+    def testOverlappingKeepouts(self):
+        # overlapping and touching keepouts clip like the single keepout covering all of them
+        union = KeepoutIndex([[-1, 1, 1.5, 2.5]])
+        for keepouts in ([[-1, 0.2, 1.5, 2.5], [-0.2, 1, 1.5, 2.5]],
+                         [[-1, 0, 1.5, 2.5], [0, 1, 1.5, 2.5]],
+                         [[-1, 1, 1.5, 2.5], [-0.5, 0.5, 1.8, 2.2, 0.2]]):
+            index = KeepoutIndex(keepouts)
+            self.assertParts(index.clipHLine(-5, 5, 2), union.clipHLine(-5, 5, 2))
+            self.assertParts(index.clipVLine(-5, 5, 0), union.clipVLine(-5, 5, 0))
+            self.assertParts(index.clipLine(-3, 0, 3, 4), union.clipLine(-3, 0, 3, 4))
+            self.assertParts(index.clipArc(0, 0, 2, 0, 180), union.clipArc(0, 0, 2, 0, 180))
+
+        circles = KeepoutIndex([[-1, 1, -1, 1, 1], [0, 2, -1, 1, 1]])
+        self.assertParts(circles.clipHLine(-5, 5, 0), [[-5, -1], [2, 5]])
+
+    def testApplyKeepouts(self):
+        self.assertParts(applyKeepouts([[-5, 0], [0.5, 5]], 0, 0, 2, [RECT]), [[-5, -1], [1, 5]])
+        self.assertParts(applyKeepouts([[-5, 5]], 3, 2, 0, [RECT, [2, 4, -1, 1]]), [[-5, -1], [1, 5]])
+
+    def testKeepoutIndexCache(self):
+        keepouts = [RECT]
+        index = getKeepoutIndex(keepouts)
+        self.assertIs(getKeepoutIndex(keepouts), index)
+        self.assertIs(getKeepoutIndex(index), index)
+
+        # keepouts added or removed in-place are indexed again
+        keepouts.append([2, 4, -1, 1])
+        self.assertIsNot(getKeepoutIndex(keepouts), index)
+        self.assertParts(applyKeepouts([[-5, 5]], 0, 0, 2, keepouts), [[-5, -1], [1, 2], [4, 5]])
+
+        keepouts += addKeepoutRect(-3, 0, 2, 2)
+        self.assertParts(applyKeepouts([[-5, 5]], 0, 0, 2, keepouts), [[-5, -4], [-2, -1], [1, 2], [4, 5]])
+        self.assertTrue(containedInAnyKeepout(-3, 0, keepouts))
+
+        keepouts.pop()
+        keepouts.pop()
+        self.assertParts(applyKeepouts([[-5, 5]], 0, 0, 2, keepouts), [[-5, -1], [1, 5]])
+        self.assertFalse(containedInAnyKeepout(-3, 0, keepouts))
+
+        # keepouts changed in-place
+        keepouts.append([2, 4, -1, 1])
+        self.assertParts(applyKeepouts([[-5, 5]], 0, 0, 2, keepouts), [[-5, -1], [1, 2], [4, 5]])
+        keepouts[0][0] = -2
+        self.assertParts(applyKeepouts([[-5, 5]], 0, 0, 2, keepouts), [[-5, -2], [1, 2], [4, 5]])
+        keepouts[0] = [-1, 0, -1, 1]
+        self.assertParts(applyKeepouts([[-5, 5]], 0, 0, 2, keepouts), [[-5, -1], [0, 2], [4, 5]])
+
+        del keepouts[:]
+        self.assertParts(applyKeepouts([[-5, 5]], 0, 0, 2, keepouts), [[-5, 5]])
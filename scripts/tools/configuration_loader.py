@@ -0,0 +1,143 @@
+'''
+kicad-footprint-generator is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+kicad-footprint-generator is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+'''
+
+import hashlib
+import io
+import os
+import pickle
+
+import yaml
+
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    # libyaml is not available
+    _YamlLoader = yaml.SafeLoader
+
+CACHE_VERSION = 1
+
+# parsed files of this process: path -> ((mtime, size), pickled data)
+_loaded_files = {}
+
+
+def _cacheDirectory():
+    directory = os.environ.get('KICAD_FOOTPRINT_GENERATOR_CACHE')
+    if directory is None:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        directory = os.path.join(cache_home, 'kicad-footprint-generator')
+    return directory
+
+
+def _readCacheEntry(cache_path):
+    try:
+        with io.open(cache_path, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception:
+        # missing, incomplete or outdated cache file
+        return None
+
+    if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION:
+        return None
+    return entry
+
+
+def _writeCacheEntry(cache_path, entry):
+    try:
+        directory = os.path.dirname(cache_path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        temporary_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+        with io.open(temporary_path, 'wb') as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+        # os.replace is not available in python 2
+        getattr(os, 'replace', os.rename)(temporary_path, cache_path)
+    except (IOError, OSError):
+        pass  # the cache is only an optimization, a read only home directory is fine
+
+
+def _loadPickledYaml(path, stat):
+    cache_path = os.path.join(_cacheDirectory(), hashlib.sha1(path.encode('utf-8')).hexdigest() + '.pickle')
+    file_state = [stat.st_mtime, stat.st_size]
+
+    entry = _readCacheEntry(cache_path)
+    if entry is not None and entry['path'] == path and entry['state'] == file_state:
+        return entry['data']
+
+    with io.open(path, 'rb') as f:
+        content = f.read()
+    content_hash = hashlib.sha1(content).hexdigest()
+
+    if entry is None or entry['path'] != path or entry['hash'] != content_hash:
+        data = yaml.load(content, Loader=_YamlLoader)
+        entry = {'version': CACHE_VERSION, 'path': path, 'hash': content_hash,
+                 'data': pickle.dumps(data, pickle.HIGHEST_PROTOCOL)}
+
+    # also rewritten if only the modification time changed, so the file is not hashed again next time
+    entry['state'] = file_state
+    _writeCacheEntry(cache_path, entry)
+
+    return entry['data']
+
+
+def loadYaml(path):
+    r"""Load a yaml file, reusing the result of previous runs if the file did not change
+
+    Files are parsed with the libyaml based loader if available. The result is cached in memory and in a cache
+    directory (``$KICAD_FOOTPRINT_GENERATOR_CACHE``, default: ``~/.cache/kicad-footprint-generator``). A cached result
+    is used if the modification time and size of the file did not change, or if its content hash is still the same.
+
+    Every call returns new objects, so the result can be modified by the caller.
+
+    :param path: path of the yaml file
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    file_state = (stat.st_mtime, stat.st_size)
+
+    loaded = _loaded_files.get(path)
+    if loaded is None or loaded[0] != file_state:
+        loaded = (file_state, _loadPickledYaml(path, stat))
+        _loaded_files[path] = loaded
+
+    return pickle.loads(loaded[1])
+
+
+def loadConfiguration(*config_files, **kwargs):
+    r"""Load the configuration of a generator from layered config files
+
+    The files are applied in the given order, values of later files replace the ones of earlier files
+    (like global config -> series config).
+
+    :param config_files: paths of the config files
+    :param overrides: dict of values replacing the ones of the config files (like per device values)
+
+    :Example:
+
+    >>> configuration = loadConfiguration('../../tools/global_config_files/config_KLCv3.0.yaml',
+    ...                                   '../package_config_KLCv3.yaml')
+    """
+    configuration = {}
+
+    for config_file in config_files:
+        config = loadYaml(config_file)
+        if config is None:
+            continue
+        if not isinstance(config, dict):
+            raise ValueError('config file {} does not contain a mapping'.format(config_file))
+        configuration.update(config)
+
+    configuration.update(kwargs.get('overrides') or {})
+    return configuration
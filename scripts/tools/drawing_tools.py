@@ -13,6 +13,8 @@ sys.path.append(os.path.join(sys.path[0], "..", ".."))  # load kicad_mod path
 
 from KicadModTree import *  # NOQA
 from footprint_global_properties import *
+from KicadModTree.util.geometric_util import arcPolyline
+from keepout_tools import addKeepoutRect, addKeepoutRound, applyKeepouts, containedInAnyKeepout, getKeepoutIndex
 
 # tool function for generating 3D-scripts
 def script3d_writevariable(file, line, varname, value):
@@ -50,94 +52,16 @@ def frangei(x, y, jump):
         x += jump
 
 
-# returns a list with a single rectangle around x,y with width and height w and h
-def addKeepoutRect(x, y, w, h):
-    return [[x - w / 2, x + w / 2, y - h / 2, y + h / 2]]
-
-
-# returns a series of rectangle that lie around the circular pad around (x,y) with radius w=h
-# if w!=h, addKeepoutRect() is called
-def addKeepoutRound(x, y, w, h):
-    if w != h:
-        return addKeepoutRect(x, y, w, h)
-    else:
-        res = []
-        Nrects = 16
-        r = max(h, w) / 2
-        yysum = 0
-        for ya in frange(0, r, r / Nrects):
-            a = math.fabs(math.asin(ya / r) / math.pi * 180)
-            yy = math.fabs(r * math.sin(a / 180.0 * math.pi))
-            xx = math.fabs(r * math.cos(a / 180.0 * math.pi))
-            if (xx > 0):
-                res.append([x - xx - 0.015, x + xx + 0.015, y - yy - r / Nrects - 0.015, y - yy + .015])
-                res.append([x - xx - 0.015, x + xx + 0.015, y + yy - 0.015, y + yy + r / Nrects + 0.015])
-            yysum = yysum + yy
-        return res
-
-# internal method for keepout-processing
-def applyKeepouts(lines_in, y, xi, yi, keepouts):
-    # print("  applyKeepouts(\n  lines_in=", lines_in, "  \n  y=", y, "   \n  xi=", xi, "   yi=", yi, "   \n  keepouts=", keepouts, ")")
-    lines = lines_in
-    changes = True
-    while (changes):
-        changes = False
-        for ko in keepouts:
-            ko = [min(ko[0], ko[1]), max(ko[0], ko[1]), min(ko[2], ko[3]), max(ko[2], ko[3])]
-            if (ko[yi + 0] <= y) and (y <= ko[yi + 1]):
-                # print("    INY: koy=", [ko[yi + 0], ko[yi + 1]], "  y=", y, "):             kox=", [ko[xi + 0], ko[xi + 1]])
-                for li in reversed(range(0, len(lines))):
-                    l = lines[li]
-                    if (l[0] >= ko[xi + 0]) and (l[0] <= ko[xi + 1]) and (l[1] >= ko[xi + 0]) and (
-                                l[1] <= ko[xi + 1]):  # Line completely inside -> remove
-                        lines.pop(li)
-                        # print("      H1: ko=", [ko[xi+0],ko[xi+1]], "  li=", li, "   l=", l, ")")
-                        changes = True
-                    elif (l[0] >= ko[xi + 0]) and (l[0] <= ko[xi + 1]) and (
-                                l[1] > ko[
-                                    xi + 1]):  # Line starts inside, but ends outside -> remove and add shortened
-                        lines.pop(li)
-                        lines.append([ko[xi + 1], l[1]])
-                        # print("      H2: ko=", [ko[xi+0],ko[xi+1]], "  li=", li, "   l=", l, "): ", [ko[xi+1], l[1]])
-                        changes = True
-                    elif (l[0] < ko[xi + 0]) and (l[1] <= ko[xi + 1]) and (
-                                l[1] >= ko[
-                                    xi + 0]):  # Line starts outside, but ends inside -> remove and add shortened
-                        lines.pop(li)
-                        lines.append([l[0], ko[xi + 0]])
-                        # print("      H3: ko=", [ko[xi+0],ko[xi+1]], "  li=", li, "   l=", l, "): ", [l[0], ko[xi+0]])
-                        changes = True
-                    elif (l[0] < ko[xi + 0]) and (
-                                l[1] > ko[
-                                    xi + 1]):  # Line starts outside, and ends outside -> remove and add 2 shortened
-                        lines.pop(li)
-                        lines.append([l[0], ko[xi + 0]])
-                        lines.append([ko[xi + 1], l[1]])
-                        # print("      H4: ko=", [ko[xi+0],ko[xi+1]], "  li=", li, "   l=", l, "): ", [l[0], ko[xi+0]], [ko[xi+1], l[1]])
-                        changes = True
-                        # else:
-                        # print("      USE: ko=", [ko[xi+0],ko[xi+1]], "  li=", li, "   l=", l, "): ")
-        if changes:
-            break
-
-    return lines
-
-# gives True if the given point (x,y) is contained in any keepout
-def containedInAnyKeepout(x,y, keepouts):
-    for ko in keepouts:
-        ko = [min(ko[0], ko[1]), max(ko[0], ko[1]), min(ko[2], ko[3]), max(ko[2], ko[3])]
-        if x>=ko[0] and x<=ko[1] and y>=ko[2] and y<=ko[3]:
-            #print("HIT!")
-            return True
-    #print("NO HIT ",x,y)
-    return False
-
 # draws the keepouts
 def debug_draw_keepouts(kicad_modg, keepouts):
     for ko in keepouts:
-        kicad_modg.append(RectLine(start=[ko[0],ko[2]],
-                                  end=[ko[1],ko[3]],
-                                  layer='F.Mask', width=0.01))
+        if len(ko) > 4:
+            kicad_modg.append(Circle(center=[(ko[0]+ko[1])/2, (ko[2]+ko[3])/2], radius=ko[4],
+                                     layer='F.Mask', width=0.01))
+        else:
+            kicad_modg.append(RectLine(start=[ko[0],ko[2]],
+                                      end=[ko[1],ko[3]],
+                                      layer='F.Mask', width=0.01))
 
 # split a horizontal line so it does not interfere with keepout areas defined as [[x0,x1,y0,y1], ...]
 def addHLineWithKeepout(kicad_mod, x0, x1, y, layer, width, keepouts=[], roun=0.001, dashed=False):
@@ -152,32 +76,15 @@ def addHLineWithKeepout(kicad_mod, x0, x1, y, layer, width, keepouts=[], roun=0.
 
 # draw a circle minding the keepouts
 def addCircleWithKeepout(kicad_mod, x, y, radius, layer, width, keepouts=[], roun=0.001):
-    dalpha = 2 * 3.1415 / (360)
-    a = 0
-    start=0
-    startx=x + radius * math.sin(0)
-    starty=y + radius * math.cos(0)
-    hasToDraw=False
-    noneUsed=True
-    while a < 2 * 3.1415:
-        x1 = x + radius * math.sin(a)
-        y1 = y + radius * math.cos(a)
-
-        if containedInAnyKeepout(x1,y1, keepouts):
-            if hasToDraw and math.fabs(a-start)>0:
-                kicad_mod.append( Arc(center=[roundG(x, roun), roundG(y, roun)], start=[roundG(startx, roun), roundG(starty, roun)], angle=-1*(a - start)/3.1415*180, layer=layer, width=width))
-            hasToDraw = False
-            startx=x1; starty=y1; start=a
-            noneUsed = False
-        else:
-            hasToDraw = True
-
-        a = a + dalpha
-    if noneUsed:
+    parts = getKeepoutIndex(keepouts).clipArc(x, y, x, y + radius, -360)
+    if len(parts) == 1 and abs(parts[0][2]) >= 360:
         kicad_mod.append(
             Circle(center=[roundG(x, roun), roundG(y, roun)], radius=radius, layer=layer, width=width))
-    elif hasToDraw and math.fabs(a - start) > 0:
-        kicad_mod.append( Arc(center=[roundG(x, roun), roundG(y, roun)], start=[roundG(startx, roun), roundG(starty, roun)], angle=-1*(a - start)/3.1415*180, layer=layer, width=width))
+        return
+
+    for startx, starty, angle in parts:
+        kicad_mod.append(Arc(center=[roundG(x, roun), roundG(y, roun)], start=[roundG(startx, roun), roundG(starty, roun)],
+                             angle=angle, layer=layer, width=width))
 
 # draw an arc
 def addArcByAngles(kicad_mod, x, y, radius, angle_start, angle_end, layer, width, roun=0.001):
@@ -193,39 +100,9 @@ def addArcByAnglesWithKeepout(kicad_mod, x, y, radius, angle_start, angle_end, l
 
 # draw an arc minding the keepouts
 def addArcWithKeepout(kicad_mod, x, y, startx, starty, angle, layer, width, keepouts=[], roun=0.001):
-    dalpha = angle/180*3.1415 / (360)
-    radius=math.sqrt(sqr(x-startx)+sqr(y-starty));
-    a = math.asin((startx-x)/radius)
-    if starty<0:
-        a=a+3.1415/2
-    astart=a;
-    aend=astart+angle/180*3.1415
-    start=astart
-    #print(radius, astart/3.1415*180, aend/3.1415*180)
-    istartx=x + radius * math.sin(a)
-    istarty=y + radius * math.cos(a)
-    hasToDraw=False
-    noneUsed=True
-    while a < aend:
-        x1 = x + radius * math.sin(a)
-        y1 = y + radius * math.cos(a)
-
-        if containedInAnyKeepout(x1,y1, keepouts):
-            if hasToDraw and math.fabs(a-start)>0:
-                #print('DRAW ',x1,y1)
-                kicad_mod.append( Arc(center=[roundG(x, roun), roundG(y, roun)], start=[roundG(istartx, roun), roundG(istarty, roun)], angle=-1*(a - start)/3.1415*180, layer=layer, width=width))
-            hasToDraw = False
-            istartx=x1; istarty=y1; start=a
-            noneUsed = False
-        else:
-            hasToDraw = True
-        #print(a, dalpha, hasToDraw, noneUsed)
-        a = a + dalpha
-    if noneUsed:
-        kicad_mod.append(
-            Arc(center=[roundG(x, roun), roundG(y, roun)], start=[roundG(startx, roun), roundG(starty, roun)], angle=angle, layer=layer, width=width))
-    elif hasToDraw and math.fabs(a - start) > 0:
-        kicad_mod.append( Arc(center=[roundG(x, roun), roundG(y, roun)], start=[roundG(istartx, roun), roundG(istarty, roun)], angle=-1*(a - start)/3.1415*180, layer=layer, width=width))
+    for istartx, istarty, iangle in getKeepoutIndex(keepouts).clipArc(x, y, startx, starty, angle):
+        kicad_mod.append(Arc(center=[roundG(x, roun), roundG(y, roun)], start=[roundG(istartx, roun), roundG(istarty, roun)],
+                             angle=iangle, layer=layer, width=width))
 
 # draw an ellipse with one axis along x-axis and one axis along y-axis and given width/height
 def addEllipse(kicad_mod, x, y, w, h, layer, width, roun=0.001):
@@ -266,24 +143,8 @@ def addDCircleWithKeepout(kicad_mod, x, y, radius, layer, width, keepouts=[], ro
 
 # split an arbitrary line so it does not interfere with keepout areas defined as [[x0,x1,y0,y1], ...]
 def addLineWithKeepout(kicad_mod, x1, y1, x2,y2, layer, width, keepouts=[], roun=0.001):
-    dx=(x2-x1)/200
-    dy=(y2-y1)/200
-    x=x1; y=y1
-    xs=x1; ys=y1;
-    hasToDraw=not containedInAnyKeepout(x, y, keepouts)
-    didDrawAny=False
-    for n in range(0,200):
-        if containedInAnyKeepout(x+dx, y+dy, keepouts):
-            if hasToDraw:
-                didDrawAny=True
-                kicad_mod.append(Line(start=[roundG(xs, roun), roundG(ys, roun)], end=[roundG(x, roun), roundG(y, roun)], layer=layer, width=width))
-            xs=x+2*dx; ys=y+2*dy; hasToDraw=False
-        else:
-            hasToDraw = True
-
-        x=x+dx; y=y+dy
-    if hasToDraw and ((xs!=x2 and ys!=y2) or (not didDrawAny)):
-        kicad_mod.append(Line(start=[roundG(xs, roun), roundG(ys, roun)], end=[roundG(x2, roun), roundG(y2, roun)], layer=layer, width=width))
+    for xs, ys, xe, ye in getKeepoutIndex(keepouts).clipLine(x1, y1, x2, y2):
+        kicad_mod.append(Line(start=[roundG(xs, roun), roundG(ys, roun)], end=[roundG(xe, roun), roundG(ye, roun)], layer=layer, width=width))
 
 
 # split an arbitrary line so it does not interfere with keepout areas defined as [[x0,x1,y0,y1], ...]
@@ -589,7 +450,17 @@ def addRoundedRect(model, x, size, corner_radius, layer, width=0.2):
 
 
 # draws a filled circle consisting of concentric circles of varying widths (e.g. for glue dots!)
-def fillCircle(model, center, radius, layer, width):
+# fill_type is RectFill.FILL_HATCH (concentric circles) or RectFill.FILL_POLYGON (one polygon), by default the
+# library wide setting RectFill.default_fill_type is used
+def fillCircle(model, center, radius, layer, width, fill_type=None):
+    if (fill_type or RectFill.default_fill_type) == RectFill.FILL_POLYGON:
+        # the outline is drawn with the line width, so the polygon covers the same area as the outer circle
+        points = arcPolyline(center[0], center[1], radius, 0, 360, max_error=0.005)[:-1]
+        # adding 0 turns -0.0 into 0.0, which would otherwise be written as -0
+        points = [[round(x, 6) + 0, round(y, 6) + 0] for x, y in points]
+        model.append(Polygon(nodes=points, layer=layer, width=width))
+        return
+
     model.append(Circle(center=center, radius=radius, layer=layer, width=width))
     r = radius
     w = radius / 3
@@ -0,0 +1,323 @@
+'''
+kicad-footprint-generator is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+kicad-footprint-generator is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with kicad-footprint-generator. If not, see < http://www.gnu.org/licenses/ >.
+'''
+
+# Keepout areas are given as lists:
+#   rectangle: [x0, x1, y0, y1]
+#   circle:    [x0, x1, y0, y1, radius], the first four values are the bounding box of the circle
+#
+# Lines and arcs are clipped against the exact areas. The areas are stored in interval trees over their x and y
+# ranges, so only the areas near a line have to be checked.
+
+from __future__ import division
+
+import math
+
+# additional clearance of round keepouts, which keeps the distance of the former approximation by rectangles
+KEEPOUT_ROUND_MARGIN = 0.015
+
+_TWO_PI = 2 * math.pi
+
+
+# returns a list with a single rectangle around x,y with width and height w and h
+def addKeepoutRect(x, y, w, h):
+    return [[x - w / 2, x + w / 2, y - h / 2, y + h / 2]]
+
+
+# returns a list with a single circle around the round pad at (x,y) with diameter w=h
+# if w!=h, addKeepoutRect() is called
+def addKeepoutRound(x, y, w, h):
+    if w != h:
+        return addKeepoutRect(x, y, w, h)
+
+    r = w / 2 + KEEPOUT_ROUND_MARGIN
+    return [[x - r, x + r, y - r, y + r, r]]
+
+
+class _Keepout(object):
+    __slots__ = ('x0', 'x1', 'y0', 'y1', 'radius', 'cx', 'cy')
+
+    def __init__(self, ko):
+        self.x0, self.x1 = min(ko[0], ko[1]), max(ko[0], ko[1])
+        self.y0, self.y1 = min(ko[2], ko[3]), max(ko[2], ko[3])
+        self.radius = ko[4] if len(ko) > 4 else None
+        self.cx = (self.x0 + self.x1) / 2
+        self.cy = (self.y0 + self.y1) / 2
+
+    def contains(self, x, y):
+        if self.radius is None:
+            return self.x0 <= x <= self.x1 and self.y0 <= y <= self.y1
+        return (x - self.cx) ** 2 + (y - self.cy) ** 2 <= self.radius ** 2
+
+    # closed interval of x which is blocked on the horizontal line at y, or None
+    def blockedX(self, y):
+        if self.radius is None:
+            return (self.x0, self.x1) if self.y0 <= y <= self.y1 else None
+        dy = y - self.cy
+        if abs(dy) > self.radius:
+            return None
+        dx = math.sqrt(self.radius ** 2 - dy ** 2)
+        return (self.cx - dx, self.cx + dx)
+
+    # closed interval of y which is blocked on the vertical line at x, or None
+    def blockedY(self, x):
+        if self.radius is None:
+            return (self.y0, self.y1) if self.x0 <= x <= self.x1 else None
+        dx = x - self.cx
+        if abs(dx) > self.radius:
+            return None
+        dy = math.sqrt(self.radius ** 2 - dx ** 2)
+        return (self.cy - dy, self.cy + dy)
+
+    # closed interval of t which is blocked on the line (x + t*dx, y + t*dy) with 0 <= t <= 1, or None
+    def blockedLine(self, x, y, dx, dy):
+        if self.radius is None:
+            # Liang-Barsky clipping
+            t0, t1 = 0., 1.
+            for p, q in ((-dx, x - self.x0), (dx, self.x1 - x), (-dy, y - self.y0), (dy, self.y1 - y)):
+                if p == 0:
+                    if q < 0:
+                        return None
+                elif p < 0:
+                    t0 = max(t0, q / p)
+                else:
+                    t1 = min(t1, q / p)
+            return (t0, t1) if t0 <= t1 else None
+
+        # solve |(x, y) + t*(dx, dy) - center| <= radius
+        fx, fy = x - self.cx, y - self.cy
+        a = dx * dx + dy * dy
+        b = 2 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - self.radius ** 2
+        if a == 0:
+            return (0., 1.) if c <= 0 else None
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return None
+        root = math.sqrt(discriminant)
+        t0, t1 = max((-b - root) / (2 * a), 0.), min((-b + root) / (2 * a), 1.)
+        return (t0, t1) if t0 <= t1 else None
+
+    # angles (like math.atan2) where the circle around (x, y) crosses the border of this keepout
+    def circleCrossings(self, x, y, r):
+        angles = []
+        if self.radius is None:
+            for edge_x in (self.x0, self.x1):
+                if abs(edge_x - x) <= r:
+                    phi = math.acos(max(-1., min(1., (edge_x - x) / r)))
+                    angles.extend((phi, -phi))
+            for edge_y in (self.y0, self.y1):
+                if abs(edge_y - y) <= r:
+                    phi = math.asin(max(-1., min(1., (edge_y - y) / r)))
+                    angles.extend((phi, math.pi - phi))
+        else:
+            d = math.hypot(self.cx - x, self.cy - y)
+            if 0 < d <= r + self.radius and d >= abs(r - self.radius):
+                base = math.atan2(self.cy - y, self.cx - x)
+                phi = math.acos(max(-1., min(1., (r * r + d * d - self.radius ** 2) / (2 * r * d))))
+                angles.extend((base + phi, base - phi))
+        return angles
+
+
+class _IntervalTree(object):
+    # centered interval tree over (low, high, item) tuples
+
+    def __init__(self, intervals):
+        self._root = self._build(intervals)
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+
+        endpoints = sorted(value for interval in intervals for value in interval[:2])
+        center = endpoints[len(endpoints) // 2]
+        left = [interval for interval in intervals if interval[1] < center]
+        right = [interval for interval in intervals if interval[0] > center]
+        here = [interval for interval in intervals if interval[0] <= center <= interval[1]]
+        return (center,
+                sorted(here, key=lambda interval: interval[0]),
+                sorted(here, key=lambda interval: interval[1], reverse=True),
+                self._build(left), self._build(right))
+
+    # items of all intervals which overlap [low, high]
+    def overlapping(self, low, high):
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_low, by_high, left, right = node
+            if high < center:
+                for interval in by_low:
+                    if interval[0] > high:
+                        break
+                    result.append(interval[2])
+                stack.append(left)
+            elif low > center:
+                for interval in by_high:
+                    if interval[1] < low:
+                        break
+                    result.append(interval[2])
+                stack.append(right)
+            else:
+                result.extend(interval[2] for interval in by_low)
+                stack.append(left)
+                stack.append(right)
+        return result
+
+
+# remove the closed intervals in blocked from [start, end], returns the remaining parts as [[a, b], ...]
+def _subtractIntervals(start, end, blocked):
+    parts = []
+    position = start
+    applied = False
+    for low, high in sorted(blocked):
+        if high < start or low > end:
+            continue
+        applied = True
+        if low > position:
+            parts.append([position, low])
+        position = max(position, high)
+    if position < end or not applied:
+        parts.append([position, end])
+    return parts
+
+
+class KeepoutIndex(object):
+    # keepout areas stored in interval trees for clipping lines and arcs
+
+    def __init__(self, keepouts):
+        self.keepouts = [_Keepout(ko) for ko in keepouts]
+        self._x_tree = _IntervalTree([(ko.x0, ko.x1, ko) for ko in self.keepouts])
+        self._y_tree = _IntervalTree([(ko.y0, ko.y1, ko) for ko in self.keepouts])
+
+    # keepouts whose bounding box overlaps the given box
+    def _candidates(self, x0, x1, y0, y1):
+        return [ko for ko in self._y_tree.overlapping(y0, y1) if ko.x0 <= x1 and x0 <= ko.x1]
+
+    # gives True if the point (x,y) is contained in any keepout
+    def contains(self, x, y):
+        return any(ko.contains(x, y) for ko in self._candidates(x, x, y, y))
+
+    # parts [[x0, x1], ...] of the horizontal line from x0 to x1 at y which are outside of all keepouts
+    def clipHLine(self, x0, x1, y):
+        x0, x1 = min(x0, x1), max(x0, x1)
+        blocked = [ko.blockedX(y) for ko in self._y_tree.overlapping(y, y)]
+        return _subtractIntervals(x0, x1, [interval for interval in blocked if interval is not None])
+
+    # parts [[y0, y1], ...] of the vertical line from y0 to y1 at x which are outside of all keepouts
+    def clipVLine(self, y0, y1, x):
+        y0, y1 = min(y0, y1), max(y0, y1)
+        blocked = [ko.blockedY(x) for ko in self._x_tree.overlapping(x, x)]
+        return _subtractIntervals(y0, y1, [interval for interval in blocked if interval is not None])
+
+    # parts [[xa, ya, xb, yb], ...] of the line from (x1,y1) to (x2,y2) which are outside of all keepouts
+    def clipLine(self, x1, y1, x2, y2):
+        dx, dy = x2 - x1, y2 - y1
+        blocked = [ko.blockedLine(x1, y1, dx, dy)
+                   for ko in self._candidates(min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2))]
+        return [[x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy]
+                for t0, t1 in _subtractIntervals(0., 1., [interval for interval in blocked if interval is not None])]
+
+    # parts of the arc around (cx,cy) which starts at (sx,sy) and runs angle degree (like the Arc node), which are
+    # outside of all keepouts. Returns [[start_x, start_y, angle], ...], a full circle (|angle| >= 360) is only split
+    # where it enters a keepout.
+    def clipArc(self, cx, cy, sx, sy, angle):
+        r = math.hypot(sx - cx, sy - cy)
+        if r == 0 or angle == 0:
+            return [[sx, sy, angle]]
+
+        direction = 1 if angle > 0 else -1
+        full_circle = abs(angle) >= 360
+        sweep = _TWO_PI if full_circle else math.radians(abs(angle))
+        start_angle = math.atan2(sy - cy, sx - cx)
+
+        def point(s):
+            phi = start_angle + direction * s
+            return cx + r * math.cos(phi), cy + r * math.sin(phi)
+
+        blocked = []
+        for ko in self._candidates(cx - r, cx + r, cy - r, cy + r):
+            # split the arc where it crosses the border of the keepout, every piece is either inside or outside
+            positions = [0., sweep]
+            for crossing in ko.circleCrossings(cx, cy, r):
+                s = ((crossing - start_angle) * direction) % _TWO_PI
+                if 0 < s < sweep:
+                    positions.append(s)
+            positions.sort()
+            for low, high in zip(positions, positions[1:]):
+                if high > low and ko.contains(*point((low + high) / 2)):
+                    blocked.append((low, high))
+
+        if not blocked:
+            return [[sx, sy, angle]]
+
+        parts = _subtractIntervals(0., sweep, blocked)
+        if full_circle and len(parts) > 1 and parts[0][0] == 0 and parts[-1][1] == sweep:
+            # the circle has no start, so the first and the last part are connected
+            parts[0] = [parts.pop()[0] - sweep, parts[0][1]]
+
+        result = []
+        for low, high in parts:
+            if high > low:
+                start_x, start_y = point(low)
+                result.append([start_x, start_y, direction * math.degrees(high - low)])
+        return result
+
+
+# the indexes of the last used keepout lists: id(keepouts) -> (keepouts, copy of the keepouts, KeepoutIndex)
+_keepout_indexes = {}
+_MAX_CACHED_INDEXES = 16
+
+
+def _keepoutsSnapshot(keepouts):
+    return tuple(tuple(keepout) for keepout in keepouts)
+
+
+# get the (cached) KeepoutIndex of a list of keepouts
+# The list is compared with a copy made when its index was created, so keepouts which are added, removed or changed
+# in-place are detected. Pass a KeepoutIndex to avoid the comparison.
+def getKeepoutIndex(keepouts):
+    if isinstance(keepouts, KeepoutIndex):
+        return keepouts
+
+    snapshot = _keepoutsSnapshot(keepouts)
+    cached = _keepout_indexes.get(id(keepouts))
+    if cached is not None and cached[0] is keepouts and cached[1] == snapshot:
+        return cached[2]
+
+    index = KeepoutIndex(keepouts)
+    if len(_keepout_indexes) >= _MAX_CACHED_INDEXES:
+        _keepout_indexes.clear()
+    _keepout_indexes[id(keepouts)] = (keepouts, snapshot, index)
+    return index
+
+
+# internal method for keepout-processing
+# lines_in are [start, end] intervals of a horizontal (xi=0, yi=2) or vertical (xi=2, yi=0) line at y
+def applyKeepouts(lines_in, y, xi, yi, keepouts):
+    index = getKeepoutIndex(keepouts)
+    lines = []
+    for line in lines_in:
+        if xi == 0:
+            lines.extend(index.clipHLine(line[0], line[1], y))
+        else:
+            lines.extend(index.clipVLine(line[0], line[1], y))
+    return lines
+
+
+# gives True if the given point (x,y) is contained in any keepout
+def containedInAnyKeepout(x, y, keepouts):
+    return getKeepoutIndex(keepouts).contains(x, y)